@@ -13,6 +13,8 @@ import sys
 from pathlib import Path
 from typing import List, Dict
 
+from create_video_with_audio import create_audio_files, get_video_duration, TTSClipCache
+
 # ============================================================================
 # 1. CYPRESS TEST DOSYASINI PARSE ET
 # ============================================================================
@@ -136,55 +138,7 @@ def create_srt_subtitle(steps: List[Dict], output_file: str, scale_factor: float
         print(f"✅ SRT subtitle oluşturuldu: {output_file}")
 
 # ============================================================================
-# 3. TEXT-TO-SPEECH (TTS) İŞLEMLERİ
-# ============================================================================
-
-def text_to_speech_edge(text: str, output_audio: str, voice: str = "tr-TR-EmelNeural") -> bool:
-    """Microsoft Edge TTS ile ses oluşturur (ÜCRETSİZ, API key gerekmez)"""
-    try:
-        import edge_tts
-        import asyncio
-        
-        async def generate_speech():
-            communicate = edge_tts.Communicate(text, voice)
-            await communicate.save(output_audio)
-        
-        asyncio.run(generate_speech())
-        print(f"  ✅ Ses oluşturuldu: {text[:50]}...")
-        return True
-        
-    except ImportError:
-        print("❌ 'edge-tts' kütüphanesi yüklü değil. 'pip install edge-tts' çalıştırın.")
-        return False
-    except Exception as e:
-        print(f"❌ TTS hatası: {str(e)}")
-        return False
-
-def create_audio_files(steps: List[Dict], output_dir: str, tts_provider: str = "edge", api_key: str = None) -> List[str]:
-    """Tüm adımlar için ses dosyaları oluşturur"""
-    audio_files = []
-    os.makedirs(output_dir, exist_ok=True)
-    
-    print(f"\n📢 {len(steps)} adım için ses dosyaları oluşturuluyor...")
-    
-    for i, step in enumerate(steps):
-        audio_file = os.path.join(output_dir, f"audio_{i:03d}.mp3")
-        
-        if tts_provider == "edge":
-            success = text_to_speech_edge(step['text'], audio_file)
-        else:
-            print(f"❌ Bilinmeyen TTS provider: {tts_provider}")
-            success = False
-        
-        if success:
-            audio_files.append(audio_file)
-        else:
-            print(f"  ⚠️ Adım {i+1} için ses oluşturulamadı, atlanıyor...")
-    
-    return audio_files
-
-# ============================================================================
-# 4. FFMPEG İŞLEMLERİ
+# 3. FFMPEG İŞLEMLERİ
 # ============================================================================
 
 def check_ffmpeg() -> bool:
@@ -198,23 +152,6 @@ def check_ffmpeg() -> bool:
     except (FileNotFoundError, subprocess.TimeoutExpired):
         return False
 
-def get_video_duration(video_file: str) -> float:
-    """Video dosyasının süresini saniye cinsinden döndürür"""
-    try:
-        result = subprocess.run(
-            ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', 
-             '-of', 'default=noprint_wrappers=1:nokey=1', video_file],
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
-        if result.returncode == 0:
-            return float(result.stdout.strip())
-        return None
-    except Exception as e:
-        print(f"⚠️ Video süresi öğrenilemedi: {str(e)}")
-        return None
-
 def scale_audio_to_duration(audio_file: str, target_duration: float, output_file: str) -> bool:
     """Ses dosyasını hedef süreye göre ölçeklendirir (hızlandırır veya yavaşlatır)"""
     try:
@@ -333,7 +270,7 @@ def merge_video_audio(video_file: str, audio_file: str, output_file: str, subtit
         return False
 
 # ============================================================================
-# 5. ANA FONKSİYON
+# 4. ANA FONKSİYON
 # ============================================================================
 
 def main():
@@ -398,7 +335,8 @@ def main():
     # 5. Ses dosyalarını oluştur
     audio_files = []
     print(f"\n5️⃣ Ses dosyaları oluşturuluyor ({tts_provider})...")
-    audio_files = create_audio_files(steps, temp_audio_dir, tts_provider, None)
+    tts_cache = TTSClipCache.from_env()
+    audio_files = create_audio_files(steps, temp_audio_dir, tts_provider, None, cache=tts_cache)
     
     if audio_files:
         # Ses dosyalarını birleştir
@@ -440,7 +378,7 @@ def main():
     # 8. Temizlik
     print("\n8️⃣ Geçici dosyalar temizleniyor...")
     if os.path.exists(temp_audio_dir):
-        for audio_file in audio_files:
+        for audio_file in set(audio_files):
             if os.path.exists(audio_file):
                 os.remove(audio_file)
         try:
@@ -459,6 +397,7 @@ def main():
     print("✅ İşlem tamamlandı!")
     print(f"📹 Final video: {final_video}")
     print(f"📝 Subtitle: {srt_file}")
+    tts_cache.print_stats()
     print("=" * 60)
 
 if __name__ == "__main__":
@@ -11,6 +11,8 @@ import subprocess
 from pathlib import Path
 from typing import List, Dict
 
+from create_video_with_audio import create_audio_files, get_video_duration, TTSClipCache
+
 # ============================================================================
 # 1. CYPRESS TEST DOSYASINI PARSE ET - SADE VERSİYON
 # ============================================================================
@@ -78,43 +80,7 @@ def create_srt_subtitle(steps: List[Dict], output_file: str, scale_factor: float
     print(f"✅ SRT subtitle oluşturuldu: {output_file}")
 
 # ============================================================================
-# 3. TEXT-TO-SPEECH (TTS)
-# ============================================================================
-
-def text_to_speech_edge(text: str, output_audio: str, voice: str = "tr-TR-EmelNeural") -> bool:
-    """Microsoft Edge TTS ile ses oluşturur"""
-    try:
-        import edge_tts
-        import asyncio
-        
-        async def generate_speech():
-            communicate = edge_tts.Communicate(text, voice)
-            await communicate.save(output_audio)
-        
-        asyncio.run(generate_speech())
-        print(f"  ✅ Ses: {text}")
-        return True
-        
-    except Exception as e:
-        print(f"❌ TTS hatası: {str(e)}")
-        return False
-
-def create_audio_files(steps: List[Dict], output_dir: str) -> List[str]:
-    """Ses dosyaları oluşturur"""
-    audio_files = []
-    os.makedirs(output_dir, exist_ok=True)
-    
-    print(f"\n📢 {len(steps)} adım için ses dosyaları oluşturuluyor...")
-    
-    for i, step in enumerate(steps):
-        audio_file = os.path.join(output_dir, f"audio_{i:03d}.mp3")
-        if text_to_speech_edge(step['text'], audio_file):
-            audio_files.append(audio_file)
-    
-    return audio_files
-
-# ============================================================================
-# 4. FFMPEG İŞLEMLERİ
+# 3. FFMPEG İŞLEMLERİ
 # ============================================================================
 
 def check_ffmpeg() -> bool:
@@ -126,20 +92,6 @@ def check_ffmpeg() -> bool:
     except:
         return False
 
-def get_video_duration(video_file: str) -> float:
-    """Video süresini öğren"""
-    try:
-        result = subprocess.run(
-            ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', 
-             '-of', 'default=noprint_wrappers=1:nokey=1', video_file],
-            capture_output=True, text=True, timeout=10
-        )
-        if result.returncode == 0:
-            return float(result.stdout.strip())
-        return None
-    except:
-        return None
-
 def scale_audio_to_duration(audio_file: str, target_duration: float, output_file: str) -> bool:
     """Ses dosyasını hedef süreye göre ölçeklendirir"""
     try:
@@ -235,7 +187,7 @@ def merge_video_audio(video_file: str, audio_file: str, output_file: str, subtit
         return False
 
 # ============================================================================
-# 5. ANA FONKSİYON
+# 4. ANA FONKSİYON
 # ============================================================================
 
 def main():
@@ -275,7 +227,8 @@ def main():
     # 4. Ses dosyalarını oluştur (39 saniye hedef)
     target_audio_duration = 39.0
     print(f"\n4️⃣ {target_audio_duration:.0f} saniyelik ses oluşturuluyor...")
-    audio_files = create_audio_files(steps, temp_audio_dir)
+    tts_cache = TTSClipCache.from_env()
+    audio_files = create_audio_files(steps, temp_audio_dir, cache=tts_cache)
     
     if audio_files:
         merge_audio_files(audio_files, merged_audio)
@@ -313,7 +266,7 @@ def main():
     # 7. Temizlik
     print(f"\n7️⃣ Temizlik yapılıyor...")
     if os.path.exists(temp_audio_dir):
-        for audio_file in audio_files:
+        for audio_file in set(audio_files):
             if os.path.exists(audio_file):
                 os.remove(audio_file)
         try:
@@ -331,6 +284,7 @@ def main():
     print("\n" + "=" * 60)
     print("✅ İşlem tamamlandı!")
     print(f"📹 Final video: {final_video}")
+    tts_cache.print_stats()
     print("=" * 60)
 
 if __name__ == "__main__":
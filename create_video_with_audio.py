@@ -8,124 +8,290 @@ TTS ile ses üretir ve FFmpeg ile video+ses birleştirir.
 
 import re
 import os
+import array
 import json
 import subprocess
 import sys
+import time
+import asyncio
+import shutil
+import hashlib
+import threading
+import contextlib
+import wave
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Tuple
+
+from cypress_lexer import parse_spec_file, iter_block_events
+from mp3_frames import read_mp3_info, concat_mp3_files, trim_mp3_file
+from mp4_boxes import read_mp4_info
 
 # ============================================================================
 # 1. CYPRESS TEST DOSYASINI PARSE ET
 # ============================================================================
 
-def parse_cypress_test(cypress_file: str) -> List[Dict]:
-    """Cypress test dosyasını parse edip adımları çıkarır"""
-    with open(cypress_file, 'r', encoding='utf-8') as f:
-        content = f.read()
+# Anlatılacak cy komutları (zincirin ilk komutu)
+NARRATED_COMMANDS = ['visit', 'get', 'type', 'click', 'contains', 'should']
+
+# Komutların videoda yaklaşık süreleri (saniye). cy.wait(ms) kendi süresini kullanır.
+COMMAND_DURATIONS = {
+    'visit': 1.5,
+    'get': 0.2,
+    'contains': 0.2,
+    'type': 0.5,
+    'click': 0.3,
+    'select': 0.3,
+    'should': 0.1,
+    'url': 0.1,
+    'first': 0.0,
+    'last': 0.0,
+}
+DEFAULT_COMMAND_DURATION = 0.5  # Bilinmeyen / custom komutlar (ör. cy.login)
+TYPE_DELAY_PER_CHAR = 0.01      # Cypress'in varsayılan tuş gecikmesi (10 ms)
+MIN_STEP_GAP = 1.0              # Komut logunda aynı anda düşen adımlar arasındaki en kısa aralık
+TEST_GAP = 0.5                  # Testler arası geçiş süresi
+SPEECH_CHARS_PER_SECOND = 14.0  # TTS okuma hızı tahmini (boşluk ve noktalama dahil karakter)
+
+def estimate_speech_duration(text: str) -> float:
+    """Adım metninin seslendirilmesinin yaklaşık ne kadar süreceğini tahmin eder"""
+    return round(len(text) / SPEECH_CHARS_PER_SECOND, 3)
+
+def estimate_command_duration(command: Dict) -> float:
+    """Tek bir cy komutunun videoda ne kadar sürdüğünü tahmin eder"""
+    name = command['name']
+    args = command['args'].strip()
     
-    steps = []
-    current_time = 0
-    
-    # Test bloklarını bul (it('...', () => { ... }))
-    # Daha güvenli parsing: it('...', () => { ile başlayan blokları bul
-    test_pattern = r"it\('([^']+)',\s*\(\)\s*=>\s*\{"
-    test_matches = list(re.finditer(test_pattern, content))
-    
-    test_blocks = []
-    for i, match in enumerate(test_matches):
-        start_pos = match.end()
-        # Bir sonraki test'in başlangıcını bul veya dosya sonuna kadar
-        if i + 1 < len(test_matches):
-            end_pos = test_matches[i + 1].start()
+    if name == 'wait':
+        # cy.wait(2000) -> 2 saniye; cy.wait('@alias') gibi durumlarda varsayılan
+        first_arg = args.split(',')[0].strip()
+        if first_arg.isdigit():
+            return int(first_arg) / 1000
+        return DEFAULT_COMMAND_DURATION
+    
+    if name == 'type' and args[:1] in ("'", '"', '`'):
+        # Sabit metin yazılıyorsa karakter başına gecikme
+        text = args.split(',')[0].strip()[1:-1]
+        return max(COMMAND_DURATIONS['type'], len(text) * TYPE_DELAY_PER_CHAR)
+    
+    return COMMAND_DURATIONS.get(name, DEFAULT_COMMAND_DURATION)
+
+def estimate_block_duration(block: Dict) -> float:
+    """Bir bloktaki (ör. beforeEach) tüm cy zincirlerinin toplam süresini tahmin eder"""
+    return sum(
+        estimate_command_duration(command)
+        for event in iter_block_events(block) if event['kind'] == 'chain'
+        for command in event['commands']
+    )
+
+def build_step_timeline(test: Dict, start_time: float) -> Tuple[List[Dict], float]:
+    """Testin yorumlarını ve cy komutlarını kaynak sırasıyla adımlara çevirir
+    
+    Her adımın başlangıç zamanı sadece testin yaptıklarından, yani kendisinden
+    önceki komutların süreleri (COMMAND_DURATIONS, yazılan metin uzunluğu) ve
+    cy.wait(ms) çağrılarından hesaplanır. Adımın süresi bir sonraki adıma
+    kadar olan boşluktur; tahmini konuşma süresi bunun sadece alt sınırıdır.
+    Üst üste binen anlatımlar ses yerleşiminde (place_clip) sıraya konur.
+    
+    Returns:
+        (adımlar, testin bittiği zaman)
+    """
+    steps = [{
+        'time': start_time,
+        'duration': 2,
+        'text': f"Test: {test['name']}",
+        'type': 'test_title',
+        'test': test['name']
+    }]
+    clock = start_time
+    
+    for event in iter_block_events(test):
+        command = None
+        if event['kind'] == 'comment':
+            text = translate_comment(event['text']) if event['text'] and not event['block'] else None
         else:
-            end_pos = len(content)
-        
-        test_name = match.group(1)
-        test_body = content[start_pos:end_pos]
-        # Kapanış parantezini bul
-        brace_count = 1
-        body_end = 0
-        for j, char in enumerate(test_body):
-            if char == '{':
-                brace_count += 1
-            elif char == '}':
-                brace_count -= 1
-                if brace_count == 0:
-                    body_end = j
-                    break
-        
-        if body_end > 0:
-            test_body = test_body[:body_end]
-            test_blocks.append((test_name, test_body))
-    
-    for test_name, test_body in test_blocks:
-        # Test başlığı
-        steps.append({
-            'time': current_time,
-            'duration': 2,
-            'text': f"Test: {test_name}",
-            'type': 'test_title'
-        })
-        current_time += 2
+            root = event['commands'][0]
+            text = None
+            if root['name'] in NARRATED_COMMANDS:
+                command = root['name']
+                text = explain_cypress_command(root['name'], root['args'])
         
-        # Yorumları bul ve çevir
-        comments = re.findall(r'//\s*(.+)', test_body)
-        for comment in comments:
-            # İngilizce yorumları Türkçe'ye çevir
-            turkish_comment = translate_comment(comment)
+        if text:
             steps.append({
-                'time': current_time,
-                'duration': 3,
-                'text': turkish_comment,
-                'type': 'action'
+                'time': round(clock, 3),
+                'duration': 2,
+                'text': text,
+                'type': 'action',
+                'offset': event['start'],
+                'test': test['name'],
+                'command': command
             })
-            current_time += 3
-        
-        # Cypress komutlarını bul ve açıkla
-        cy_commands = re.findall(r'cy\.([^(]+)\(([^)]*)\)', test_body)
-        for command, params in cy_commands:
-            if command.strip() in ['visit', 'get', 'type', 'click', 'contains', 'should']:
-                explanation = explain_cypress_command(command.strip(), params)
-                if explanation:
-                    steps.append({
-                        'time': current_time,
-                        'duration': 2,
-                        'text': explanation,
-                        'type': 'action'
-                    })
-                    current_time += 2
+        
+        if event['kind'] == 'chain':
+            clock += sum(estimate_command_duration(command) for command in event['commands'])
+    
+    # Her adım bir sonraki adıma kadar (en az tahmini konuşma süresi kadar) sürer;
+    # son adım testin sonuna kadar
+    for current, following in zip(steps, steps[1:] + [None]):
+        next_time = following['time'] if following else clock
+        current['duration'] = round(max(next_time - current['time'], estimate_speech_duration(current['text'])), 3)
+    end_time = max(clock, max(step['time'] + step['duration'] for step in steps))
+    
+    return steps, end_time
+
+def parse_cypress_test(cypress_file: str) -> List[Dict]:
+    """Cypress test dosyasını parse edip adımları kaynak sırasıyla çıkarır
+    
+    Dosya cypress_lexer ile tek geçişte token'lara ayrılır; string, template
+    literal, regex ve yorum içindeki parantez/süslü parantezler test
+    sınırlarını bozmaz. Adım zamanları komut süreleri ve cy.wait çağrılarından
+    türetilen zaman çizelgesine göre hesaplanır; before/beforeEach gibi
+    hook'ların süresi de çizelgeye eklenir.
+    """
+    spec = parse_spec_file(cypress_file)
+    hook_durations = {keyword: 0.0 for keyword in ('before', 'beforeEach', 'afterEach', 'after')}
+    for hook in spec['hooks']:
+        hook_durations[hook['keyword']] += estimate_block_duration(hook)
+    
+    steps = []
+    current_time = hook_durations['before']
+    
+    for test in spec['tests']:
+        current_time += hook_durations['beforeEach']
+        test_steps, current_time = build_step_timeline(test, current_time)
+        steps.extend(test_steps)
         
         # Testler arası boşluk
-        current_time += 1
+        current_time += hook_durations['afterEach'] + TEST_GAP
     
     return steps
 
+# ============================================================================
+# 1.1 CYPRESS KOMUT LOGU (GERÇEK ZAMAN DAMGALARI)
+# ============================================================================
+
+def command_log_path(video_file: str, spec_name: str) -> str:
+    """Videoyla aynı klasördeki spec komut logunun yolu (ör. admin/login.cy.js.commands.json)
+    
+    Video adı zaman damgası içerebildiği için log video adıyla değil spec adıyla aranır.
+    """
+    return os.path.join(os.path.dirname(video_file), f"{spec_name}.commands.json")
+
+def load_command_log(video_file: str, spec_name: str) -> Dict:
+    """frontend/cypress/support/commandLog.js'in yazdığı komut logunu okur (yoksa None)
+    
+    Zamanlar videonun başından itibaren saniye cinsindendir.
+    """
+    log_file = command_log_path(video_file, spec_name)
+    if not os.path.exists(log_file):
+        return None
+    try:
+        with open(log_file, 'r', encoding='utf-8') as f:
+            log = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Komut logu okunamadı ({log_file}): {e}")
+        return None
+    if not log.get('commands'):
+        return None
+    return log
+
+def align_steps_to_command_log(steps: List[Dict], log: Dict) -> Tuple[List[Dict], int]:
+    """Adım zamanlarını komut logundaki gerçek zamanlarla değiştirir
+    
+    Her test için komut adımları, logdaki aynı testin aynı isimli komutlarıyla
+    sırayla eşleştirilir; beforeEach gibi hook'larda çalışan komutlar
+    (hook: true) eşleştirmeye katılmaz. Yorum adımları kendisinden sonra çalışan ilk
+    komutun zamanını, test başlıkları testin başlangıç zamanını alır.
+    Eşleşmeyen adımlar bir önceki adımdan MIN_STEP_GAP sonra konur; aynı
+    anda düşen adımlar da en az MIN_STEP_GAP aralıkla sıralanır.
+    
+    Returns:
+        (yeni adım listesi, logdan zaman alan adım sayısı)
+    """
+    commands_by_test = {}
+    for command in log['commands']:
+        if command.get('start') is not None and not command.get('hook'):
+            commands_by_test.setdefault(command.get('test'), []).append(command)
+    test_starts = {test['title']: test['start'] for test in log.get('tests', [])}
+    
+    aligned = []
+    matched = 0
+    cursor = {}
+    for step in steps:
+        step = dict(step)
+        test_commands = commands_by_test.get(step.get('test'), [])
+        position = cursor.get(step.get('test'), 0)
+        time_at = None
+        
+        if step['type'] == 'test_title':
+            time_at = test_starts.get(step.get('test'))
+            if time_at is None and test_commands:
+                time_at = test_commands[0]['start']
+        elif step.get('command'):
+            for i in range(position, len(test_commands)):
+                if test_commands[i]['name'] == step['command']:
+                    time_at = test_commands[i]['start']
+                    cursor[step.get('test')] = i + 1
+                    break
+        elif position < len(test_commands):
+            # Yorum: kendisinden sonra çalışan ilk komutla birlikte başlar
+            time_at = test_commands[position]['start']
+        
+        # Aynı anda düşen adımlar (ör. art arda yorumlar) en az MIN_STEP_GAP aralıkla sıralanır
+        earliest = aligned[-1]['time'] + MIN_STEP_GAP if aligned else 0.0
+        if time_at is None:
+            time_at = earliest
+        else:
+            matched += 1
+        step['time'] = round(max(time_at, earliest), 3)
+        aligned.append(step)
+    
+    # Her adım bir sonraki adıma kadar sürer; son adım son komutun bitişine kadar
+    ends = [command.get('end') or command['start'] for command in log['commands'] if command.get('start') is not None]
+    end_time = max(ends + [aligned[-1]['time'] + MIN_STEP_GAP]) if aligned else 0.0
+    for current, following in zip(aligned, aligned[1:] + [None]):
+        next_time = following['time'] if following else end_time
+        current['duration'] = round(max(next_time - current['time'], 0.0), 3)
+    
+    return aligned, matched
+
+# Yorum çevirileri: tam eşleşme yoksa İngilizce ifadenin yorumda geçmesi yeterlidir
+COMMENT_TRANSLATIONS = {
+    'Verify we\'re on the login page': 'Giriş sayfasında olduğumuzu doğruluyoruz',
+    'Fill in login form': 'Giriş formunu dolduruyoruz',
+    'Submit login form': 'Giriş formunu gönderiyoruz',
+    'Wait for redirect to dashboard': 'Dashboard\'a yönlendirmeyi bekliyoruz',
+    'Login first': 'Önce giriş yapıyoruz',
+    'Wait for dashboard to load': 'Dashboard\'ın yüklenmesini bekliyoruz',
+    'Navigate to Patients page': 'Hastalar sayfasına gidiyoruz',
+    'Navigate to Departments page': 'Departmanlar sayfasına gidiyoruz',
+    'Click on "Yeni Hasta" button': '"Yeni Hasta" butonuna tıklıyoruz',
+    'Click on "Yeni Departman" button': '"Yeni Departman" butonuna tıklıyoruz',
+    'Fill in patient form': 'Hasta formunu dolduruyoruz',
+    'Fill in department form': 'Departman formunu dolduruyoruz',
+    'Submit the form': 'Formu gönderiyoruz',
+    'Wait for modal to close and patient to be added': 'Modal\'ın kapanmasını ve hastanın eklenmesini bekliyoruz',
+    'Wait for modal to close and department to be added': 'Modal\'ın kapanmasını ve departmanın eklenmesini bekliyoruz',
+}
+
+# Anlatılan cy komutlarının Türkçe açıklamaları
+COMMAND_EXPLANATIONS = {
+    'visit': 'Sayfayı ziyaret ediyoruz',
+    'get': 'Element seçiyoruz',
+    'type': 'Metin yazıyoruz',
+    'click': 'Tıklıyoruz',
+    'contains': 'İçeriği kontrol ediyoruz',
+    'should': 'Doğrulama yapıyoruz',
+}
+
 def translate_comment(comment: str) -> str:
     """İngilizce yorumları Türkçe'ye çevir"""
-    translations = {
-        'Verify we\'re on the login page': 'Giriş sayfasında olduğumuzu doğruluyoruz',
-        'Fill in login form': 'Giriş formunu dolduruyoruz',
-        'Submit login form': 'Giriş formunu gönderiyoruz',
-        'Wait for redirect to dashboard': 'Dashboard\'a yönlendirmeyi bekliyoruz',
-        'Login first': 'Önce giriş yapıyoruz',
-        'Wait for dashboard to load': 'Dashboard\'ın yüklenmesini bekliyoruz',
-        'Navigate to Patients page': 'Hastalar sayfasına gidiyoruz',
-        'Navigate to Departments page': 'Departmanlar sayfasına gidiyoruz',
-        'Click on "Yeni Hasta" button': '"Yeni Hasta" butonuna tıklıyoruz',
-        'Click on "Yeni Departman" button': '"Yeni Departman" butonuna tıklıyoruz',
-        'Fill in patient form': 'Hasta formunu dolduruyoruz',
-        'Fill in department form': 'Departman formunu dolduruyoruz',
-        'Submit the form': 'Formu gönderiyoruz',
-        'Wait for modal to close and patient to be added': 'Modal\'ın kapanmasını ve hastanın eklenmesini bekliyoruz',
-        'Wait for modal to close and department to be added': 'Modal\'ın kapanmasını ve departmanın eklenmesini bekliyoruz',
-    }
-    
     # Tam eşleşme varsa çevir
-    if comment in translations:
-        return translations[comment]
+    if comment in COMMENT_TRANSLATIONS:
+        return COMMENT_TRANSLATIONS[comment]
     
     # Kısmi eşleşme kontrolü
-    for eng, tur in translations.items():
+    for eng, tur in COMMENT_TRANSLATIONS.items():
         if eng.lower() in comment.lower():
             return tur
     
@@ -133,17 +299,8 @@ def translate_comment(comment: str) -> str:
 
 def explain_cypress_command(command: str, params: str) -> str:
     """Cypress komutlarını Türkçe açıklamaya çevir"""
-    explanations = {
-        'visit': 'Sayfayı ziyaret ediyoruz',
-        'get': 'Element seçiyoruz',
-        'type': 'Metin yazıyoruz',
-        'click': 'Tıklıyoruz',
-        'contains': 'İçeriği kontrol ediyoruz',
-        'should': 'Doğrulama yapıyoruz',
-    }
-    
-    if command in explanations:
-        return explanations[command]
+    if command in COMMAND_EXPLANATIONS:
+        return COMMAND_EXPLANATIONS[command]
     return None
 
 # ============================================================================
@@ -180,32 +337,88 @@ def create_srt_subtitle(steps: List[Dict], output_file: str, scale_factor: float
     else:
         print(f"✅ SRT subtitle oluşturuldu: {output_file}")
 
+def parse_srt_time(value: str) -> float:
+    """SRT zamanını (00:00:00,000) saniyeye çevirir"""
+    clock, _, millis = value.strip().partition(',')
+    hours, minutes, secs = (int(part) for part in clock.split(':'))
+    return hours * 3600 + minutes * 60 + secs + int(millis or 0) / 1000
+
+def read_srt_subtitle(srt_file: str) -> List[Dict]:
+    """SRT dosyasını [{'start', 'end', 'text'}] listesine çevirir"""
+    with open(srt_file, 'r', encoding='utf-8') as f:
+        blocks = f.read().strip().split('\n\n')
+    
+    entries = []
+    for block in blocks:
+        lines = block.strip().splitlines()
+        if len(lines) < 2 or '-->' not in lines[1]:
+            continue
+        start, _, end = lines[1].partition('-->')
+        entries.append({
+            'start': parse_srt_time(start),
+            'end': parse_srt_time(end),
+            'text': "\n".join(lines[2:])
+        })
+    return entries
+
+def slice_srt_subtitle(srt_file: str, start: float, end: float, output_file: str) -> int:
+    """[start, end) aralığına düşen subtitle'ları 0'dan başlayacak şekilde kaydırıp yazar
+    
+    Aralığın sınırını aşan satırlar aralığa kırpılır.
+    
+    Returns:
+        Yazılan subtitle sayısı
+    """
+    count = 0
+    with open(output_file, 'w', encoding='utf-8') as f:
+        for entry in read_srt_subtitle(srt_file):
+            if entry['end'] <= start or entry['start'] >= end:
+                continue
+            count += 1
+            f.write(f"{count}\n")
+            f.write(f"{format_time(max(entry['start'], start) - start)} --> "
+                    f"{format_time(min(entry['end'], end) - start)}\n")
+            f.write(f"{entry['text']}\n\n")
+    return count
+
 # ============================================================================
 # 3. TEXT-TO-SPEECH (TTS) İŞLEMLERİ
 # ============================================================================
 
-def text_to_speech_elevenlabs(text: str, output_audio: str, api_key: str, voice_id: str = "21m00Tcm4TlvDq8ikWAM") -> bool:
+# Provider varsayılanları - cache anahtarı da bu değerlerden üretilir
+EDGE_VOICE = "tr-TR-EmelNeural"
+ELEVENLABS_VOICE_ID = "21m00Tcm4TlvDq8ikWAM"
+ELEVENLABS_MODEL_ID = "eleven_multilingual_v2"
+ELEVENLABS_VOICE_SETTINGS = {
+    "stability": 0.5,
+    "similarity_boost": 0.5
+}
+GOOGLE_LANGUAGE_CODE = "tr-TR"
+GOOGLE_VOICE = "tr-TR-Wavenet-D"
+
+def elevenlabs_request(text: str, api_key: str, voice_id: str = ELEVENLABS_VOICE_ID) -> Tuple[str, Dict, Dict]:
+    """Eleven Labs TTS isteğinin (url, headers, body) değerlerini oluşturur"""
+    url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
+    
+    headers = {
+        "Accept": "audio/mpeg",
+        "Content-Type": "application/json",
+        "xi-api-key": api_key
+    }
+    
+    data = {
+        "text": text,
+        "model_id": ELEVENLABS_MODEL_ID,
+        "voice_settings": ELEVENLABS_VOICE_SETTINGS
+    }
+    return url, headers, data
+
+def text_to_speech_elevenlabs(text: str, output_audio: str, api_key: str, voice_id: str = ELEVENLABS_VOICE_ID) -> bool:
     """Eleven Labs API ile ses oluşturur"""
     try:
         import requests
         
-        url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
-        
-        headers = {
-            "Accept": "audio/mpeg",
-            "Content-Type": "application/json",
-            "xi-api-key": api_key
-        }
-        
-        data = {
-            "text": text,
-            "model_id": "eleven_multilingual_v2",
-            "voice_settings": {
-                "stability": 0.5,
-                "similarity_boost": 0.5
-            }
-        }
-        
+        url, headers, data = elevenlabs_request(text, api_key, voice_id)
         response = requests.post(url, json=data, headers=headers, timeout=30)
         
         if response.status_code == 200:
@@ -224,30 +437,34 @@ def text_to_speech_elevenlabs(text: str, output_audio: str, api_key: str, voice_
         print(f"❌ TTS hatası: {str(e)}")
         return False
 
+def synthesize_google_mp3(text: str) -> bytes:
+    """Google Cloud TTS ile metni MP3 byte'larına çevirir (ImportError fırlatabilir)"""
+    from google.cloud import texttospeech
+    
+    client = texttospeech.TextToSpeechClient()
+    
+    synthesis_input = texttospeech.SynthesisInput(text=text)
+    voice = texttospeech.VoiceSelectionParams(
+        language_code=GOOGLE_LANGUAGE_CODE,
+        name=GOOGLE_VOICE
+    )
+    audio_config = texttospeech.AudioConfig(
+        audio_encoding=texttospeech.AudioEncoding.MP3
+    )
+    
+    response = client.synthesize_speech(
+        input=synthesis_input,
+        voice=voice,
+        audio_config=audio_config
+    )
+    return response.audio_content
+
 def text_to_speech_google(text: str, output_audio: str, api_key: str = None) -> bool:
     """Google Cloud TTS ile ses oluşturur (alternatif)"""
     try:
-        from google.cloud import texttospeech
-        
-        client = texttospeech.TextToSpeechClient()
-        
-        synthesis_input = texttospeech.SynthesisInput(text=text)
-        voice = texttospeech.VoiceSelectionParams(
-            language_code="tr-TR",
-            name="tr-TR-Wavenet-D"
-        )
-        audio_config = texttospeech.AudioConfig(
-            audio_encoding=texttospeech.AudioEncoding.MP3
-        )
-        
-        response = client.synthesize_speech(
-            input=synthesis_input,
-            voice=voice,
-            audio_config=audio_config
-        )
-        
+        audio_content = synthesize_google_mp3(text)
         with open(output_audio, 'wb') as f:
-            f.write(response.audio_content)
+            f.write(audio_content)
         
         print(f"  ✅ Ses oluşturuldu: {text[:50]}...")
         return True
@@ -259,17 +476,13 @@ def text_to_speech_google(text: str, output_audio: str, api_key: str = None) ->
         print(f"❌ TTS hatası: {str(e)}")
         return False
 
-def text_to_speech_edge(text: str, output_audio: str, voice: str = "tr-TR-EmelNeural") -> bool:
-    """Microsoft Edge TTS ile ses oluşturur (ÜCRETSİZ, API key gerekmez)"""
+async def text_to_speech_edge_async(text: str, output_audio: str, voice: str = EDGE_VOICE) -> bool:
+    """Microsoft Edge TTS ile ses oluşturur (mevcut event loop içinde çalışır)"""
     try:
         import edge_tts
-        import asyncio
         
-        async def generate_speech():
-            communicate = edge_tts.Communicate(text, voice)
-            await communicate.save(output_audio)
-        
-        asyncio.run(generate_speech())
+        communicate = edge_tts.Communicate(text, voice)
+        await communicate.save(output_audio)
         print(f"  ✅ Ses oluşturuldu: {text[:50]}...")
         return True
         
@@ -280,33 +493,474 @@ def text_to_speech_edge(text: str, output_audio: str, voice: str = "tr-TR-EmelNe
         print(f"❌ TTS hatası: {str(e)}")
         return False
 
-def create_audio_files(steps: List[Dict], output_dir: str, tts_provider: str = "edge", api_key: str = None) -> List[str]:
-    """Tüm adımlar için ses dosyaları oluşturur"""
-    audio_files = []
-    os.makedirs(output_dir, exist_ok=True)
+def text_to_speech_edge(text: str, output_audio: str, voice: str = EDGE_VOICE) -> bool:
+    """Microsoft Edge TTS ile ses oluşturur (ÜCRETSİZ, API key gerekmez)"""
+    return asyncio.run(text_to_speech_edge_async(text, output_audio, voice))
+
+async def stream_tts_chunks(text: str, tts_provider: str, api_key: str = None):
+    """Provider'dan gelen MP3 parçalarını geldikçe döndüren async generator
+    
+    Edge TTS `stream()` ile, Eleven Labs HTTP yanıt gövdesi parça parça okunur;
+    Google tek parça döndürür. Bloklayıcı istemciler thread pool'da çalışır.
+    Hata durumunda exception fırlatır.
+    """
+    loop = asyncio.get_running_loop()
+    
+    if tts_provider == "edge":
+        import edge_tts
+        async for chunk in edge_tts.Communicate(text, EDGE_VOICE).stream():
+            if chunk["type"] == "audio":
+                yield chunk["data"]
+    elif tts_provider == "elevenlabs":
+        import requests
+        url, headers, data = elevenlabs_request(text, api_key)
+        response = await loop.run_in_executor(
+            None, lambda: requests.post(url, json=data, headers=headers, timeout=30, stream=True))
+        if response.status_code != 200:
+            raise RuntimeError(f"Eleven Labs hatası ({response.status_code}): {response.text[:100]}")
+        chunks = response.iter_content(chunk_size=16384)
+        while True:
+            chunk = await loop.run_in_executor(None, next, chunks, None)
+            if chunk is None:
+                break
+            yield chunk
+    elif tts_provider == "google":
+        yield await loop.run_in_executor(None, synthesize_google_mp3, text)
+    else:
+        raise ValueError(f"Bilinmeyen TTS provider: {tts_provider}")
+
+# ============================================================================
+# 3.1 ASENKRON TTS MOTORU
+# ============================================================================
+
+# Aynı anda en fazla kaç TTS isteği gönderileceği (TTS_CONCURRENCY ile değiştirilebilir)
+DEFAULT_TTS_CONCURRENCY = 8
+
+def get_tts_concurrency() -> int:
+    """TTS_CONCURRENCY environment variable'ından eşzamanlılık limitini okur"""
+    try:
+        return max(1, int(os.getenv("TTS_CONCURRENCY", DEFAULT_TTS_CONCURRENCY)))
+    except ValueError:
+        return DEFAULT_TTS_CONCURRENCY
+
+async def synthesize_step_async(text: str, output_audio: str, tts_provider: str, api_key: str = None) -> bool:
+    """Tek bir metni seçilen provider ile sese çevirir
+    
+    Edge TTS doğrudan event loop üzerinde çalışır; requests ve Google istemcisi
+    bloklayıcı olduğu için thread pool'a gönderilir.
+    """
+    loop = asyncio.get_running_loop()
+    
+    if tts_provider == "edge":
+        return await text_to_speech_edge_async(text, output_audio)
+    elif tts_provider == "elevenlabs":
+        return await loop.run_in_executor(None, text_to_speech_elevenlabs, text, output_audio, api_key)
+    elif tts_provider == "google":
+        return await loop.run_in_executor(None, text_to_speech_google, text, output_audio, api_key)
+    
+    print(f"❌ Bilinmeyen TTS provider: {tts_provider}")
+    return False
+
+async def synthesize_steps_async(jobs: List[Dict], tts_provider: str, api_key: str = None,
+                                 concurrency: int = DEFAULT_TTS_CONCURRENCY) -> List[Dict]:
+    """TTS işlerini tek event loop içinde, sınırlı eşzamanlılıkla çalıştırır
+    
+    Args:
+        jobs: {'index', 'text', 'file'} anahtarlarını içeren iş listesi
+        tts_provider: edge, elevenlabs veya google
+        api_key: Provider API key'i (gerekiyorsa)
+        concurrency: Aynı anda çalışacak en fazla istek sayısı
+    
+    Returns:
+        İş listesiyle aynı sırada sonuçlar ('success' ve 'latency' eklenmiş)
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    
+    async def run_job(job: Dict) -> Dict:
+        async with semaphore:
+            started = time.perf_counter()
+            success = await synthesize_step_async(job['text'], job['file'], tts_provider, api_key)
+            latency = time.perf_counter() - started
+        return dict(job, success=success, latency=latency)
+    
+    # gather sonuçları görev sırasıyla döndürür, tamamlanma sırasıyla değil
+    return await asyncio.gather(*(run_job(job) for job in jobs))
+
+def synthesize_steps(jobs: List[Dict], tts_provider: str = "edge", api_key: str = None,
+                     concurrency: int = None) -> List[Dict]:
+    """synthesize_steps_async için senkron giriş noktası (tek asyncio.run çağrısı)"""
+    if concurrency is None:
+        concurrency = get_tts_concurrency()
+    return asyncio.run(synthesize_steps_async(jobs, tts_provider, api_key, concurrency))
+
+def print_tts_latency_report(results: List[Dict], wall_time: float):
+    """Adım başına TTS gecikmesini ve toplam kazancı yazdırır"""
+    if not results:
+        return
+    
+    print("\n⏱️ TTS gecikme raporu:")
+    for result in results:
+        status = "✅" if result['success'] else "❌"
+        print(f"  {status} Adım {result['index']+1:03d}: {result['latency']:.2f}s - {result['text'][:40]}")
+    
+    total_latency = sum(r['latency'] for r in results)
+    slowest = max(r['latency'] for r in results)
+    print(f"  Toplam istek süresi: {total_latency:.2f}s, en yavaş adım: {slowest:.2f}s")
+    print(f"  Gerçek süre: {wall_time:.2f}s (sıralı çalışmaya göre x{total_latency / max(wall_time, 1e-6):.1f} hızlı)")
+
+# ============================================================================
+# 3.2 TTS SES KLİBİ CACHE'İ
+# ============================================================================
+
+DEFAULT_TTS_CACHE_DIR = ".tts_cache"
+DEFAULT_TTS_CACHE_MAX_BYTES = 500 * 1024 * 1024  # 500 MB
+
+def tts_voice_params(tts_provider: str) -> Dict:
+    """Provider'ın sesi etkileyen tüm ayarlarını döndürür (cache anahtarı için)"""
+    if tts_provider == "elevenlabs":
+        return {'voice': ELEVENLABS_VOICE_ID, 'model': ELEVENLABS_MODEL_ID,
+                'settings': ELEVENLABS_VOICE_SETTINGS}
+    if tts_provider == "google":
+        return {'voice': GOOGLE_VOICE, 'model': GOOGLE_LANGUAGE_CODE, 'settings': {'encoding': 'MP3'}}
+    return {'voice': EDGE_VOICE, 'model': None, 'settings': {}}
+
+def tts_cache_key(tts_provider: str, text: str) -> str:
+    """(provider, voice, model, text, ayarlar) bilgisinin SHA-256 özetini döndürür"""
+    payload = dict(tts_voice_params(tts_provider), provider=tts_provider, text=text)
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+class TTSClipCache:
+    """Diskte tutulan, içerik adresli ve boyut sınırlı TTS klip cache'i
+    
+    Her klip `<sha256>.mp3` olarak saklanır. Dosyaların mtime değeri son
+    kullanım zamanı olarak güncellenir; toplam boyut bütçeyi aşınca en eski
+    kullanılan klipler silinir (LRU).
+    """
+    
+    def __init__(self, cache_dir: str = DEFAULT_TTS_CACHE_DIR, max_bytes: int = DEFAULT_TTS_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    @classmethod
+    def from_env(cls) -> "TTSClipCache":
+        """TTS_CACHE_DIR ve TTS_CACHE_MAX_BYTES environment variable'larından cache oluşturur"""
+        try:
+            max_bytes = int(os.getenv("TTS_CACHE_MAX_BYTES", DEFAULT_TTS_CACHE_MAX_BYTES))
+        except ValueError:
+            max_bytes = DEFAULT_TTS_CACHE_MAX_BYTES
+        return cls(os.getenv("TTS_CACHE_DIR", DEFAULT_TTS_CACHE_DIR), max_bytes)
+    
+    def path_for(self, key: str, suffix: str = "") -> str:
+        """Klibin (veya suffix ile işaretlenmiş türevinin, ör. kırpılmış hali) cache yolu"""
+        return os.path.join(self.cache_dir, f"{key}{suffix}.mp3")
+    
+    def fetch(self, key: str, output_file: str) -> bool:
+        """Klip cache'te varsa output_file'a kopyalar ve son kullanım zamanını günceller"""
+        cached = self.path_for(key)
+        if not os.path.exists(cached):
+            self.misses += 1
+            return False
+        
+        shutil.copyfile(cached, output_file)
+        os.utime(cached)
+        self.hits += 1
+        return True
     
-    print(f"\n📢 {len(steps)} adım için ses dosyaları oluşturuluyor...")
+    def read(self, key: str) -> bytes:
+        """Klip cache'te varsa içeriğini döndürür (yoksa None) ve son kullanım zamanını günceller"""
+        cached = self.path_for(key)
+        try:
+            with open(cached, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        os.utime(cached)
+        self.hits += 1
+        return data
+    
+    def store_bytes(self, key: str, data: bytes):
+        """Bellekte sentezlenen klibi cache'e ekler"""
+        if not data:
+            return
+        cached = self.path_for(key)
+        tmp_file = f"{cached}.{os.getpid()}.tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_file, cached)
+    
+    def store(self, key: str, audio_file: str, suffix: str = ""):
+        """Yeni sentezlenen klibi (veya türevini) cache'e ekler"""
+        if not os.path.exists(audio_file) or os.path.getsize(audio_file) == 0:
+            return
+        
+        cached = self.path_for(key, suffix)
+        tmp_file = f"{cached}.{os.getpid()}.tmp"
+        shutil.copyfile(audio_file, tmp_file)
+        os.replace(tmp_file, cached)  # Paralel çalışan process'ler yarım dosya görmesin
+    
+    def evict(self):
+        """Toplam boyut bütçeyi aşıyorsa en eski kullanılan klipleri siler"""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith('.mp3'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue  # Başka bir process aynı anda silmiş olabilir
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                self.evictions += 1
+            except OSError:
+                pass
     
+    def print_stats(self):
+        """Hit/miss sayaçlarını yazdırır"""
+        total = self.hits + self.misses
+        ratio = (self.hits / total * 100) if total else 0.0
+        print(f"🗄️ TTS cache: {self.hits} hit, {self.misses} miss (%{ratio:.0f}), {self.evictions} klip silindi")
+
+def deduplicate_steps(steps: List[Dict], output_dir: str, tts_provider: str) -> List[Dict]:
+    """Aynı (metin, ses) çiftine sahip adımları tek bir klip işinde toplar
+    
+    Her iş, metni ilk kullanan adımın numarasıyla adlandırılır ve 'step_indices'
+    alanında bu klibi kullanan tüm adımları tutar.
+    
+    Returns:
+        İlk kullanım sırasına göre benzersiz klip işleri
+    """
+    clips = {}
     for i, step in enumerate(steps):
-        audio_file = os.path.join(output_dir, f"audio_{i:03d}.mp3")
-        
-        if tts_provider == "elevenlabs":
-            success = text_to_speech_elevenlabs(step['text'], audio_file, api_key)
-        elif tts_provider == "google":
-            success = text_to_speech_google(step['text'], audio_file, api_key)
-        elif tts_provider == "edge":
-            success = text_to_speech_edge(step['text'], audio_file)
+        key = tts_cache_key(tts_provider, step['text'])
+        if key not in clips:
+            clips[key] = {
+                'index': i,
+                'text': step['text'],
+                'key': key,
+                'file': os.path.join(output_dir, f"audio_{i:03d}.mp3"),
+                'step_indices': []
+            }
+        clips[key]['step_indices'].append(i)
+    
+    return list(clips.values())
+
+def create_step_audio(steps: List[Dict], output_dir: str, tts_provider: str = "edge", api_key: str = None,
+                      concurrency: int = None, cache: TTSClipCache = None) -> List[str]:
+    """Her adım için klip yolunu döndürür (ses oluşturulamayan adımlar için None)
+    
+    Aynı metne sahip adımlar tek klipte birleştirilir. Önce TTS cache'ine
+    bakılır; cache'te olmayan klipler asenkron TTS motoru üzerinden eşzamanlı
+    sentezlenir ve cache'e eklenir. Aynı metni kullanan adımlar aynı dosyayı
+    gösterir.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    
+    if concurrency is None:
+        concurrency = get_tts_concurrency()
+    
+    jobs = deduplicate_steps(steps, output_dir, tts_provider)
+    
+    print(f"\n📢 {len(steps)} adım için ses dosyaları oluşturuluyor "
+          f"({len(jobs)} benzersiz klip, eşzamanlılık: {concurrency})...")
+    
+    # Cache'te bulunan klipler TTS'e hiç gönderilmez
+    results = {}
+    pending = []
+    for job in jobs:
+        if cache and cache.fetch(job['key'], job['file']):
+            results[job['index']] = dict(job, success=True, latency=0.0)
         else:
-            print(f"❌ Bilinmeyen TTS provider: {tts_provider}")
-            success = False
+            pending.append(job)
+    
+    if pending:
+        started = time.perf_counter()
+        synthesized = synthesize_steps(pending, tts_provider, api_key, concurrency)
+        print_tts_latency_report(synthesized, time.perf_counter() - started)
+        
+        for result in synthesized:
+            results[result['index']] = result
+            if cache and result['success']:
+                cache.store(result['key'], result['file'])
         
-        if success:
+        if cache:
+            cache.evict()
+    else:
+        print("  ✅ Tüm klipler cache'ten alındı, TTS çağrısı yapılmadı")
+    
+    step_files = [None] * len(steps)
+    for job in jobs:
+        result = results[job['index']]
+        for step_index in job['step_indices']:
+            step_files[step_index] = result['file'] if result['success'] else None
+    
+    return step_files
+
+def create_audio_files(steps: List[Dict], output_dir: str, tts_provider: str = "edge", api_key: str = None,
+                       concurrency: int = None, cache: TTSClipCache = None, trim: bool = False) -> List[str]:
+    """Tüm adımlar için ses dosyaları oluşturur
+    
+    Dönen liste adım sırasındadır; ses oluşturulamayan adımlar atlanır.
+    trim True ise klip sessizlikleri TTS_TRIM ayarlarıyla kesilir (render_spec
+    kendi kırpmasını yapar; sade script'ler klipleri olduğu gibi kullanır).
+    """
+    step_files = create_step_audio(steps, output_dir, tts_provider, api_key, concurrency, cache)
+    if trim:
+        trim_step_audio(steps, step_files, tts_provider, cache)
+    
+    audio_files = []
+    for i, audio_file in enumerate(step_files):
+        if audio_file:
             audio_files.append(audio_file)
         else:
             print(f"  ⚠️ Adım {i+1} için ses oluşturulamadı, atlanıyor...")
     
     return audio_files
 
+# ============================================================================
+# 3.3 KLİP SESSİZLİK KIRPMA
+# ============================================================================
+
+# TTS provider'ları klip başına ve sonuna sessizlik ekler; bu sessizlik
+# yerleşimden ve birleştirmeden önce kesilir (TTS_TRIM=0 ile kapatılır)
+DEFAULT_TRIM_SILENCE_DB = -50.0  # Bu seviyenin altındaki klip başı/sonu sessizlik sayılır
+DEFAULT_TRIM_KEEP_MS = 100  # Sesin iki yanında bırakılan sessizlik (decoder gecikmesini de karşılar)
+
+def get_trim_params() -> Dict:
+    """TTS_TRIM, TTS_TRIM_DB ve TTS_TRIM_KEEP_MS environment variable'larını okur
+    
+    Returns:
+        {'threshold_db', 'keep_ms'} veya kırpma kapalıysa None
+    """
+    if os.getenv("TTS_TRIM", "1") == "0":
+        return None
+    try:
+        threshold_db = float(os.getenv("TTS_TRIM_DB", DEFAULT_TRIM_SILENCE_DB))
+        keep_ms = max(0, int(os.getenv("TTS_TRIM_KEEP_MS", DEFAULT_TRIM_KEEP_MS)))
+    except ValueError:
+        print("⚠️ Geçersiz sessizlik kırpma ayarı, varsayılan değerler kullanılacak")
+        threshold_db, keep_ms = DEFAULT_TRIM_SILENCE_DB, DEFAULT_TRIM_KEEP_MS
+    return {'threshold_db': threshold_db, 'keep_ms': keep_ms}
+
+def trim_cache_suffix(params: Dict) -> str:
+    """Kırpılmış klibin cache'teki adı için ayarlara bağlı ek (ör. '.trim2-50_100')
+    
+    Sürüm numarası (trim2) kesim kuralı değiştiğinde eski kırpılmış klipleri geçersiz kılar.
+    """
+    return f".trim2{params['threshold_db']:g}_{params['keep_ms']}"
+
+def pcm_silence_bounds(pcm: bytes, channels: int, threshold_db: float) -> Tuple[int, int]:
+    """s16le PCM verisinde baştaki ve sondaki sessizlik hariç [başlangıç, bitiş) örnek aralığı
+    
+    Sadece kenarlardaki sessizlik taranır, NumPy gerekmez. Klip tamamen
+    sessizse (0, 0) döner.
+    """
+    samples = array.array('h', pcm[:len(pcm) - len(pcm) % 2])
+    if sys.byteorder == 'big':
+        samples.byteswap()
+    threshold = int(32768 * 10 ** (threshold_db / 20))
+    
+    first = next((i for i, value in enumerate(samples) if abs(value) > threshold), None)
+    if first is None:
+        return 0, 0
+    last = next(i for i in range(len(samples) - 1, first - 1, -1) if abs(samples[i]) > threshold)
+    return first // channels, last // channels + 1
+
+def trim_pcm_silence(pcm: bytes, sample_rate: int, channels: int, params: Dict) -> bytes:
+    """PCM klibin baş/son sessizliğini keser (tamamen sessiz klip olduğu gibi döner)"""
+    start, end = pcm_silence_bounds(pcm, channels, params['threshold_db'])
+    if end == 0:
+        return pcm
+    keep = int(sample_rate * params['keep_ms'] / 1000)
+    frame = channels * STREAM_SAMPLE_WIDTH
+    return pcm[max(0, start - keep) * frame:min(len(pcm) // frame, end + keep) * frame]
+
+async def trim_clip_silence(audio_file: str, params: Dict, cache: TTSClipCache = None,
+                            key: str = None) -> float:
+    """Klibin baş/son sessizliğini MP3 frame sınırında, yeniden encode etmeden keser
+    
+    Sessizlik sınırları klibin PCM'e çevrilmiş hali üzerinde bulunur. Kırpılmış
+    klip, orijinal klibin yanında `<key>.trim<ayarlar>.mp3` olarak cache'lenir;
+    sonraki çalıştırmalarda decode yapılmaz.
+    
+    Returns:
+        Kazanılan süre (saniye)
+    """
+    original = read_mp3_info(audio_file)
+    if not original:
+        return 0.0
+    
+    cached = cache.path_for(key, trim_cache_suffix(params)) if cache and key else None
+    if cached and os.path.exists(cached):
+        shutil.copyfile(cached, audio_file)
+        os.utime(cached)
+    else:
+        pcm, _ = await decode_mp3_to_pcm(read_file_chunks(audio_file), original['sample_rate'],
+                                         original['channels'])
+        start, end = pcm_silence_bounds(pcm, original['channels'], params['threshold_db'])
+        if end == 0:
+            return 0.0  # Tamamen sessiz klip olduğu gibi bırakılır
+        keep = params['keep_ms'] / 1000
+        trim_mp3_file(audio_file, audio_file, max(0.0, start / original['sample_rate'] - keep),
+                      end / original['sample_rate'] + keep)
+        if cached:
+            cache.store(key, audio_file, trim_cache_suffix(params))
+    
+    trimmed = read_mp3_info(audio_file)
+    return max(0.0, original['duration'] - trimmed['duration']) if trimmed else 0.0
+
+def trim_step_audio(steps: List[Dict], step_files: List[str], tts_provider: str = "edge",
+                    cache: TTSClipCache = None, params: Dict = None) -> float:
+    """Adım kliplerinin baş/son sessizliğini yerinde keser ve kazanılan süreyi raporlar
+    
+    Aynı klibi kullanan adımlar aynı dosyayı gösterdiği için her benzersiz
+    klip bir kez kırpılır; klipler eşzamanlı işlenir.
+    
+    Returns:
+        Benzersiz kliplerden kazanılan toplam süre (saniye)
+    """
+    if params is None:
+        params = get_trim_params()
+    if not params:
+        return 0.0
+    
+    clips = {}
+    for step, audio_file in zip(steps, step_files):
+        if audio_file and audio_file not in clips:
+            clips[audio_file] = tts_cache_key(tts_provider, step['text'])
+    if not clips:
+        return 0.0
+    
+    async def trim_all() -> List[float]:
+        semaphore = asyncio.Semaphore(os.cpu_count() or 1)
+        
+        async def trim(audio_file: str, key: str) -> float:
+            async with semaphore:
+                return await trim_clip_silence(audio_file, params, cache, key)
+        return await asyncio.gather(*(trim(audio_file, key) for audio_file, key in clips.items()))
+    
+    try:
+        saved = sum(asyncio.run(trim_all()))
+    except (OSError, RuntimeError) as e:
+        print(f"⚠️ Klip sessizlikleri kırpılamadı: {str(e)}")
+        return 0.0
+    
+    print(f"✂️ Sessizlik kırpıldı: {len(clips)} klipten {saved:.2f} saniye kazanıldı")
+    if cache:
+        cache.evict()
+    return saved
+
 # ============================================================================
 # 4. FFMPEG İŞLEMLERİ
 # ============================================================================
@@ -322,22 +976,188 @@ def check_ffmpeg() -> bool:
     except (FileNotFoundError, subprocess.TimeoutExpired):
         return False
 
-def get_video_duration(video_file: str) -> float:
-    """Video dosyasının süresini saniye cinsinden döndürür"""
+# Probe sonuçları (yol, boyut, mtime) anahtarıyla process içinde saklanır;
+# dosya değişirse anahtar da değişir ve ffprobe yeniden çalışır
+_probe_cache = {}
+_keyframe_cache = {}
+
+def parse_frame_rate(rate: str) -> float:
+    """ffprobe'un '30000/1001' biçimindeki frame rate'ini float'a çevirir"""
+    try:
+        num, _, den = (rate or "0/1").partition('/')
+        den = float(den or 1)
+        return float(num) / den if den else 0.0
+    except ValueError:
+        return 0.0
+
+def probe_media(media_file: str) -> Dict:
+    """Dosya için tek bir `ffprobe -show_format -show_streams` çalıştırır ve sonucu cache'ler
+    
+    Returns:
+        {'duration', 'format', 'bit_rate', 'video': {...} | None, 'audio': {...} | None,
+         'streams': ham stream listesi} veya dosya okunamazsa None
+    """
+    try:
+        stat = os.stat(media_file)
+    except OSError:
+        return None
+    
+    cache_key = (os.path.abspath(media_file), stat.st_size, stat.st_mtime_ns)
+    if cache_key in _probe_cache:
+        return _probe_cache[cache_key]
+    
     try:
         result = subprocess.run(
-            ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', 
-             '-of', 'default=noprint_wrappers=1:nokey=1', video_file],
+            ['ffprobe', '-v', 'error', '-show_format', '-show_streams', '-of', 'json', media_file],
             capture_output=True,
             text=True,
             timeout=10
         )
-        if result.returncode == 0:
-            return float(result.stdout.strip())
-        return None
+        if result.returncode != 0:
+            return None
+        raw = json.loads(result.stdout)
     except Exception as e:
-        print(f"⚠️ Video süresi öğrenilemedi: {str(e)}")
+        print(f"⚠️ Medya bilgisi öğrenilemedi: {str(e)}")
         return None
+    
+    fmt = raw.get('format', {})
+    streams = raw.get('streams', [])
+    video_stream = next((st for st in streams if st.get('codec_type') == 'video'), None)
+    audio_stream = next((st for st in streams if st.get('codec_type') == 'audio'), None)
+    
+    info = {
+        'duration': float(fmt['duration']) if fmt.get('duration') else None,
+        'format': fmt.get('format_name'),
+        'bit_rate': int(fmt['bit_rate']) if fmt.get('bit_rate') else None,
+        'video': None,
+        'audio': None,
+        'streams': streams,
+    }
+    if video_stream:
+        info['video'] = {
+            'codec': video_stream.get('codec_name'),
+            'width': video_stream.get('width'),
+            'height': video_stream.get('height'),
+            'pix_fmt': video_stream.get('pix_fmt'),
+            'profile': video_stream.get('profile'),
+            'level': video_stream.get('level'),
+            'refs': video_stream.get('refs'),
+            'has_b_frames': video_stream.get('has_b_frames'),
+            'time_base': video_stream.get('time_base'),
+            'fps': parse_frame_rate(video_stream.get('avg_frame_rate') or video_stream.get('r_frame_rate')),
+            'frames': int(video_stream['nb_frames']) if video_stream.get('nb_frames') else None,
+        }
+    if audio_stream:
+        info['audio'] = {
+            'codec': audio_stream.get('codec_name'),
+            'sample_rate': int(audio_stream['sample_rate']) if audio_stream.get('sample_rate') else None,
+            'channels': audio_stream.get('channels'),
+        }
+    
+    _probe_cache[cache_key] = info
+    return info
+
+# moov box'ı doğrudan okunabilen container uzantıları
+MP4_EXTENSIONS = ('.mp4', '.m4v', '.mov', '.m4a')
+
+def get_keyframe_times(video_file: str) -> List[float]:
+    """Video stream'indeki keyframe zamanlarını (saniye) döndürür
+    
+    MP4 dosyalarında keyframe'ler stss/stts box'larından okunur; diğer
+    durumlarda ffprobe ile sadece packet başlıkları okunur (decode yapılmaz).
+    Sonuç probe_media ile aynı anahtarla cache'lenir.
+    """
+    try:
+        stat = os.stat(video_file)
+    except OSError:
+        return []
+    
+    cache_key = (os.path.abspath(video_file), stat.st_size, stat.st_mtime_ns)
+    if cache_key in _keyframe_cache:
+        return _keyframe_cache[cache_key]
+    
+    if video_file.lower().endswith(MP4_EXTENSIONS):
+        mp4_info = read_mp4_info(video_file)
+        if mp4_info and mp4_info['video'] and mp4_info['video']['keyframes']:
+            _keyframe_cache[cache_key] = mp4_info['video']['keyframes']
+            return _keyframe_cache[cache_key]
+    
+    try:
+        result = subprocess.run(
+            ['ffprobe', '-v', 'error', '-select_streams', 'v:0',
+             '-show_entries', 'packet=pts_time,flags', '-of', 'csv=p=0', video_file],
+            capture_output=True,
+            text=True,
+            timeout=60
+        )
+        if result.returncode != 0:
+            return []
+    except Exception as e:
+        print(f"⚠️ Keyframe bilgisi öğrenilemedi: {str(e)}")
+        return []
+    
+    keyframes = []
+    for line in result.stdout.splitlines():
+        pts_time, _, flags = line.partition(',')
+        if 'K' in flags and pts_time not in ('', 'N/A'):
+            keyframes.append(float(pts_time))
+    keyframes.sort()
+    
+    _keyframe_cache[cache_key] = keyframes
+    return keyframes
+
+def get_video_duration(video_file: str) -> float:
+    """Video (veya ses) dosyasının süresini saniye cinsinden döndürür
+    
+    MP3 klipleri frame başlıklarından, MP4 dosyaları moov box'ından, WAV
+    dosyaları başlığından ffprobe başlatmadan okunur.
+    """
+    if video_file.lower().endswith('.mp3'):
+        mp3_info = read_mp3_info(video_file)
+        if mp3_info:
+            return mp3_info['duration']
+    elif video_file.lower().endswith(MP4_EXTENSIONS):
+        mp4_info = read_mp4_info(video_file)
+        if mp4_info and mp4_info['duration']:
+            return mp4_info['duration']
+    elif video_file.lower().endswith('.wav'):
+        try:
+            with wave.open(video_file, 'rb') as wav:
+                return wav.getnframes() / wav.getframerate()
+        except (OSError, wave.Error, EOFError):
+            pass  # ffmpeg'in yazdığı WAV başlıkları wave modülüne uymayabilir
+    info = probe_media(video_file)
+    if info:
+        return info['duration']
+    return None
+
+def build_atempo_filter(scale_factor: float) -> str:
+    """Ölçek faktörü için atempo filter zincirini oluşturur
+    
+    atempo 0.5-2.0 arası değerler alır, daha büyük/küçük değerler için
+    birden fazla atempo art arda kullanılır.
+    """
+    if scale_factor > 2.0:
+        # 2.0'dan büyükse birden fazla atempo kullan
+        atempo_filters = []
+        remaining_scale = scale_factor
+        while remaining_scale > 2.0:
+            atempo_filters.append("atempo=2.0")
+            remaining_scale /= 2.0
+        if remaining_scale > 1.0:
+            atempo_filters.append(f"atempo={remaining_scale:.4f}")
+        return ",".join(atempo_filters)
+    elif scale_factor < 0.5:
+        # 0.5'ten küçükse birden fazla atempo kullan
+        atempo_filters = []
+        remaining_scale = scale_factor
+        while remaining_scale < 0.5:
+            atempo_filters.append("atempo=0.5")
+            remaining_scale /= 0.5
+        if remaining_scale < 1.0:
+            atempo_filters.append(f"atempo={remaining_scale:.4f}")
+        return ",".join(atempo_filters)
+    return f"atempo={scale_factor:.4f}"
 
 def scale_audio_to_duration(audio_file: str, target_duration: float, output_file: str) -> bool:
     """Ses dosyasını hedef süreye göre ölçeklendirir (hızlandırır veya yavaşlatır)"""
@@ -354,29 +1174,7 @@ def scale_audio_to_duration(audio_file: str, target_duration: float, output_file
         scale_factor = current_duration / target_duration
         
         # FFmpeg ile ses hızını ayarla (atempo filter)
-        # atempo 0.5-2.0 arası değerler alır, daha büyük değerler için birden fazla atempo kullan
-        if scale_factor > 2.0:
-            # 2.0'dan büyükse birden fazla atempo kullan
-            atempo_filters = []
-            remaining_scale = scale_factor
-            while remaining_scale > 2.0:
-                atempo_filters.append("atempo=2.0")
-                remaining_scale /= 2.0
-            if remaining_scale > 1.0:
-                atempo_filters.append(f"atempo={remaining_scale:.2f}")
-            filter_complex = ",".join(atempo_filters)
-        elif scale_factor < 0.5:
-            # 0.5'ten küçükse birden fazla atempo kullan
-            atempo_filters = []
-            remaining_scale = scale_factor
-            while remaining_scale < 0.5:
-                atempo_filters.append("atempo=0.5")
-                remaining_scale /= 0.5
-            if remaining_scale < 1.0:
-                atempo_filters.append(f"atempo={remaining_scale:.2f}")
-            filter_complex = ",".join(atempo_filters)
-        else:
-            filter_complex = f"atempo={scale_factor:.2f}"
+        filter_complex = build_atempo_filter(scale_factor)
         
         cmd = [
             'ffmpeg',
@@ -386,7 +1184,7 @@ def scale_audio_to_duration(audio_file: str, target_duration: float, output_file
             output_file
         ]
         
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+        result = run_ffmpeg(cmd, output_file, "audio", timeout=60)
         if result.returncode == 0:
             print(f"✅ Ses ölçeklendirildi: {current_duration:.2f}s -> {target_duration:.2f}s (x{scale_factor:.2f})")
             return True
@@ -430,7 +1228,7 @@ def slow_down_video(video_file: str, target_duration: float, output_file: str) -
             output_file
         ]
         
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
+        result = run_ffmpeg(cmd, output_file, "video", timeout=120)
         if result.returncode == 0:
             print(f"✅ Video yavaşlatıldı: {current_duration:.2f}s -> {target_duration:.2f}s (x{scale_factor:.2f} yavaş)")
             return True
@@ -443,174 +1241,2043 @@ def slow_down_video(video_file: str, target_duration: float, output_file: str) -
         return False
 
 def merge_audio_files(audio_files: List[str], output_file: str):
-    """FFmpeg ile ses dosyalarını birleştirir"""
+    """Ses dosyalarını birleştirir
+    
+    Aynı formattaki MP3 klipleri ffmpeg başlatmadan frame byte'ları
+    kopyalanarak birleştirilir; çıktı .wav ise klipler bir kez PCM'e
+    çevrilir. Diğer durumlarda ffmpeg concat kullanılır.
+    Aynı klip listede birden fazla kez geçebilir (tekrarlanan adımlar);
+    concat listesine her kullanım için ayrı bir satır yazılır.
+    """
     if not audio_files:
         print("❌ Birleştirilecek ses dosyası yok!")
         return False
     
-    # Concat listesi oluştur
-    concat_file = "concat_list.txt"
+    if output_file.lower().endswith('.mp3') and all(a.lower().endswith('.mp3') for a in audio_files):
+        if concat_mp3_files(audio_files, output_file):
+            print(f"✅ Ses dosyaları birleştirildi (frame kopyası): {output_file}")
+            return True
+    
+    # Lossless ara format: klipler bir kez PCM'e çevrilip WAV olarak birleştirilir
+    if output_file.lower().endswith('.wav') and all(a.lower().endswith('.mp3') for a in audio_files):
+        if decode_clips_to_wav(audio_files, output_file):
+            print(f"✅ Ses dosyaları PCM olarak birleştirildi: {output_file}")
+            return True
+    
+    # Concat listesi oluştur (paralel render'lar çakışmasın diye çıktıya özel)
+    concat_file = f"{os.path.splitext(output_file)[0]}_concat_list.txt"
     with open(concat_file, 'w', encoding='utf-8') as f:
         for audio in audio_files:
             # Windows path için düzeltme
             audio_path = audio.replace('\\', '/')
             f.write(f"file '{audio_path}'\n")
     
-    # FFmpeg ile birleştir
-    cmd = [
-        'ffmpeg',
-        '-f', 'concat',
-        '-safe', '0',
-        '-i', concat_file,
-        '-c', 'copy',
-        output_file,
-        '-y'  # Overwrite without asking
-    ]
+    # FFmpeg ile birleştir
+    cmd = [
+        'ffmpeg',
+        '-f', 'concat',
+        '-safe', '0',
+        '-i', concat_file,
+        '-c', 'copy',
+        output_file,
+        '-y'  # Overwrite without asking
+    ]
+    
+    try:
+        result = run_ffmpeg(cmd, output_file, "audio", check=True)
+        os.remove(concat_file)
+        print(f"✅ Ses dosyaları birleştirildi: {output_file}")
+        return True
+    except subprocess.CalledProcessError as e:
+        print(f"❌ FFmpeg hatası: {e.stderr}")
+        if os.path.exists(concat_file):
+            os.remove(concat_file)
+        return False
+
+def loop_video_to_duration(video_file: str, target_duration: float, output_file: str) -> bool:
+    """Video'yu loop'layarak hedef süreye uzatır"""
+    try:
+        current_duration = get_video_duration(video_file)
+        if not current_duration or current_duration <= 0:
+            return False
+        
+        # Kaç kez loop'lanması gerektiğini hesapla
+        loops_needed = int(target_duration / current_duration) + 1
+        
+        # Concat listesi oluştur
+        concat_file = "video_loop_list.txt"
+        with open(concat_file, 'w', encoding='utf-8') as f:
+            video_path = video_file.replace('\\', '/')
+            for _ in range(loops_needed):
+                f.write(f"file '{video_path}'\n")
+        
+        # FFmpeg ile birleştir
+        cmd = [
+            'ffmpeg',
+            '-f', 'concat',
+            '-safe', '0',
+            '-i', concat_file,
+            '-t', str(target_duration),  # Hedef süreye kadar kes
+            '-c', 'copy',
+            output_file,
+            '-y'
+        ]
+        
+        result = run_ffmpeg(cmd, output_file, "audio", timeout=120)
+        os.remove(concat_file)
+        
+        if result.returncode == 0:
+            print(f"✅ Video loop'landı: {current_duration:.2f}s -> {target_duration:.2f}s ({loops_needed} kez)")
+            return True
+        else:
+            print(f"❌ Video loop hatası: {result.stderr[:300]}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Video loop hatası: {str(e)}")
+        return False
+
+SUBTITLE_FORCE_STYLE = "FontName=Arial,FontSize=24,PrimaryColour=&Hffffff,OutlineColour=&H000000"
+
+def build_subtitle_filter(subtitle_file: str) -> str:
+    """Subtitle'ı videoya gömen (burn-in) subtitles filter ifadesini döndürür"""
+    # Windows path için düzeltme
+    subtitle_path = subtitle_file.replace('\\', '/').replace(':', '\\:')
+    return f"subtitles='{subtitle_path}':force_style='{SUBTITLE_FORCE_STYLE}'"
+
+# SUBTITLE_MODE=soft: subtitle ayrı bir track olarak eklenir, video stream copy ile kopyalanır
+# SUBTITLE_MODE=burn: subtitle görüntüye gömülür (video libx264 ile yeniden encode edilir)
+SUBTITLE_MODES = ("soft", "burn", "smart")
+
+def get_subtitle_mode() -> str:
+    """SUBTITLE_MODE environment variable'ını okur (varsayılan: soft)"""
+    mode = os.getenv("SUBTITLE_MODE", "soft").lower()
+    if mode not in SUBTITLE_MODES:
+        print(f"⚠️ Bilinmeyen subtitle modu: {mode}, 'soft' kullanılacak")
+        return "soft"
+    return mode
+
+def soft_subtitle_codec(output_file: str) -> str:
+    """Çıktı container'ına uygun subtitle codec'ini döndürür"""
+    extension = Path(output_file).suffix.lower()
+    if extension == '.webm':
+        return 'webvtt'
+    if extension == '.mkv':
+        return 'ass'
+    return 'mov_text'  # MP4 / MOV
+
+def audio_codec_for(output_file: str) -> str:
+    """Çıktı container'ına uygun ses codec'ini döndürür"""
+    return 'libopus' if Path(output_file).suffix.lower() == '.webm' else 'aac'
+
+def build_video_output_args(output_file: str, subtitle_mode: str, subtitle_input: int = None) -> List[str]:
+    """Video ve subtitle stream'leri için codec/map argümanlarını oluşturur
+    
+    Soft modda video stream copy ile kopyalanır ve subtitle input'u ayrı bir
+    track olarak map'lenir. Burn modunda subtitle filter grafiğinde
+    uygulandığı için burada sadece video encoder seçilir.
+    """
+    if subtitle_mode != "soft":
+        return build_video_encode_args(get_video_encode_settings())
+    
+    args = ['-c:v', 'copy']
+    if subtitle_input is not None:
+        args.extend([
+            '-map', f'{subtitle_input}:s:0',
+            '-c:s', soft_subtitle_codec(output_file),
+            '-metadata:s:s:0', 'language=tur'
+        ])
+    return args
+
+def merge_video_audio(video_file: str, audio_file: str, output_file: str, subtitle_file: str = None,
+                      subtitle_mode: str = None):
+    """FFmpeg ile video ve sesi birleştirir, isteğe bağlı subtitle ekler
+    
+    Soft subtitle modunda video yeniden encode edilmez, sadece ses encode edilir.
+    """
+    if not os.path.exists(video_file):
+        print(f"❌ Video dosyası bulunamadı: {video_file}")
+        return False
+    
+    if not os.path.exists(audio_file):
+        print(f"❌ Ses dosyası bulunamadı: {audio_file}")
+        return False
+    
+    if subtitle_mode is None:
+        subtitle_mode = get_subtitle_mode()
+    
+    has_subtitle = bool(subtitle_file and os.path.exists(subtitle_file))
+    
+    # Smart render: sadece subtitle görünen GOP'lar encode edilir, kalan video kopyalanır
+    if subtitle_mode == "smart":
+        rendered_video = f"{os.path.splitext(output_file)[0]}_video.mp4"
+        if not has_subtitle:
+            subtitle_mode = "soft"
+        elif smart_render_subtitles(video_file, rendered_video, subtitle_file):
+            try:
+                return merge_video_audio(rendered_video, audio_file, output_file, subtitle_mode="soft")
+            finally:
+                os.remove(rendered_video)
+        else:
+            subtitle_mode = "burn"
+    
+    # Uzun videolarda encode segmentlere bölünüp paralel yapılır; ses sonra stream copy ile eklenir
+    if subtitle_mode != "soft":
+        encoded_video = f"{os.path.splitext(output_file)[0]}_video.mp4"
+        if encode_video_segmented(video_file, encoded_video, subtitle_file=subtitle_file if has_subtitle else None):
+            try:
+                return merge_video_audio(encoded_video, audio_file, output_file, subtitle_mode="soft")
+            finally:
+                os.remove(encoded_video)
+    
+    cmd = ['ffmpeg', '-i', video_file, '-i', audio_file]
+    
+    # Subtitle varsa ekle
+    if has_subtitle and subtitle_mode == "soft":
+        cmd.extend(['-i', subtitle_file])
+    
+    if subtitle_mode != "soft":
+        video_filter = build_video_filter(get_video_encode_settings(), subtitle_file if has_subtitle else None)
+        if video_filter:
+            cmd.extend(['-vf', video_filter])
+    
+    cmd.extend([
+        '-map', '0:v:0',
+        '-map', '1:a:0',
+    ])
+    cmd.extend(build_video_output_args(output_file, subtitle_mode, 2 if has_subtitle else None))
+    cmd.extend([
+        '-c:a', audio_codec_for(output_file),
+        '-shortest',  # Kısa olanın süresine göre kes
+        output_file,
+        '-y'
+    ])
+    
+    try:
+        result = run_ffmpeg(cmd, output_file, "audio" if subtitle_mode == "soft" else "video", check=True)
+        print(f"✅ Final video oluşturuldu: {output_file}")
+        return True
+    except subprocess.CalledProcessError as e:
+        print(f"❌ FFmpeg hatası: {e.stderr}")
+        return False
+
+# ============================================================================
+# 4.1 ENCODE EDİLMİŞ VİDEO CACHE'İ
+# ============================================================================
+
+# VIDEO_ENCODE=copy: Cypress videosu olduğu gibi (stream copy) kullanılır
+# VIDEO_ENCODE=encode: video bir kez libx264 ile encode edilir ve cache'lenir;
+#   sonraki çalıştırmalarda sadece ses yeniden üretilip cache'teki videoya mux'lanır
+VIDEO_ENCODE_MODES = ("copy", "encode")
+DEFAULT_VIDEO_CACHE_DIR = ".video_cache"
+
+# MP4 container'ına yeniden encode etmeden kopyalanabilen video codec'leri
+MP4_COPYABLE_CODECS = ("h264", "hevc", "mpeg4", "av1")
+
+# VIDEO_PROFILE=standard: sabit kare hızı, libx264 varsayılanları
+# VIDEO_PROFILE=screen: tekrarlanan kareler (cy.wait sırasındaki durağan ekran)
+#   mpdecimate ile atılır, çıktı değişken kare hızlı (VFR) yazılır ve x264
+#   ekran içeriğine göre ayarlanır
+VIDEO_PROFILES = ("standard", "screen")
+# max: en fazla bu kadar ardışık kare atılır; durağan bitişlerde video süresi
+# sesten kısalıp -shortest ile son anlatımın kesilmesini önler
+SCREEN_DECIMATE_FILTER = "mpdecimate=hi=768:lo=320:frac=0.33:max=30"
+SCREEN_X264_TUNE = "animation"
+SCREEN_X264_PARAMS = "keyint=600:min-keyint=1:scenecut=60"
+
+def get_video_profile() -> str:
+    """VIDEO_PROFILE environment variable'ını okur (varsayılan: standard)"""
+    profile = os.getenv("VIDEO_PROFILE", "standard").lower()
+    if profile not in VIDEO_PROFILES:
+        print(f"⚠️ Bilinmeyen video profili: {profile}, 'standard' kullanılacak")
+        return "standard"
+    return profile
+
+# VIDEO_SOURCE=compressed: Cypress kaydı videoCompression ile zaten sıkıştırılmış
+# VIDEO_SOURCE=raw: Cypress sıkıştırma yapmadan kaydeder (cypress.config.js aynı
+#   değişkeni okur); video sadece burada bir kez encode edilir
+VIDEO_SOURCES = ("compressed", "raw")
+
+def get_video_source() -> str:
+    """VIDEO_SOURCE environment variable'ını okur (varsayılan: compressed)"""
+    source = os.getenv("VIDEO_SOURCE", "compressed").lower()
+    if source not in VIDEO_SOURCES:
+        print(f"⚠️ Bilinmeyen video kaynağı: {source}, 'compressed' kullanılacak")
+        return "compressed"
+    return source
+
+def get_video_encode_mode() -> str:
+    """VIDEO_ENCODE environment variable'ını okur
+    
+    Varsayılan copy'dir; VIDEO_SOURCE=raw ise sıkıştırılmamış kayıt olduğu gibi
+    kopyalanmasın diye varsayılan encode olur.
+    """
+    default = "encode" if get_video_source() == "raw" else "copy"
+    mode = os.getenv("VIDEO_ENCODE", default).lower()
+    if mode not in VIDEO_ENCODE_MODES:
+        print(f"⚠️ Bilinmeyen video encode modu: {mode}, '{default}' kullanılacak")
+        return default
+    return mode
+
+def get_video_encode_settings() -> Dict:
+    """Video encode ayarlarını döndürür (VIDEO_PRESET, VIDEO_CRF, VIDEO_PROFILE ile değiştirilebilir)"""
+    settings = {
+        'codec': 'libx264',
+        'preset': os.getenv("VIDEO_PRESET", "medium"),
+        'crf': os.getenv("VIDEO_CRF", "23"),
+        'pix_fmt': 'yuv420p',
+        'profile': get_video_profile(),
+    }
+    if settings['profile'] == "screen":
+        settings.update({
+            'decimate': SCREEN_DECIMATE_FILTER,
+            'tune': SCREEN_X264_TUNE,
+            'x264_params': SCREEN_X264_PARAMS,
+        })
+    return settings
+
+def build_video_encode_args(settings: Dict) -> List[str]:
+    """Encode ayarlarını ffmpeg argümanlarına çevirir"""
+    args = [
+        '-c:v', settings['codec'],
+        '-preset', settings['preset'],
+        '-crf', str(settings['crf']),
+        '-pix_fmt', settings['pix_fmt'],
+    ]
+    if settings.get('h264_profile'):
+        args.extend(['-profile:v', settings['h264_profile']])
+    if settings.get('level'):
+        args.extend(['-level:v', settings['level']])
+    if settings.get('tune'):
+        args.extend(['-tune', settings['tune']])
+    if settings.get('x264_params'):
+        args.extend(['-x264-params', settings['x264_params']])
+    if settings.get('decimate'):
+        # Atılan kareler yerine tekrar kare eklenmesin; kalan karelerin zaman damgaları korunur
+        args.extend(['-fps_mode', 'vfr'])
+    return args
+
+def build_video_filter(settings: Dict, subtitle_file: str = None) -> str:
+    """Encode öncesi video filtre zincirini oluşturur (filtre yoksa None)
+    
+    Subtitle, decimate'ten önce gömülür; böylece subtitle'ın değiştiği kareler
+    durağan ekranda bile atılmaz ve yazılar zamanında görünür.
+    """
+    chain = []
+    if subtitle_file:
+        chain.append(build_subtitle_filter(subtitle_file))
+    if settings.get('decimate'):
+        chain.append(settings['decimate'])
+    return ",".join(chain) if chain else None
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Dosya içeriğinin SHA-256 özetini döndürür"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def video_cache_key(video_file: str, settings: Dict) -> str:
+    """Kaynak video özeti ve encode ayarlarından cache anahtarı üretir"""
+    payload = json.dumps({'source': file_sha256(video_file), 'settings': settings}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def prepare_video_stream(video_file: str, settings: Dict = None, cache_dir: str = None) -> str:
+    """Subtitle ve ses içermeyen encode edilmiş video stream'ini cache'ten döndürür
+    
+    Cache'te yoksa video bir kez encode edilir. Sonraki çalıştırmalarda
+    (sadece anlatım metni veya ses değiştiğinde) encode atlanır ve final
+    render bu dosyayı stream copy ile kullanır.
+    
+    Returns:
+        Cache'teki video yolu, encode başarısız olursa kaynak video
+    """
+    if settings is None:
+        settings = get_video_encode_settings()
+    if cache_dir is None:
+        cache_dir = os.getenv("VIDEO_CACHE_DIR", DEFAULT_VIDEO_CACHE_DIR)
+    os.makedirs(cache_dir, exist_ok=True)
+    
+    cached = os.path.join(cache_dir, f"{video_cache_key(video_file, settings)}.mp4")
+    if os.path.exists(cached):
+        print(f"✅ Encode edilmiş video cache'ten alındı: {cached}")
+        return cached
+    
+    tmp_file = f"{cached}.{os.getpid()}.tmp.mp4"
+    started = time.perf_counter()
+    if encode_video_segmented(video_file, tmp_file, settings):
+        os.replace(tmp_file, cached)
+        print(f"✅ Video encode edilip cache'lendi ({time.perf_counter() - started:.1f}s): {cached}")
+        return cached
+    
+    cmd = ['ffmpeg', '-i', video_file, '-map', '0:v:0', '-an', '-sn']
+    video_filter = build_video_filter(settings)
+    if video_filter:
+        cmd.extend(['-vf', video_filter])
+    cmd.extend(build_video_encode_args(settings))
+    cmd.extend(['-movflags', '+faststart', tmp_file, '-y'])
+    
+    try:
+        run_ffmpeg(cmd, tmp_file, "video", check=True)
+        os.replace(tmp_file, cached)
+        print(f"✅ Video encode edilip cache'lendi ({time.perf_counter() - started:.1f}s): {cached}")
+        return cached
+    except subprocess.CalledProcessError as e:
+        print(f"❌ Video encode hatası: {e.stderr[-300:]}")
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        return video_file
+
+# ============================================================================
+# 4.2 TEK GEÇİŞLİ RENDER (filter_complex)
+# ============================================================================
+
+# RENDER_MODE=single: concat + atempo + subtitle + encode tek ffmpeg çağrısında
+# RENDER_MODE=multi: eski çok adımlı yol (merge_audio_files -> scale -> merge_video_audio)
+RENDER_MODES = ("single", "multi")
+
+def get_render_mode() -> str:
+    """RENDER_MODE environment variable'ını okur (varsayılan: single)"""
+    mode = os.getenv("RENDER_MODE", "single").lower()
+    if mode not in RENDER_MODES:
+        print(f"⚠️ Bilinmeyen render modu: {mode}, 'single' kullanılacak")
+        return "single"
+    return mode
+
+def split_clip_inputs(audio_files: List[str], input_offset: int):
+    """Klipleri ffmpeg input'larına çevirir, tekrar kullanılanları asplit ile çoğaltır
+    
+    Returns:
+        (benzersiz klip input listesi, asplit filtreleri, her kullanım için label listesi)
+    """
+    unique_files = list(dict.fromkeys(audio_files))
+    input_index = {path: input_offset + i for i, path in enumerate(unique_files)}
+    usage_count = {path: 0 for path in unique_files}
+    for path in audio_files:
+        usage_count[path] += 1
+    
+    filters = []
+    split_labels = {}
+    for path in unique_files:
+        idx = input_index[path]
+        count = usage_count[path]
+        if count == 1:
+            split_labels[path] = [f"[{idx}:a]"]
+        else:
+            labels = [f"[c{idx}_{n}]" for n in range(count)]
+            filters.append(f"[{idx}:a]asplit={count}{''.join(labels)}")
+            split_labels[path] = labels
+    
+    labels = [split_labels[path].pop(0) for path in audio_files]
+    return unique_files, filters, labels
+
+def build_video_graph(filters: List[str], subtitle_file: str = None, video_settings: Dict = None) -> str:
+    """Video encode ediliyorsa (burn-in subtitle, decimate) video filtresini ekler ve video label'ını döndürür"""
+    if subtitle_file and not os.path.exists(subtitle_file):
+        subtitle_file = None
+    video_filter = build_video_filter(video_settings or {}, subtitle_file)
+    if video_filter:
+        filters.append(f"[0:v]{video_filter}[vout]")
+        return "[vout]"
+    return "0:v:0"
+
+def build_single_pass_graph(audio_files: List[str], input_offset: int, atempo_filter: str = None,
+                            subtitle_file: str = None, video_settings: Dict = None):
+    """Tek geçişli render için filter_complex grafiğini oluşturur
+    
+    Her benzersiz klip bir kez input olarak eklenir; birden fazla adımda
+    kullanılan klipler asplit ile çoğaltılıp adım sırasıyla concat'e verilir.
+    
+    Args:
+        audio_files: Adım sırasındaki klip yolları (tekrar içerebilir)
+        input_offset: İlk klibin ffmpeg input numarası (0 = video)
+        atempo_filter: Birleşik ses için atempo zinciri (None ise uygulanmaz)
+        subtitle_file: Burn-in yapılacak SRT dosyası
+        video_settings: Video encode ediliyorsa encode ayarları (decimate filtresi için)
+    
+    Returns:
+        (benzersiz klip input listesi, filter_complex metni, video label, audio label)
+    """
+    unique_files, filters, labels = split_clip_inputs(audio_files, input_offset)
+    filters.append(f"{''.join(labels)}concat=n={len(audio_files)}:v=0:a=1[acat]")
+    
+    audio_label = "[acat]"
+    if atempo_filter:
+        filters.append(f"[acat]{atempo_filter}[aout]")
+        audio_label = "[aout]"
+    
+    video_label = build_video_graph(filters, subtitle_file, video_settings)
+    return unique_files, ";".join(filters), video_label, audio_label
+
+# ============================================================================
+# 4.2.1 KLİP YERLEŞİMİ (adelay + amix)
+# ============================================================================
+
+# AUDIO_LAYOUT=place: her klip kendi adımının başlangıç zamanına yerleştirilir
+# AUDIO_LAYOUT=concat: klipler art arda eklenip tüm ses videoya göre sıkıştırılır
+AUDIO_LAYOUTS = ("place", "concat")
+MAX_CLIP_TEMPO = 2.0  # Bir klip kendi aralığına sığmazsa en fazla bu kadar hızlandırılır
+LAYOUT_OVERRUN_TOLERANCE = 0.05  # Anlatım izinin video sonunu en fazla bu kadar aşmasına izin verilir
+
+def get_audio_layout() -> str:
+    """AUDIO_LAYOUT environment variable'ını okur (varsayılan: place)"""
+    layout = os.getenv("AUDIO_LAYOUT", "place").lower()
+    if layout not in AUDIO_LAYOUTS:
+        print(f"⚠️ Bilinmeyen ses yerleşimi: {layout}, 'place' kullanılacak")
+        return "place"
+    return layout
+
+def place_clip(step_start: float, step_end: float, clip_duration: float, cursor: float) -> Tuple[float, float]:
+    """Bir klibin başlangıç zamanını ve hızlandırma oranını belirler
+    
+    Klip yerleştiren tüm yollar (amix grafiği, NumPy montajı, bellekten render)
+    bu kuralı kullanır: klip adımının zamanında başlar, önceki klip hâlâ
+    çalıyorsa onun bitişini bekler; klipler üst üste binmez. Klip adımın
+    bitişine kadar kalan aralığa sığmıyorsa en fazla MAX_CLIP_TEMPO kadar
+    hızlandırılır, kalan taşma sonraki klibi kaydırır.
+    
+    Args:
+        cursor: Önceki klibin bittiği zaman
+    
+    Returns:
+        (başlangıç, tempo)
+    """
+    start = max(step_start, cursor)
+    slot = step_end - start
+    tempo = 1.0
+    if clip_duration > 0 and clip_duration > slot:
+        tempo = min(clip_duration / slot, MAX_CLIP_TEMPO) if slot > 0 else MAX_CLIP_TEMPO
+    return start, tempo
+
+def plan_clip_layout(steps: List[Dict], step_files: List[str], scale_factor: float = 1.0) -> List[Dict]:
+    """Her klibin videodaki başlangıç zamanını ve gerekiyorsa hızlandırma oranını hesaplar
+    
+    Yerleşim kuralı place_clip'tedir; 'delay' klibin önceki klip yüzünden
+    subtitle'ından ne kadar geç başladığıdır.
+    
+    Returns:
+        [{'file', 'start', 'delay', 'slot', 'clip_duration', 'tempo'}] (ses olmayan adımlar atlanır)
+    """
+    placements = []
+    cursor = 0.0
+    for step, audio_file in zip(steps, step_files):
+        if not audio_file:
+            continue
+        clip_duration = get_video_duration(audio_file) or 0.0
+        step_start = step['time'] * scale_factor
+        step_end = (step['time'] + step['duration']) * scale_factor
+        start, tempo = place_clip(step_start, step_end, clip_duration, cursor)
+        cursor = start + clip_duration / tempo
+        placements.append({
+            'file': audio_file,
+            'start': start,
+            'delay': start - step_start,
+            'slot': step_end - start,
+            'clip_duration': clip_duration,
+            'tempo': tempo,
+        })
+    return placements
+
+def layout_end(placements: List[Dict]) -> float:
+    """Yerleştirilen son klibin bittiği zaman"""
+    return max((p['start'] + p['clip_duration'] / p['tempo'] for p in placements), default=0.0)
+
+def layout_fits(placements: List[Dict], total_duration: float) -> bool:
+    """Kaydırılan kliplerle birlikte anlatım izi video süresine sığıyor mu"""
+    return total_duration <= 0 or layout_end(placements) <= total_duration + LAYOUT_OVERRUN_TOLERANCE
+
+def print_layout_report(placements: List[Dict]):
+    """Kaç klibin hızlandırıldığını ve önceki klip yüzünden geç başladığını yazdırır"""
+    compressed = [p for p in placements if p['tempo'] > 1.0]
+    delayed = [p for p in placements if p['delay'] > 1e-3]
+    print(f"   {len(placements)} klip yerleştirildi, {len(compressed)} klip hızlandırıldı"
+          f", {len(delayed)} klip önceki klip bitene kadar kaydırıldı")
+
+def build_layout_graph(placements: List[Dict], input_offset: int, total_duration: float = 0,
+                       subtitle_file: str = None, video_settings: Dict = None):
+    """Klipleri adelay ile zaman çizelgesine yerleştirip amix ile tek ses izine çeviren grafik
+    
+    Returns:
+        (benzersiz klip input listesi, filter_complex metni, video label, audio label)
+    """
+    unique_files, filters, labels = split_clip_inputs([p['file'] for p in placements], input_offset)
+    
+    mix_inputs = []
+    for n, (placement, label) in enumerate(zip(placements, labels)):
+        chain = []
+        if placement['tempo'] > 1.0:
+            chain.append(build_atempo_filter(placement['tempo']))
+        delay_ms = int(round(placement['start'] * 1000))
+        chain.append(f"adelay={delay_ms}:all=1")
+        filters.append(f"{label}{','.join(chain)}[p{n}]")
+        mix_inputs.append(f"[p{n}]")
+    
+    mix = f"{''.join(mix_inputs)}amix=inputs={len(mix_inputs)}:duration=longest:dropout_transition=0:normalize=0"
+    if total_duration > 0:
+        # Ses izini video süresine tamamla/kes
+        mix += f",apad,atrim=0:{total_duration:.3f}"
+    filters.append(f"{mix}[aout]")
+    
+    video_label = build_video_graph(filters, subtitle_file, video_settings)
+    return unique_files, ";".join(filters), video_label, "[aout]"
+
+def render_single_pass(video_file: str, audio_files: List[str], output_file: str,
+                       subtitle_file: str = None, target_duration: float = 0,
+                       subtitle_mode: str = None, placements: List[Dict] = None) -> bool:
+    """Klipleri birleştirme, süreye uydurma, subtitle ekleme ve final encode'u
+    tek bir ffmpeg çağrısında yapar (merged_audio ara dosyaları oluşmaz)
+    
+    Args:
+        video_file: Cypress video dosyası
+        audio_files: Adım sırasındaki klip yolları
+        output_file: Final video
+        subtitle_file: SRT dosyası
+        target_duration: Sesin uydurulacağı süre (0 ise ölçeklendirme yapılmaz)
+        subtitle_mode: soft (ayrı track, video stream copy) veya burn
+        placements: plan_clip_layout sonucu; verilirse klipler art arda eklenip
+            sıkıştırılmak yerine kendi zamanlarına yerleştirilir (çağıran
+            layout_fits ile izin videoya sığdığını kontrol etmelidir)
+    """
+    if subtitle_mode is None:
+        subtitle_mode = get_subtitle_mode()
+    has_subtitle = bool(subtitle_file and os.path.exists(subtitle_file))
+
+    if not os.path.exists(video_file):
+        print(f"❌ Video dosyası bulunamadı: {video_file}")
+        return False
+    
+    if not audio_files:
+        print("❌ Birleştirilecek ses dosyası yok!")
+        return False
+    
+    # Klipler yerleştiriliyorsa anlatım izi bellekte tek dizide oluşturulup videoya eklenir
+    if placements is not None and get_audio_assembler() != "ffmpeg":
+        narration_track = f"{os.path.splitext(output_file)[0]}_narration.wav"
+        if assemble_narration_track(placements, target_duration, narration_track):
+            print_layout_report(placements)
+            try:
+                return merge_video_audio(video_file, narration_track, output_file, subtitle_file, subtitle_mode)
+            finally:
+                os.remove(narration_track)
+    
+    # Smart render: sadece subtitle görünen GOP'lar encode edilir, ses grafiği
+    # sonra bu videoya stream copy ile eklenir
+    if subtitle_mode == "smart":
+        rendered_video = f"{os.path.splitext(output_file)[0]}_video.mp4"
+        if not has_subtitle:
+            subtitle_mode = "soft"
+        elif smart_render_subtitles(video_file, rendered_video, subtitle_file):
+            try:
+                return render_single_pass(rendered_video, audio_files, output_file, None, target_duration,
+                                          "soft", placements)
+            finally:
+                os.remove(rendered_video)
+        else:
+            subtitle_mode = "burn"
+    
+    # Uzun videolarda subtitle'lı video encode'u segmentlere bölünüp paralel yapılır;
+    # ses grafiği ayrıca bu videoya stream copy ile eklenir
+    if subtitle_mode == "burn":
+        encoded_video = f"{os.path.splitext(output_file)[0]}_video.mp4"
+        if encode_video_segmented(video_file, encoded_video, subtitle_file=subtitle_file if has_subtitle else None):
+            try:
+                return render_single_pass(encoded_video, audio_files, output_file, None, target_duration,
+                                          "soft", placements)
+            finally:
+                os.remove(encoded_video)
+    
+    try:
+        burn_subtitle = subtitle_file if subtitle_mode == "burn" else None
+        video_settings = get_video_encode_settings() if subtitle_mode == "burn" else None
+        atempo_filter = None
+        if placements is not None:
+            print_layout_report(placements)
+        elif target_duration > 0:
+            # Birleşik sesin süresi = kliplerin süreleri toplamı
+            clip_durations = {path: get_video_duration(path) for path in set(audio_files)}
+            if not all(clip_durations.values()):
+                print("❌ Klip süreleri öğrenilemedi")
+                return False
+            audio_duration = sum(clip_durations[path] for path in audio_files)
+            scale_factor = audio_duration / target_duration
+            atempo_filter = build_atempo_filter(scale_factor)
+            print(f"   Ses süresi: {audio_duration:.2f}s -> {target_duration:.2f}s (x{scale_factor:.2f})")
+        
+        if placements is not None:
+            unique_files, filter_complex, video_label, audio_label = build_layout_graph(
+                placements, 1, target_duration, burn_subtitle, video_settings)
+        else:
+            unique_files, filter_complex, video_label, audio_label = build_single_pass_graph(
+                audio_files, 1, atempo_filter, burn_subtitle, video_settings)
+        
+        cmd = ['ffmpeg', '-i', video_file]
+        for path in unique_files:
+            cmd.extend(['-i', path])
+        
+        subtitle_input = None
+        if has_subtitle and subtitle_mode == "soft":
+            subtitle_input = 1 + len(unique_files)
+            cmd.extend(['-i', subtitle_file])
+        
+        cmd.extend([
+            '-filter_complex', filter_complex,
+            '-map', video_label,
+            '-map', audio_label,
+        ])
+        cmd.extend(build_video_output_args(output_file, subtitle_mode, subtitle_input))
+        cmd.extend([
+            '-c:a', audio_codec_for(output_file),
+            '-shortest',
+            output_file,
+            '-y'
+        ])
+        
+        run_ffmpeg(cmd, output_file, "audio" if subtitle_mode == "soft" else "video", check=True)
+        print(f"✅ Final video tek geçişte oluşturuldu: {output_file}")
+        return True
+    except subprocess.CalledProcessError as e:
+        print(f"❌ FFmpeg hatası: {e.stderr[-500:]}")
+        return False
+    except Exception as e:
+        print(f"❌ Tek geçişli render hatası: {str(e)}")
+        return False
+
+# ============================================================================
+# 4.2.2 BELLEKTEN RENDER (TTS -> PCM -> ffmpeg stdin)
+# ============================================================================
+
+# TTS_STREAM=1: klipler diske yazılmaz. Provider'dan gelen MP3 parçaları
+# klip başına kısa ömürlü bir decoder'la bellekte PCM'e çevrilir; tüm anlatım
+# hazırlanıp yerleştirildikten sonra final ffmpeg başlatılır ve PCM stdin'ine
+# yazılır. Anlatımın tamamı render boyunca bellekte tutulur.
+STREAM_SAMPLE_RATE = 24000
+STREAM_CHANNELS = 1
+STREAM_SAMPLE_WIDTH = 2  # s16le
+
+# AUDIO_INTERMEDIATE=mp3: çok adımlı yolda ara ses dosyaları MP3 (ölçeklendirme yeniden encode eder)
+# AUDIO_INTERMEDIATE=wav: ara dosyalar PCM WAV; tek lossy encode final mux'ta yapılır
+AUDIO_INTERMEDIATES = ("mp3", "wav")
+
+def get_audio_intermediate() -> str:
+    """AUDIO_INTERMEDIATE environment variable'ını okur (varsayılan: mp3)"""
+    intermediate = os.getenv("AUDIO_INTERMEDIATE", "mp3").lower()
+    if intermediate not in AUDIO_INTERMEDIATES:
+        print(f"⚠️ Bilinmeyen ara ses formatı: {intermediate}, 'mp3' kullanılacak")
+        return "mp3"
+    return intermediate
+
+def tts_stream_enabled() -> bool:
+    """TTS_STREAM environment variable'ını okur (varsayılan: kapalı)"""
+    return os.getenv("TTS_STREAM", "0") == "1"
+
+def pcm_offset(seconds: float) -> int:
+    """Saniyeyi PCM akışındaki byte konumuna çevirir (tam örnek sınırında)"""
+    return int(round(seconds * STREAM_SAMPLE_RATE)) * STREAM_CHANNELS * STREAM_SAMPLE_WIDTH
+
+def pcm_duration(byte_count: int) -> float:
+    """PCM akışındaki byte sayısını saniyeye çevirir"""
+    return byte_count / (STREAM_SAMPLE_RATE * STREAM_CHANNELS * STREAM_SAMPLE_WIDTH)
+
+async def decode_mp3_to_pcm(chunks, sample_rate: int = STREAM_SAMPLE_RATE, channels: int = STREAM_CHANNELS,
+                            audio_filter: str = None) -> Tuple[bytes, bytes]:
+    """MP3 parçalarını geldikçe bir ffmpeg decoder'ına verir
+    
+    Decoder tek thread'le çalışan kısa ömürlü hafif bir process'tir; dosya
+    oluşturmaz.
+    
+    Args:
+        chunks: MP3 byte parçaları veren async iterable
+        audio_filter: Decode sırasında uygulanacak ses filtresi (ör. atempo zinciri)
+    
+    Returns:
+        (PCM s16le verisi, gelen MP3 verisinin tamamı)
+    """
+    cmd = ['ffmpeg', '-v', 'error', '-threads', '1', '-f', 'mp3', '-i', 'pipe:0']
+    if audio_filter:
+        cmd.extend(['-af', audio_filter])
+    cmd.extend(['-f', 's16le', '-ar', str(sample_rate), '-ac', str(channels), 'pipe:1'])
+    mp3 = bytearray()
+    
+    async def collect():
+        async for chunk in chunks:
+            mp3.extend(chunk)
+            yield chunk
+    
+    pcm = await pipe_through_ffmpeg(cmd, collect(), "MP3 decode")
+    return pcm, bytes(mp3)
+
+async def change_pcm_tempo(pcm: bytes, tempo: float) -> bytes:
+    """STREAM_* formatındaki PCM klibi atempo ile hızlandırır"""
+    fmt = ['-f', 's16le', '-ar', str(STREAM_SAMPLE_RATE), '-ac', str(STREAM_CHANNELS)]
+    cmd = ['ffmpeg', '-v', 'error', '-threads', '1', *fmt, '-i', 'pipe:0',
+           '-af', build_atempo_filter(tempo), *fmt, 'pipe:1']
+    
+    async def replay():
+        yield pcm
+    return await pipe_through_ffmpeg(cmd, replay(), "PCM hızlandırma")
+
+async def pipe_through_ffmpeg(cmd: List[str], chunks, label: str) -> bytes:
+    """chunks parçalarını ffmpeg'in stdin'ine yazar ve stdout çıktısını döndürür
+    
+    Process, FFmpegScheduler bütçesinden bir hafif iş çekirdeği ayrılınca başlatılır.
+    
+    Raises:
+        RuntimeError: ffmpeg hata koduyla çıkarsa
+    """
+    async with reserve_ffmpeg_async("audio"):
+        process = await asyncio.create_subprocess_exec(
+            *cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        readers = [asyncio.ensure_future(process.stdout.read()), asyncio.ensure_future(process.stderr.read())]
+        
+        try:
+            try:
+                async for chunk in chunks:
+                    process.stdin.write(chunk)
+                    await process.stdin.drain()
+            finally:
+                process.stdin.close()
+            output, stderr = await asyncio.gather(*readers)
+        except BaseException:
+            process.kill()
+            await process.wait()
+            for reader in readers:
+                reader.cancel()
+            raise
+        
+        if await process.wait() != 0:
+            raise RuntimeError(f"{label} hatası: {stderr.decode('utf-8', errors='replace')[-200:]}")
+    return output
+
+async def read_file_chunks(path: str, chunk_size: int = 1024 * 1024):
+    """Dosyayı parça parça döndüren async generator (decode_mp3_to_pcm girdisi için)"""
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            yield chunk
+
+def decode_clips_to_wav(audio_files: List[str], output_file: str) -> bool:
+    """MP3 kliplerini PCM WAV olarak birleştirir (her benzersiz klip bir kez decode edilir)
+    
+    Birden fazla adımda kullanılan klibin PCM verisi tekrar decode edilmeden
+    yeniden yazılır. Sonuç lossless ara dosyadır; tek lossy encode final
+    mux'ta yapılır.
+    """
+    unique_files = list(dict.fromkeys(audio_files))
+    # Klipler kaynak örnekleme hızında tutulur (ör. Eleven Labs 44.1 kHz)
+    first_info = read_mp3_info(unique_files[0])
+    sample_rate = first_info['sample_rate'] if first_info else STREAM_SAMPLE_RATE
+    channels = first_info['channels'] if first_info else STREAM_CHANNELS
+    
+    async def decode_all() -> List[bytes]:
+        semaphore = asyncio.Semaphore(os.cpu_count() or 1)
+        
+        async def decode(path: str) -> bytes:
+            async with semaphore:
+                pcm, _ = await decode_mp3_to_pcm(read_file_chunks(path), sample_rate, channels)
+                return pcm
+        return await asyncio.gather(*(decode(path) for path in unique_files))
+    
+    try:
+        pcm_by_file = dict(zip(unique_files, asyncio.run(decode_all())))
+    except (OSError, RuntimeError) as e:
+        print(f"❌ Klipler PCM'e çevrilemedi: {str(e)}")
+        return False
+    
+    tmp_file = f"{output_file}.{os.getpid()}.tmp"
+    with wave.open(tmp_file, 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(STREAM_SAMPLE_WIDTH)
+        wav.setframerate(sample_rate)
+        for path in audio_files:
+            wav.writeframes(pcm_by_file[path])
+    os.replace(tmp_file, output_file)
+    return True
+
+async def synthesize_pcm_async(job: Dict, tts_provider: str, api_key: str = None,
+                               cache: TTSClipCache = None) -> bytes:
+    """Bir klibi cache'ten veya provider akışından PCM olarak üretir (başarısızsa None)"""
+    try:
+        cached = cache.read(job['key']) if cache else None
+        if cached is not None:
+            async def replay():
+                yield cached
+            pcm, _ = await decode_mp3_to_pcm(replay())
+        else:
+            pcm, mp3 = await decode_mp3_to_pcm(stream_tts_chunks(job['text'], tts_provider, api_key))
+            if cache:
+                cache.store_bytes(job['key'], mp3)
+            print(f"  ✅ Ses oluşturuldu: {job['text'][:50]}...")
+        return pcm
+    except ImportError as e:
+        print(f"❌ TTS kütüphanesi yüklü değil: {str(e)}")
+        return None
+    except Exception as e:
+        print(f"❌ TTS hatası: {str(e)}")
+        return None
+
+async def synthesize_pcm_clips(jobs: List[Dict], tts_provider: str, api_key: str = None,
+                               concurrency: int = DEFAULT_TTS_CONCURRENCY, cache: TTSClipCache = None,
+                               trim_params: Dict = None) -> Tuple[Dict, float]:
+    """Klipleri eşzamanlı olarak PCM'e sentezler ve baş/son sessizliklerini keser
+    
+    Returns:
+        (iş index'i -> PCM veya başarısızsa None, kırpılan toplam sessizlik (saniye))
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    
+    async def run_job(job: Dict) -> bytes:
+        async with semaphore:
+            return await synthesize_pcm_async(job, tts_provider, api_key, cache)
+    
+    results = await asyncio.gather(*(run_job(job) for job in jobs))
+    clips = {}
+    trimmed = 0.0
+    for job, pcm in zip(jobs, results):
+        if pcm and trim_params:
+            cut = trim_pcm_silence(pcm, STREAM_SAMPLE_RATE, STREAM_CHANNELS, trim_params)
+            trimmed += pcm_duration(len(pcm) - len(cut))
+            pcm = cut
+        clips[job['index']] = pcm
+    return clips, trimmed
+
+async def plan_pcm_track(steps: List[Dict], jobs: List[Dict], clips: Dict, scale_factor: float,
+                         total_duration: float) -> Tuple[List[Tuple[int, bytes]], Dict]:
+    """PCM klipleri adım sırasıyla zaman çizelgesine yerleştirir
+    
+    Klipler dosya tabanlı yerleşimle aynı kurala (place_clip) göre
+    hızlandırılır ve önceki klip bitmeden başlamaz.
+    
+    Returns:
+        ([(byte konumu, PCM)], {'voiced': seslendirilen adım sayısı, 'compressed':
+         hızlandırılan klip sayısı, 'delayed': geç başlayan klip sayısı, 'overrun':
+         izin video sonunu aştığı süre (saniye)})
+    """
+    job_for_step = {step_index: job['index'] for job in jobs for step_index in job['step_indices']}
+    report = {'voiced': 0, 'compressed': 0, 'delayed': 0, 'overrun': 0.0}
+    segments = []
+    written = 0
+    
+    for i, step in enumerate(steps):
+        pcm = clips[job_for_step[i]]
+        if not pcm:
+            print(f"  ⚠️ Adım {i+1} için ses oluşturulamadı, atlanıyor...")
+            continue
+        step_start = step['time'] * scale_factor
+        step_end = (step['time'] + step['duration']) * scale_factor
+        start, tempo = place_clip(step_start, step_end, pcm_duration(len(pcm)), pcm_duration(written))
+        if tempo > 1.0:
+            pcm = await change_pcm_tempo(pcm, tempo)
+            report['compressed'] += 1
+        if start > step_start + 1e-3:
+            report['delayed'] += 1
+        offset = max(pcm_offset(start), written)
+        segments.append((offset, pcm))
+        written = offset + len(pcm)
+        report['voiced'] += 1
+    
+    end = pcm_offset(total_duration)
+    if total_duration > 0 and written > end:
+        report['overrun'] = pcm_duration(written - end)
+    return segments, report
+
+async def write_pcm_track(stdin, segments: List[Tuple[int, bytes]], total_duration: float):
+    """Yerleştirilmiş klipleri aralarını ve sonunu sessizlikle doldurarak stdin'e yazar"""
+    written = 0
+    try:
+        for offset, pcm in segments:
+            if offset > written:
+                stdin.write(bytes(offset - written))
+                written = offset
+            stdin.write(pcm)
+            written += len(pcm)
+            await stdin.drain()
+        
+        end = pcm_offset(total_duration)
+        if end > written:
+            stdin.write(bytes(end - written))
+            await stdin.drain()
+    finally:
+        stdin.close()
+
+def render_from_memory(video_file: str, steps: List[Dict], output_file: str, subtitle_file: str = None,
+                       scale_factor: float = 1.0, total_duration: float = 0, tts_provider: str = "edge",
+                       api_key: str = None, cache: TTSClipCache = None, concurrency: int = None,
+                       subtitle_mode: str = None) -> Tuple[bool, Dict]:
+    """TTS çıktısını geçici dosya kullanmadan bellekten final ffmpeg'e vererek videoyu oluşturur
+    
+    Bu bir akış değil, bellekte tamponlamadır: her klip ayrı bir decoder
+    (ve gerekirse ayrı bir atempo) process'iyle PCM'e çevrilir, kırpılır ve
+    yerleştirilir; final ffmpeg ancak tüm anlatım hazır olunca başlatılır ve
+    sesi stdin'den ham PCM olarak okur. Kazanç disk I/O'dadır; zamanlayıcıdan
+    ayrılan çekirdekler de TTS'in ağ gecikmesi boyunca boşta tutulmaz.
+    Video, subtitle ve encode ayarları tek geçişli render ile aynıdır.
+    Smart subtitle modu desteklenmez.
+    
+    Returns:
+        (başarılı mı, plan_pcm_track raporu + 'trimmed' ve 'tts_time' (TTS ve
+         yerleşim süresi, saniye) veya başarısızsa None)
+    """
+    if subtitle_mode is None:
+        subtitle_mode = get_subtitle_mode()
+    if subtitle_mode == "smart":
+        print("⚠️ Bellekten render smart subtitle modunu desteklemiyor")
+        return False, None
+    if concurrency is None:
+        concurrency = get_tts_concurrency()
+    if not os.path.exists(video_file):
+        print(f"❌ Video dosyası bulunamadı: {video_file}")
+        return False, None
+    has_subtitle = bool(subtitle_file and os.path.exists(subtitle_file))
+    
+    cmd = ['ffmpeg', '-i', video_file,
+           '-f', 's16le', '-ar', str(STREAM_SAMPLE_RATE), '-ac', str(STREAM_CHANNELS), '-i', 'pipe:0']
+    if has_subtitle and subtitle_mode == "soft":
+        cmd.extend(['-i', subtitle_file])
+    if subtitle_mode != "soft":
+        video_filter = build_video_filter(get_video_encode_settings(), subtitle_file if has_subtitle else None)
+        if video_filter:
+            cmd.extend(['-vf', video_filter])
+    cmd.extend(['-map', '0:v:0', '-map', '1:a:0'])
+    cmd.extend(build_video_output_args(output_file, subtitle_mode,
+                                       2 if has_subtitle and subtitle_mode == "soft" else None))
+    cmd.extend(['-c:a', audio_codec_for(output_file), '-shortest', output_file, '-y'])
+    
+    jobs = deduplicate_steps(steps, "", tts_provider)
+    print(f"\n📢 {len(steps)} adım bellekte seslendiriliyor "
+          f"({len(jobs)} benzersiz klip, eşzamanlılık: {concurrency})...")
+    
+    async def prepare() -> Tuple[List[Tuple[int, bytes]], Dict]:
+        clips, trimmed = await synthesize_pcm_clips(jobs, tts_provider, api_key, concurrency, cache,
+                                                    get_trim_params())
+        segments, report = await plan_pcm_track(steps, jobs, clips, scale_factor, total_duration)
+        report['trimmed'] = trimmed
+        return segments, report
+    
+    tts_started = time.perf_counter()
+    try:
+        segments, report = asyncio.run(prepare())
+        report['tts_time'] = time.perf_counter() - tts_started
+    except RuntimeError as e:
+        print(f"❌ Bellekteki ses hazırlanamadı: {str(e)}")
+        return False, None
+    finally:
+        if cache:
+            cache.evict()
+    
+    if report['overrun'] > LAYOUT_OVERRUN_TOLERANCE:
+        print(f"⚠️ Anlatım video sonunu {report['overrun']:.2f}s aşıyor, dosya tabanlı yola dönülüyor")
+        return False, None
+    
+    async def run() -> Tuple[int, bool, bytes]:
+        process = await asyncio.create_subprocess_exec(
+            *scheduled, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        stderr_reader = asyncio.ensure_future(process.stderr.read())
+        try:
+            await write_pcm_track(process.stdin, segments, total_duration)
+            written = True
+        except (BrokenPipeError, ConnectionResetError):
+            written = False  # ffmpeg erken kapandı; hata stderr'de
+        return await process.wait(), written, await stderr_reader
+    
+    kind = "audio" if subtitle_mode == "soft" else "video"
+    with get_ffmpeg_scheduler().reserve(kind) as cores:
+        scheduled = with_thread_limits(cmd, output_file, cores)
+        returncode, written, stderr = asyncio.run(run())
+    
+    if returncode != 0 or not written:
+        print(f"❌ Bellekten render hatası: {stderr.decode('utf-8', errors='replace')[-500:]}")
+        return False, None
+    
+    print(f"   {report['voiced']}/{len(steps)} adım seslendirildi, {report['compressed']} klip hızlandırıldı, "
+          f"{report['delayed']} klip önceki klip bitene kadar kaydırıldı")
+    if report['trimmed']:
+        print(f"✂️ Sessizlik kırpıldı: {report['trimmed']:.2f} saniye kazanıldı")
+    print(f"✅ Final video oluşturuldu: {output_file}")
+    return True, report
+
+# ============================================================================
+# 4.2.3 NUMPY SES MONTAJI
+# ============================================================================
+
+# AUDIO_ASSEMBLER=auto: NumPy yüklüyse anlatım izi bellekte oluşturulur, değilse ffmpeg grafiği
+# AUDIO_ASSEMBLER=numpy / ffmpeg: seçilen yol zorlanır (numpy yoksa ffmpeg'e dönülür)
+AUDIO_ASSEMBLERS = ("auto", "numpy", "ffmpeg")
+ASSEMBLY_PEAK_DB = -1.0  # AUDIO_NORMALIZE=1 ile her klibin tepe seviyesi bu değere getirilir
+ASSEMBLY_MAX_GAIN_DB = 12.0  # Sessiz kliplerin en fazla bu kadar yükseltilmesine izin verilir
+ASSEMBLY_FADE_MS = 10  # Klip kenarlarındaki tık sesini önleyen fade süresi
+
+def get_audio_assembler() -> str:
+    """AUDIO_ASSEMBLER environment variable'ını okur (varsayılan: auto)"""
+    assembler = os.getenv("AUDIO_ASSEMBLER", "auto").lower()
+    if assembler not in AUDIO_ASSEMBLERS:
+        print(f"⚠️ Bilinmeyen ses montaj yolu: {assembler}, 'auto' kullanılacak")
+        return "auto"
+    return assembler
+
+def audio_normalize_enabled() -> bool:
+    """AUDIO_NORMALIZE environment variable'ını okur (varsayılan: kapalı)"""
+    return os.getenv("AUDIO_NORMALIZE", "0") == "1"
+
+def assemble_narration_track(placements: List[Dict], total_duration: float, output_file: str) -> bool:
+    """Klipleri NumPy ile tek bir zaman çizelgesi dizisine yerleştirip WAV olarak yazar
+    
+    Her benzersiz (klip, tempo) çifti bir kez PCM'e çevrilir (hızlandırma
+    decode sırasında atempo ile yapılır). Klip sessizlikleri trim_step_audio
+    ile önceden kesilmiştir; burada AUDIO_NORMALIZE=1 ise tepe seviyesi
+    eşitlenir ve kenarlara fade uygulanır. Klipler önceden ayrılmış dizide
+    adım zamanlarına eklenir ve sonuç tek seferde yazılır.
+    
+    Returns:
+        İz yazıldıysa True; NumPy yoksa veya decode başarısızsa False
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        print("⚠️ 'numpy' kütüphanesi yüklü değil, ses izi ffmpeg ile oluşturulacak.")
+        return False
+    
+    if not placements:
+        return False
+    started = time.perf_counter()
+    first_info = read_mp3_info(placements[0]['file'])
+    sample_rate = first_info['sample_rate'] if first_info else STREAM_SAMPLE_RATE
+    channels = first_info['channels'] if first_info else STREAM_CHANNELS
+    
+    variants = list(dict.fromkeys((p['file'], round(p['tempo'], 4)) for p in placements))
+    
+    async def decode_all() -> List[bytes]:
+        semaphore = asyncio.Semaphore(os.cpu_count() or 1)
+        
+        async def decode(path: str, tempo: float) -> bytes:
+            async with semaphore:
+                audio_filter = build_atempo_filter(tempo) if tempo > 1.0 else None
+                pcm, _ = await decode_mp3_to_pcm(read_file_chunks(path), sample_rate, channels, audio_filter)
+                return pcm
+        return await asyncio.gather(*(decode(path, tempo) for path, tempo in variants))
+    
+    try:
+        decoded = asyncio.run(decode_all())
+    except (OSError, RuntimeError) as e:
+        print(f"❌ Klipler PCM'e çevrilemedi: {str(e)}")
+        return False
+    
+    fade_length = int(sample_rate * ASSEMBLY_FADE_MS / 1000)
+    peak_target = 10 ** (ASSEMBLY_PEAK_DB / 20)
+    max_gain = 10 ** (ASSEMBLY_MAX_GAIN_DB / 20)
+    normalize = audio_normalize_enabled()
+    
+    clips = {}
+    for variant, pcm in zip(variants, decoded):
+        samples = np.frombuffer(pcm, dtype=np.int16).reshape(-1, channels).astype(np.float32) / 32768.0
+        if len(samples) == 0:
+            clips[variant] = samples
+            continue
+        if normalize:
+            peak = float(np.abs(samples).max())
+            samples *= min(peak_target / peak, max_gain) if peak > 0 else 1.0
+        fade = min(fade_length, len(samples) // 2)
+        if fade:
+            ramp = np.linspace(0.0, 1.0, fade, dtype=np.float32)[:, None]
+            samples[:fade] *= ramp
+            samples[-fade:] *= ramp[::-1]
+        clips[variant] = samples
+    
+    offsets = [int(round(p['start'] * sample_rate)) for p in placements]
+    ends = [offset + len(clips[(p['file'], round(p['tempo'], 4))]) for p, offset in zip(placements, offsets)]
+    length = int(round(total_duration * sample_rate)) if total_duration > 0 else max(ends)
+    timeline = np.zeros((length, channels), dtype=np.float32)
+    for placement, offset in zip(placements, offsets):
+        clip = clips[(placement['file'], round(placement['tempo'], 4))]
+        end = min(offset + len(clip), length)
+        if end > offset:
+            timeline[offset:end] += clip[:end - offset]
+    
+    pcm = (np.clip(timeline, -1.0, 1.0) * 32767.0).astype(np.int16)
+    tmp_file = f"{output_file}.{os.getpid()}.tmp"
+    with wave.open(tmp_file, 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(STREAM_SAMPLE_WIDTH)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm.tobytes())
+    os.replace(tmp_file, output_file)
+    print(f"✅ Anlatım izi NumPy ile oluşturuldu ({len(placements)} klip, "
+          f"{(time.perf_counter() - started) * 1000:.0f}ms): {output_file}")
+    return True
+
+# ============================================================================
+# 4.3 FFMPEG İŞ ZAMANLAYICISI (CPU BÜTÇESİ)
+# ============================================================================
+
+# Ağır işler (libx264 encode) ile hafif işler (ses encode, stream copy) farklı
+# çekirdek payı alır. Aynı anda tek bir ağır iş çalışır; kalan çekirdekler
+# hafif işlere ayrılır. Segment encode'ları (bir videonun parçaları) küçük
+# çekirdek payıyla paralel çalışır, sadece ağır bir işin bitmesini bekler.
+FFMPEG_JOB_KINDS = ("audio", "video", "segment")
+SEGMENT_THREADS = 2  # Her segment encode'una verilen çekirdek sayısı
+
+class FFmpegScheduler:
+    """Tüm ffmpeg çağrıları için global çekirdek bütçesini yöneten zamanlayıcı
+    
+    Her çağrı önce bütçeden çekirdek ayırır, ffmpeg'e bu sayı `-threads` /
+    `-filter_threads` olarak verilir. Bütçe doluysa iş sırada bekler.
+    
+    Toplu render'da (process pool) bütçenin process'ler arasında paylaşılması
+    için condition ve state bir multiprocessing.Manager'dan verilebilir.
+    """
+    
+    def __init__(self, total_cores: int = None, condition=None, state=None):
+        self.total_cores = max(1, total_cores or os.cpu_count() or 1)
+        # Hafif işler için ayrılan çekirdekler; ağır iş geri kalanını alır
+        self.audio_reserve = max(1, self.total_cores // 4) if self.total_cores > 1 else 0
+        self.video_cores = max(1, self.total_cores - self.audio_reserve)
+        self._condition = condition if condition is not None else threading.Condition()
+        self._state = state if state is not None else {'used': 0, 'heavy': 0}
+    
+    @classmethod
+    def from_env(cls, condition=None, state=None) -> "FFmpegScheduler":
+        """FFMPEG_CORES environment variable'ından zamanlayıcı oluşturur (varsayılan: CPU sayısı)"""
+        try:
+            total_cores = int(os.getenv("FFMPEG_CORES", os.cpu_count() or 1))
+        except ValueError:
+            total_cores = os.cpu_count() or 1
+        return cls(total_cores, condition, state)
+    
+    def cores_for(self, kind: str) -> int:
+        """İş türü için ayrılacak çekirdek sayısı"""
+        if kind == "video":
+            return self.video_cores
+        if kind == "segment":
+            return min(SEGMENT_THREADS, self.video_cores)
+        return 1
+    
+    def _can_start(self, kind: str, cores: int) -> bool:
+        used = self._state['used']
+        if kind == "video":
+            # Aynı anda tek ağır iş; bekleyen hafif işler ona yer açmak zorunda değil
+            return self._state['heavy'] == 0 and used + cores <= self.total_cores
+        if kind == "segment":
+            return self._state['heavy'] == 0 and used + cores <= self.total_cores
+        return used + cores <= self.total_cores
+    
+    def acquire(self, kind: str = "audio") -> int:
+        """Bütçeden çekirdek ayırır (yer açılana kadar bekler) ve ayrılan sayıyı döndürür"""
+        cores = self.cores_for(kind)
+        with self._condition:
+            while not self._can_start(kind, cores):
+                self._condition.wait()
+            self._state['used'] = self._state['used'] + cores
+            if kind == "video":
+                self._state['heavy'] = self._state['heavy'] + 1
+        return cores
+    
+    def release(self, kind: str, cores: int):
+        """acquire ile ayrılan çekirdekleri bütçeye geri verir"""
+        with self._condition:
+            self._state['used'] = self._state['used'] - cores
+            if kind == "video":
+                self._state['heavy'] = self._state['heavy'] - 1
+            self._condition.notify_all()
+    
+    @contextlib.contextmanager
+    def reserve(self, kind: str = "audio"):
+        """Bütçeden çekirdek ayırır, iş bitince geri verir"""
+        cores = self.acquire(kind)
+        try:
+            yield cores
+        finally:
+            self.release(kind, cores)
+
+_ffmpeg_scheduler = None
+
+def get_ffmpeg_scheduler() -> FFmpegScheduler:
+    """Process'e ait zamanlayıcıyı döndürür (yoksa environment'tan oluşturur)"""
+    global _ffmpeg_scheduler
+    if _ffmpeg_scheduler is None:
+        _ffmpeg_scheduler = FFmpegScheduler.from_env()
+    return _ffmpeg_scheduler
+
+def set_ffmpeg_scheduler(scheduler: FFmpegScheduler):
+    """Paylaşılan zamanlayıcıyı ayarlar (process pool worker initializer'ı olarak kullanılır)"""
+    global _ffmpeg_scheduler
+    _ffmpeg_scheduler = scheduler
+
+_reservation_executor = None
+
+@contextlib.asynccontextmanager
+async def reserve_ffmpeg_async(kind: str = "audio"):
+    """FFmpegScheduler.reserve'ün event loop'u bloklamayan karşılığı
+    
+    Bütçede yer açılması ayrı bir thread'de beklenir. Bekleyen iş iptal
+    edilirse sonradan ayrılan çekirdekler hemen geri verilir.
+    """
+    global _reservation_executor
+    if _reservation_executor is None:
+        _reservation_executor = ThreadPoolExecutor(thread_name_prefix="ffmpeg-reserve")
+    scheduler = get_ffmpeg_scheduler()
+    waiter = _reservation_executor.submit(scheduler.acquire, kind)
+    
+    def release_late(done):
+        if not done.cancelled() and done.exception() is None:
+            scheduler.release(kind, done.result())
+    
+    try:
+        cores = await asyncio.wrap_future(waiter)
+    except asyncio.CancelledError:
+        waiter.add_done_callback(release_late)
+        raise
+    try:
+        yield cores
+    finally:
+        scheduler.release(kind, cores)
+
+def run_ffmpeg(cmd: List[str], output_file: str, kind: str = "audio", **kwargs) -> subprocess.CompletedProcess:
+    """ffmpeg komutunu zamanlayıcıdan çekirdek ayırarak çalıştırır
+    
+    Ayrılan çekirdek sayısı global `-filter_threads` ve çıktıya ait `-threads`
+    seçeneği olarak komuta eklenir.
+    
+    Args:
+        cmd: ffmpeg komutu
+        output_file: Komuttaki çıktı dosyası (-threads bunun önüne eklenir)
+        kind: 'video' (ağır encode), 'segment' (paralel segment encode) veya 'audio' (hafif iş)
+        **kwargs: subprocess.run argümanları (timeout, check)
+    """
+    with get_ffmpeg_scheduler().reserve(kind) as cores:
+        return subprocess.run(with_thread_limits(cmd, output_file, cores), capture_output=True, text=True, **kwargs)
+
+def with_thread_limits(cmd: List[str], output_file: str, cores: int) -> List[str]:
+    """Komuta global `-filter_threads` ve çıktıya ait `-threads` seçeneklerini ekler"""
+    output_index = len(cmd) - 1 - cmd[::-1].index(output_file)
+    return ([cmd[0], '-filter_threads', str(cores)] + cmd[1:output_index] +
+            ['-threads', str(cores)] + cmd[output_index:])
+
+# ============================================================================
+# 4.3.1 PARALEL SEGMENT ENCODE
+# ============================================================================
+
+# SEGMENT_ENCODE=auto: uzun videolar keyframe'lerden bölünüp paralel encode edilir
+# SEGMENT_ENCODE=off: video tek ffmpeg process'inde encode edilir
+SEGMENT_ENCODE_MODES = ("auto", "off")
+SEGMENT_MIN_VIDEO_DURATION = 60.0  # Bu süreden kısa videolar bölünmez (saniye)
+SEGMENT_MIN_DURATION = 10.0  # Bir segmentin en kısa süresi (saniye)
+
+def get_segment_encode_mode() -> str:
+    """SEGMENT_ENCODE environment variable'ını okur (varsayılan: auto)"""
+    mode = os.getenv("SEGMENT_ENCODE", "auto").lower()
+    if mode not in SEGMENT_ENCODE_MODES:
+        print(f"⚠️ Bilinmeyen segment encode modu: {mode}, 'auto' kullanılacak")
+        return "auto"
+    return mode
+
+def plan_video_segments(keyframes: List[float], duration: float, count: int) -> List[Tuple[float, float]]:
+    """Videoyu keyframe'lerden yaklaşık eşit uzunlukta en fazla count segmente böler
+    
+    Her sınır, eşit bölme noktasına en yakın keyframe'dir; böylece her segment
+    bir keyframe ile başlar ve stream copy ile birleştirilebilir.
+    
+    Returns:
+        [(başlangıç, bitiş)] listesi; bölünemiyorsa tek segment
+    """
+    count = min(count, int(duration // SEGMENT_MIN_DURATION))
+    if count < 2 or not keyframes:
+        return [(0.0, duration)]
+    
+    boundaries = [0.0]
+    for n in range(1, count):
+        target = duration * n / count
+        nearest = min(keyframes, key=lambda keyframe: abs(keyframe - target))
+        if (nearest - boundaries[-1] >= SEGMENT_MIN_DURATION
+                and duration - nearest >= SEGMENT_MIN_DURATION):
+            boundaries.append(nearest)
+    boundaries.append(duration)
+    return list(zip(boundaries, boundaries[1:]))
+
+def encode_video_range(video_file: str, start: float, end: float, output_file: str, settings: Dict,
+                       subtitle_file: str = None) -> bool:
+    """Videonun [start, end) aralığını (start bir keyframe olmalı) tek parça olarak encode eder
+    
+    Subtitle dosyası verilirse aralığa düşen satırlar 0'a kaydırılıp gömülür.
+    """
+    range_subtitle = None
+    if subtitle_file and os.path.exists(subtitle_file):
+        range_subtitle = f"{os.path.splitext(output_file)[0]}.srt"
+        if not slice_srt_subtitle(subtitle_file, start, end, range_subtitle):
+            range_subtitle = None
+    
+    # -ss input'tan önce: keyframe'den başlanır, zaman damgaları 0'dan başlar
+    cmd = ['ffmpeg', '-ss', f"{start:.3f}", '-i', video_file, '-t', f"{end - start:.3f}",
+           '-map', '0:v:0', '-an', '-sn']
+    video_filter = build_video_filter(settings, range_subtitle)
+    if video_filter:
+        cmd.extend(['-vf', video_filter])
+    cmd.extend(build_video_encode_args(settings))
+    cmd.extend([output_file, '-y'])
+    try:
+        run_ffmpeg(cmd, output_file, "segment", check=True)
+        return True
+    except subprocess.CalledProcessError as e:
+        print(f"❌ Segment encode hatası ({start:.1f}s-{end:.1f}s): {e.stderr[-300:]}")
+        return False
+
+def concat_video_parts(part_files: List[str], output_file: str, output_args: List[str] = None) -> bool:
+    """Aynı codec ayarlarındaki video parçalarını concat demuxer ile stream copy olarak birleştirir"""
+    concat_list = f"{os.path.splitext(output_file)[0]}_parts.txt"
+    with open(concat_list, 'w', encoding='utf-8') as f:
+        for part_file in part_files:
+            f.write(f"file '{os.path.abspath(part_file)}'\n")
+    cmd = ['ffmpeg', '-f', 'concat', '-safe', '0', '-i', concat_list, '-c', 'copy',
+           *(output_args or []), '-movflags', '+faststart', output_file, '-y']
+    try:
+        run_ffmpeg(cmd, output_file, "audio", check=True)
+        return True
+    except subprocess.CalledProcessError as e:
+        print(f"❌ Video parçaları birleştirilemedi: {e.stderr[-300:]}")
+        return False
+    finally:
+        os.remove(concat_list)
+
+def encode_video_segmented(video_file: str, output_file: str, settings: Dict = None,
+                           subtitle_file: str = None) -> bool:
+    """Videoyu keyframe'lerden bölüp segmentleri paralel encode eder, stream copy ile birleştirir
+    
+    Her segment kendi ffmpeg process'inde, subtitle dosyasının o aralığa
+    düşen ve 0'a kaydırılmış parçasıyla encode edilir. Video kısa ise,
+    keyframe bilgisi yoksa veya SEGMENT_ENCODE=off ise hiçbir şey yapılmaz.
+    
+    Returns:
+        Segmentli encode yapıldıysa True; False dönerse çağıran tek parça encode yapmalıdır
+    """
+    if get_segment_encode_mode() == "off":
+        return False
+    if settings is None:
+        settings = get_video_encode_settings()
+    
+    duration = get_video_duration(video_file)
+    if not duration or duration < SEGMENT_MIN_VIDEO_DURATION:
+        return False
+    
+    scheduler = get_ffmpeg_scheduler()
+    workers = max(1, scheduler.video_cores // scheduler.cores_for("segment"))
+    segments = plan_video_segments(get_keyframe_times(video_file), duration, workers)
+    if len(segments) < 2:
+        return False
+    
+    work_dir = f"{os.path.splitext(output_file)[0]}_segments"
+    os.makedirs(work_dir, exist_ok=True)
+    segment_files = [os.path.join(work_dir, f"segment_{i:03d}.mp4") for i in range(len(segments))]
+    
+    def encode_segment(index: int) -> bool:
+        start, end = segments[index]
+        return encode_video_range(video_file, start, end, segment_files[index], settings, subtitle_file)
+    
+    print(f"   {len(segments)} segment paralel encode ediliyor ({workers} worker)...")
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(encode_segment, range(len(segments))))
+        if not all(results) or not concat_video_parts(segment_files, output_file):
+            return False
+        
+        print(f"✅ {len(segments)} segment encode edildi ({time.perf_counter() - started:.1f}s)")
+        return True
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+# ============================================================================
+# 4.3.2 SMART RENDER (SADECE SUBTITLE'LI GOP'LAR ENCODE EDİLİR)
+# ============================================================================
+
+# ffprobe H.264 profil adı -> x264 profil adı (diğer profiller smart render'da desteklenmez)
+X264_PROFILES = {
+    'Constrained Baseline': 'baseline',
+    'Baseline': 'baseline',
+    'Main': 'main',
+    'High': 'high',
+}
+SMART_RENDER_MAX_DRIFT = 0.5  # Birleştirilen videonun kaynaktan en fazla bu kadar farklı sürmesine izin verilir
+
+# SMART_VERIFY=joins: sadece kopyalanan/encode edilen parçaların birleşim yerleri decode edilir
+# SMART_VERIFY=full: birleştirilen videonun tamamı decode edilir (encode kadar sürebilir)
+SMART_VERIFY_MODES = ("joins", "full")
+SMART_VERIFY_WINDOW = 1.0  # Birleşim yerinin önünden ve arkasından decode edilen süre (saniye)
+SMART_VERIFY_BATCH = 16  # Tek ffmpeg çağrısında decode edilen birleşim yeri sayısı
+
+def get_smart_verify_mode() -> str:
+    """SMART_VERIFY environment variable'ını okur (varsayılan: joins)"""
+    mode = os.getenv("SMART_VERIFY", "joins").lower()
+    if mode not in SMART_VERIFY_MODES:
+        print(f"⚠️ Bilinmeyen smart render doğrulama modu: {mode}, 'joins' kullanılacak")
+        return "joins"
+    return mode
+
+def smart_render_settings(video_info: Dict, settings: Dict) -> Dict:
+    """Encode edilen GOP'lar için ayarları kaynak videodan türetir
+    
+    Profil, level, referans kare sayısı ve B-frame kullanımı kaynakla aynı
+    tutulur; böylece kopyalanan ve encode edilen parçalar aynı decoder
+    yapılandırmasıyla çözülebilir. Kare atma (decimate) ve tune uygulanmaz.
+    
+    Returns:
+        Encode ayarları; kaynak profili x264 ile üretilemiyorsa None
+    """
+    h264_profile = X264_PROFILES.get(video_info.get('profile'))
+    if not h264_profile or not video_info.get('level'):
+        return None
+    x264_params = [f"ref={video_info.get('refs') or 1}"]
+    if not video_info.get('has_b_frames'):
+        x264_params.append("bframes=0")
+    derived = {key: settings[key] for key in ('codec', 'preset', 'crf', 'pix_fmt')}
+    derived.update({
+        'h264_profile': h264_profile,
+        'level': f"{video_info['level'] / 10:g}",
+        'x264_params': ":".join(x264_params),
+    })
+    return derived
+
+def verify_video_file(video_file: str, expected_duration: float, joins: List[float] = None) -> bool:
+    """Videonun süresini kontrol eder ve decode ederek hata arar
+    
+    joins verilirse sadece bu zamanların SMART_VERIFY_WINDOW önü ve arkası
+    decode edilir (her pencere önceki keyframe'den başlar); verilmezse video
+    baştan sona decode edilir.
+    """
+    info = read_mp4_info(video_file)
+    if not info or not info['video'] or abs(info['duration'] - expected_duration) > SMART_RENDER_MAX_DRIFT:
+        return False
+    
+    if joins is None:
+        batches = [['-i', video_file, '-map', '0:v:0']]
+    else:
+        batches = []
+        for first in range(0, len(joins), SMART_VERIFY_BATCH):
+            batch = joins[first:first + SMART_VERIFY_BATCH]
+            args = []
+            for join in batch:
+                args.extend(['-ss', f"{max(0.0, join - SMART_VERIFY_WINDOW):.3f}",
+                             '-t', f"{2 * SMART_VERIFY_WINDOW:.3f}", '-i', video_file])
+            for index in range(len(batch)):
+                args.extend(['-map', f"{index}:v:0"])
+            batches.append(args)
+    
+    for args in batches:
+        cmd = ['ffmpeg', '-v', 'error', *args, '-f', 'null', '-']
+        try:
+            result = run_ffmpeg(cmd, '-', "audio")
+        except OSError:
+            return False
+        if result.returncode != 0 or result.stderr.strip():
+            return False
+    return True
+
+def plan_smart_render(keyframes: List[float], duration: float, cues: List[Dict]) -> List[Dict]:
+    """Keyframe aralıklarını (GOP) subtitle'a göre encode/copy parçalarına ayırır
+    
+    Bir subtitle ile çakışan GOP'lar encode edilir, diğerleri stream copy ile
+    kopyalanır. Aynı türdeki ardışık GOP'lar tek parçada birleştirilir.
+    
+    Returns:
+        [{'start', 'end', 'encode'}] listesi
+    """
+    parts = []
+    bounds = [k for k in keyframes if k < duration] + [duration]
+    for start, end in zip(bounds, bounds[1:]):
+        if end <= start:
+            continue
+        encode = any(cue['start'] < end and cue['end'] > start for cue in cues)
+        if parts and parts[-1]['encode'] == encode:
+            parts[-1]['end'] = end
+        else:
+            parts.append({'start': start, 'end': end, 'encode': encode})
+    return parts
+
+def smart_render_subtitles(video_file: str, output_file: str, subtitle_file: str, settings: Dict = None) -> bool:
+    """Subtitle'ı sadece subtitle görünen GOP'ları yeniden encode ederek gömer
+    
+    Subtitle içermeyen keyframe aralıkları kaynak videodan stream copy ile
+    alınır. Encode ayarları kaynaktan türetilir (smart_render_settings) ve
+    parçalar MPEG-TS olarak yazılır; böylece her keyframe'in önünde kendi
+    SPS/PPS'i bulunur. Parçalar parametre setlerini örneklerde taşıyan `avc3`
+    MP4 olarak birleştirilir; sonuç, varsayılan olarak sadece parçaların
+    birleşim yerleri decode edilerek doğrulanır (SMART_VERIFY).
+    
+    Returns:
+        Smart render yapıldıysa True; False dönerse çağıran normal burn-in yapmalıdır
+    """
+    if settings is None:
+        settings = get_video_encode_settings()
+    
+    info = probe_media(video_file)
+    video_info = info['video'] if info else None
+    if (not video_info or video_info['codec'] != 'h264' or settings['codec'] != 'libx264'
+            or video_info['pix_fmt'] != settings['pix_fmt']):
+        print("⚠️ Kaynak video smart render ile uyumlu değil (h264/yuv420p gerekli), tam encode yapılacak")
+        return False
+    settings = smart_render_settings(video_info, settings)
+    if settings is None:
+        print(f"⚠️ Kaynak H.264 profili ({video_info.get('profile')}) smart render ile uyumlu değil, "
+              f"tam encode yapılacak")
+        return False
+    
+    keyframes = get_keyframe_times(video_file)
+    if not keyframes:
+        return False
+    
+    parts = plan_smart_render(keyframes, info['duration'], read_srt_subtitle(subtitle_file))
+    work_dir = f"{os.path.splitext(output_file)[0]}_smart"
+    os.makedirs(work_dir, exist_ok=True)
+    part_files = [os.path.join(work_dir, f"part_{i:03d}.ts") for i in range(len(parts))]
+    
+    def render_part(index: int) -> bool:
+        part = parts[index]
+        if part['encode']:
+            return encode_video_range(video_file, part['start'], part['end'], part_files[index],
+                                      settings, subtitle_file)
+        cmd = ['ffmpeg', '-ss', f"{part['start']:.3f}", '-i', video_file,
+               '-t', f"{part['end'] - part['start']:.3f}", '-map', '0:v:0', '-an', '-sn',
+               '-c:v', 'copy', '-bsf:v', 'h264_mp4toannexb', '-avoid_negative_ts', 'make_zero',
+               part_files[index], '-y']
+        try:
+            run_ffmpeg(cmd, part_files[index], "audio", check=True)
+            return True
+        except subprocess.CalledProcessError as e:
+            print(f"❌ Parça kopyalanamadı ({part['start']:.1f}s): {e.stderr[-300:]}")
+            return False
     
+    encoded_seconds = sum(part['end'] - part['start'] for part in parts if part['encode'])
+    print(f"   Smart render: {info['duration']:.1f}s videonun {encoded_seconds:.1f}s'i encode edilecek "
+          f"({len(parts)} parça)")
+    
+    scheduler = get_ffmpeg_scheduler()
+    workers = max(1, scheduler.video_cores // scheduler.cores_for("segment"))
+    output_args = ['-tag:v', 'avc3']
+    timescale = (video_info.get('time_base') or '').partition('/')[2]
+    if timescale.isdigit():
+        output_args.extend(['-video_track_timescale', timescale])
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        os.remove(concat_file)
-        print(f"✅ Ses dosyaları birleştirildi: {output_file}")
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"❌ FFmpeg hatası: {e.stderr}")
-        if os.path.exists(concat_file):
-            os.remove(concat_file)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(render_part, range(len(parts))))
+        if not all(results) or not concat_video_parts(part_files, output_file, output_args):
+            return False
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    joins = None if get_smart_verify_mode() == "full" else [part['start'] for part in parts[1:]]
+    if not verify_video_file(output_file, info['duration'], joins):
+        print("⚠️ Smart render çıktısı doğrulanamadı, tam encode yapılacak")
+        os.remove(output_file)
         return False
+    return True
 
-def loop_video_to_duration(video_file: str, target_duration: float, output_file: str) -> bool:
-    """Video'yu loop'layarak hedef süreye uzatır"""
+# ============================================================================
+# 4.4 AŞAMA MANİFEST'İ (ARTIMLI YENİDEN OLUŞTURMA)
+# ============================================================================
+
+# Parse mantığı değiştiğinde eski manifest kayıtlarını geçersiz kılmak için artırılır
+PARSER_VERSION = 6
+
+def parser_settings() -> Dict:
+    """Adım metinlerini ve zamanlarını belirleyen tablolar (parse aşamasının anahtarına girer)
+    
+    Çeviri, açıklama veya süre tablosu düzenlendiğinde test dosyası
+    değişmese de adımlar yeniden oluşturulur.
+    """
+    return {
+        'narrated_commands': NARRATED_COMMANDS,
+        'command_durations': COMMAND_DURATIONS,
+        'default_command_duration': DEFAULT_COMMAND_DURATION,
+        'type_delay_per_char': TYPE_DELAY_PER_CHAR,
+        'test_gap': TEST_GAP,
+        'speech_chars_per_second': SPEECH_CHARS_PER_SECOND,
+        'comment_translations': COMMENT_TRANSLATIONS,
+        'command_explanations': COMMAND_EXPLANATIONS,
+    }
+
+def stage_key(*parts) -> str:
+    """Aşama girdilerinden (JSON'a çevrilebilir değerler) kararlı bir özet üretir"""
+    encoded = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+def file_fingerprint(path: str) -> List:
+    """Dosyayı okumadan değişip değişmediğini anlamak için (yol, boyut, mtime) döndürür"""
     try:
-        current_duration = get_video_duration(video_file)
-        if not current_duration or current_duration <= 0:
+        stat = os.stat(path)
+        return [os.path.abspath(path), stat.st_size, stat.st_mtime_ns]
+    except OSError:
+        return [os.path.abspath(path), None, None]
+
+class StageManifest:
+    """Her aşamanın girdi özetini ve çıktılarını tutan JSON manifest
+    
+    Bir aşama, girdi özeti kayıtlı olanla aynıysa ve kayıtlı çıktı dosyaları
+    boyut/mtime olarak değişmemişse güncel sayılır ve atlanır. INCREMENTAL=0
+    ile manifest yok sayılır (her şey yeniden oluşturulur).
+    """
+    
+    def __init__(self, path: str, enabled: bool = True):
+        self.path = path
+        self.enabled = enabled
+        self.stages = {}
+        self._dirty = False
+        if enabled and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.stages = json.load(f).get('stages', {})
+            except (ValueError, OSError):
+                self.stages = {}
+    
+    @classmethod
+    def for_output(cls, final_video: str) -> "StageManifest":
+        """Final videonun yanındaki manifest dosyasını açar"""
+        enabled = os.getenv("INCREMENTAL", "1") != "0"
+        return cls(f"{os.path.splitext(final_video)[0]}.manifest.json", enabled)
+    
+    def is_fresh(self, stage: str, key: str, outputs: List[str] = None) -> bool:
+        """Aşamanın girdileri ve çıktıları kayıtlı haliyle aynı mı?"""
+        record = self.stages.get(stage)
+        if not self.enabled or not record or record.get('key') != key:
             return False
+        for path in outputs or []:
+            if record.get('outputs', {}).get(path) != file_fingerprint(path):
+                return False
+        return True
+    
+    def data(self, stage: str):
+        """Aşamanın kayıtlı sonuç verisini döndürür"""
+        return self.stages[stage].get('data')
+    
+    def record(self, stage: str, key: str, outputs: List[str] = None, data=None):
+        """Aşamanın yeni girdi özetini, çıktı parmak izlerini ve sonucunu kaydeder"""
+        self.stages[stage] = {
+            'key': key,
+            'outputs': {path: file_fingerprint(path) for path in outputs or []},
+            'data': data,
+        }
+        self._dirty = True
+    
+    def save(self):
+        """Değişiklik varsa manifest'i diske yazar"""
+        if not self.enabled or not self._dirty:
+            return
+        tmp_file = f"{self.path}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'stages': self.stages}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_file, self.path)
+        self._dirty = False
+
+# ============================================================================
+# 4.5 SAHNE DEĞİŞİMİ ANALİZİ
+# ============================================================================
+
+# Analiz için video küçültülmüş gri tonlu karelere çevrilir
+SCENE_FRAME_WIDTH = 160
+SCENE_FRAME_HEIGHT = 90
+SCENE_SAMPLE_FPS = 10
+SCENE_BATCH_FRAMES = 256  # NumPy'a tek seferde verilen kare sayısı
+SCENE_MIN_DIFF = 0.02  # Ortalama piksel farkı (0-1) bu değerin altındaysa sahne değişimi sayılmaz
+SCENE_MIN_GAP = 0.5  # İki sahne değişimi arasındaki en kısa süre (saniye)
+SCENE_SNAP_WINDOW = 1.5  # Bir adım en fazla bu kadar uzaktaki değişime kaydırılır (saniye)
+DEFAULT_SCENE_CACHE_DIR = ".scene_cache"
+
+def scene_analysis_enabled() -> bool:
+    """SCENE_SNAP=0 ile sahne analizi kapatılabilir"""
+    return os.getenv("SCENE_SNAP", "1") != "0"
+
+def scene_analysis_params() -> Dict:
+    """Kare farkı sonucunu etkileyen parametreler (cache anahtarına girer)"""
+    return {'width': SCENE_FRAME_WIDTH, 'height': SCENE_FRAME_HEIGHT, 'fps': SCENE_SAMPLE_FPS}
+
+def compute_frame_diffs(video_file: str) -> List[float]:
+    """Ardışık karelerin ortalama mutlak farkını (0-1) hesaplar
+    
+    ffmpeg küçültülmüş gri tonlu kareleri rawvideo olarak stdout'a yazar;
+    kareler SCENE_BATCH_FRAMES'lik gruplar halinde okunup NumPy ile
+    vektörel olarak karşılaştırılır. diffs[i], i. kare ile i+1. kare
+    arasındaki farktır.
+    
+    Returns:
+        Fark listesi, NumPy yoksa veya ffmpeg başarısız olursa None
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        print("⚠️ 'numpy' kütüphanesi yüklü değil, sahne analizi atlanıyor. 'pip install numpy' çalıştırın.")
+        return None
+    
+    frame_size = SCENE_FRAME_WIDTH * SCENE_FRAME_HEIGHT
+    scale = f"fps={SCENE_SAMPLE_FPS},scale={SCENE_FRAME_WIDTH}:{SCENE_FRAME_HEIGHT},format=gray"
+    diffs = []
+    previous = None
+    
+    with get_ffmpeg_scheduler().reserve("audio") as cores:
+        cmd = ['ffmpeg', '-v', 'error', '-threads', str(cores), '-i', video_file, '-an', '-sn',
+               '-vf', scale, '-f', 'rawvideo', '-pix_fmt', 'gray', 'pipe:1']
+        try:
+            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        except OSError as e:
+            print(f"⚠️ Sahne analizi başlatılamadı: {e}")
+            return None
         
-        # Kaç kez loop'lanması gerektiğini hesapla
-        loops_needed = int(target_duration / current_duration) + 1
-        
-        # Concat listesi oluştur
-        concat_file = "video_loop_list.txt"
-        with open(concat_file, 'w', encoding='utf-8') as f:
-            video_path = video_file.replace('\\', '/')
-            for _ in range(loops_needed):
-                f.write(f"file '{video_path}'\n")
-        
-        # FFmpeg ile birleştir
-        cmd = [
-            'ffmpeg',
-            '-f', 'concat',
-            '-safe', '0',
-            '-i', concat_file,
-            '-t', str(target_duration),  # Hedef süreye kadar kes
-            '-c', 'copy',
-            output_file,
-            '-y'
-        ]
+        # stderr'in dolup ffmpeg'i kilitlememesi için ayrı thread'de okunur
+        stderr_chunks = []
+        stderr_reader = threading.Thread(target=lambda: stderr_chunks.append(process.stderr.read()))
+        stderr_reader.start()
         
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
-        os.remove(concat_file)
+        while True:
+            chunk = process.stdout.read(frame_size * SCENE_BATCH_FRAMES)
+            frame_count = len(chunk) // frame_size
+            if frame_count == 0:
+                break
+            frames = np.frombuffer(chunk[:frame_count * frame_size], dtype=np.uint8)
+            frames = frames.reshape(frame_count, frame_size).astype(np.int16)
+            if previous is not None:
+                frames = np.vstack([previous, frames])
+            if len(frames) > 1:
+                batch_diffs = np.abs(np.diff(frames, axis=0)).mean(axis=1) / 255.0
+                diffs.extend(round(float(d), 5) for d in batch_diffs)
+            previous = frames[-1:]
         
-        if result.returncode == 0:
-            print(f"✅ Video loop'landı: {current_duration:.2f}s -> {target_duration:.2f}s ({loops_needed} kez)")
-            return True
-        else:
-            print(f"❌ Video loop hatası: {result.stderr[:300]}")
-            return False
-            
-    except Exception as e:
-        print(f"❌ Video loop hatası: {str(e)}")
-        return False
+        process.stdout.close()
+        process.wait()
+        stderr_reader.join()
+    
+    if process.returncode != 0:
+        stderr = b"".join(stderr_chunks).decode('utf-8', errors='replace')
+        print(f"⚠️ Sahne analizi hatası: {stderr[-300:]}")
+        return None
+    return diffs
 
-def merge_video_audio(video_file: str, audio_file: str, output_file: str, subtitle_file: str = None):
-    """FFmpeg ile video ve sesi birleştirir, isteğe bağlı subtitle ekler"""
-    if not os.path.exists(video_file):
-        print(f"❌ Video dosyası bulunamadı: {video_file}")
-        return False
+def detect_scene_changes(diffs: List[float], fps: float = SCENE_SAMPLE_FPS) -> List[float]:
+    """Kare farklarındaki tepe noktalarını sahne değişimi zamanlarına (saniye) çevirir
     
-    if not os.path.exists(audio_file):
-        print(f"❌ Ses dosyası bulunamadı: {audio_file}")
-        return False
+    Eşik, farkların medyanının ve yayılımının üstünde (en az SCENE_MIN_DIFF)
+    seçilir; birbirine SCENE_MIN_GAP'ten yakın değişimlerden en büyüğü tutulur.
+    """
+    if not diffs:
+        return []
+    ordered = sorted(diffs)
+    median = ordered[len(ordered) // 2]
+    spread = sorted(abs(d - median) for d in diffs)[len(diffs) // 2]
+    threshold = max(SCENE_MIN_DIFF, median + 6 * spread)
     
-    cmd = ['ffmpeg', '-i', video_file, '-i', audio_file]
+    changes = []
+    for i, diff in enumerate(diffs):
+        if diff < threshold:
+            continue
+        # Değişim, farkın görüldüğü ikinci karenin zamanıdır
+        time_at = (i + 1) / fps
+        if changes and time_at - changes[-1][0] < SCENE_MIN_GAP:
+            if diff > changes[-1][1]:
+                changes[-1] = (time_at, diff)
+            continue
+        changes.append((time_at, diff))
+    return [round(time_at, 3) for time_at, _ in changes]
+
+def load_scene_changes(video_file: str, cache_dir: str = None) -> List[float]:
+    """Videonun sahne değişimi zamanlarını döndürür (kare farkları video özetine göre cache'lenir)
     
-    # Subtitle varsa ekle
-    if subtitle_file and os.path.exists(subtitle_file):
-        # Windows path için düzeltme
-        subtitle_path = subtitle_file.replace('\\', '/').replace(':', '\\:')
-        cmd.extend(['-vf', f"subtitles='{subtitle_path}':force_style='FontName=Arial,FontSize=24,PrimaryColour=&Hffffff,OutlineColour=&H000000'"])
+    Returns:
+        Saniye cinsinden değişim zamanları, analiz yapılamazsa None
+    """
+    # Analiz yapılamayacaksa videonun tamamı boşuna hash'lenmez
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        print("⚠️ 'numpy' kütüphanesi yüklü değil, sahne analizi atlanıyor. 'pip install numpy' çalıştırın.")
+        return None
     
-    cmd.extend([
-        '-c:v', 'libx264',
-        '-c:a', 'aac',
-        '-map', '0:v:0',
-        '-map', '1:a:0',
-        '-shortest',  # Kısa olanın süresine göre kes
-        output_file,
-        '-y'
-    ])
+    if cache_dir is None:
+        cache_dir = os.getenv("SCENE_CACHE_DIR", DEFAULT_SCENE_CACHE_DIR)
+    os.makedirs(cache_dir, exist_ok=True)
     
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        print(f"✅ Final video oluşturuldu: {output_file}")
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"❌ FFmpeg hatası: {e.stderr}")
-        return False
+    key = stage_key(file_sha256(video_file), scene_analysis_params())
+    cached = os.path.join(cache_dir, f"{key}.json")
+    if os.path.exists(cached):
+        with open(cached, 'r', encoding='utf-8') as f:
+            diffs = json.load(f)['diffs']
+        print(f"✅ Kare farkları cache'ten alındı: {cached}")
+    else:
+        started = time.perf_counter()
+        diffs = compute_frame_diffs(video_file)
+        if diffs is None:
+            return None
+        tmp_file = f"{cached}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'params': scene_analysis_params(), 'diffs': diffs}, f)
+        os.replace(tmp_file, cached)
+        print(f"✅ {len(diffs) + 1} kare analiz edildi ({time.perf_counter() - started:.1f}s)")
+    
+    return detect_scene_changes(diffs)
+
+def snap_steps_to_scene_changes(steps: List[Dict], changes: List[float],
+                                scale_factor: float = 1.0) -> Tuple[List[Dict], int]:
+    """Adım başlangıçlarını en yakın sahne değişimine kaydırır
+    
+    Adım zamanları ölçeklenmemiş birimdedir; karşılaştırma video zamanında
+    (time * scale_factor) yapılır. Bir adım sadece SCENE_SNAP_WINDOW içindeki
+    ve önceki/sonraki adımların arasında kalan bir değişime kaydırılır; her
+    değişim en fazla bir adıma atanır.
+    
+    Returns:
+        (yeni adım listesi, kaydırılan adım sayısı)
+    """
+    if not steps or not changes or scale_factor <= 0:
+        return steps, 0
+    
+    snapped_steps = [dict(step) for step in steps]
+    used = set()
+    snapped = 0
+    for i, step in enumerate(snapped_steps):
+        video_time = step['time'] * scale_factor
+        lower = snapped_steps[i - 1]['time'] * scale_factor if i > 0 else 0.0
+        upper = steps[i + 1]['time'] * scale_factor if i + 1 < len(steps) else float('inf')
+        candidates = [change for change in changes
+                      if change not in used and lower < change < upper
+                      and abs(change - video_time) <= SCENE_SNAP_WINDOW]
+        if not candidates:
+            continue
+        nearest = min(candidates, key=lambda change: abs(change - video_time))
+        used.add(nearest)
+        step['time'] = round(nearest / scale_factor, 3)
+        snapped += 1
+    
+    # Süreler yeni başlangıçlara göre yeniden hesaplanır (build_step_timeline gibi en az
+    # tahmini konuşma süresi kadar); son adımın bitişi korunur
+    end_time = steps[-1]['time'] + steps[-1]['duration']
+    for current, following in zip(snapped_steps, snapped_steps[1:] + [None]):
+        next_time = following['time'] if following else max(end_time, current['time'])
+        current['duration'] = round(max(next_time - current['time'], estimate_speech_duration(current['text'])), 3)
+    
+    return snapped_steps, snapped
 
 # ============================================================================
 # 5. ANA FONKSİYON
 # ============================================================================
 
-def main():
-    print("=" * 60)
-    print("🎬 Cypress Test Video'ya Ses Ekleme Script'i")
-    print("=" * 60)
+def resolve_tts_provider() -> Tuple[str, str]:
+    """TTS_PROVIDER environment variable'ına göre provider ve API key'i seçer
     
-    # Dosya yolları
-    cypress_file = "frontend/cypress/e2e/hospital-management.cy.js"
-    # En yeni video dosyasını bul
-    video_dir = Path("test_videos")
-    video_files = sorted(video_dir.glob("hospital-management.cy.js*.mp4"), key=lambda x: x.stat().st_mtime, reverse=True)
-    if video_files:
-        video_file = str(video_files[0])
-        print(f"📹 Kullanılan video: {video_file}")
+    Returns:
+        (tts_provider, api_key) - API key bulunamazsa ücretsiz 'edge' kullanılır
+    """
+    tts_provider = os.getenv("TTS_PROVIDER", "edge").lower()  # Varsayılan: edge (ücretsiz)
+    api_key = None
+    
+    if tts_provider == "elevenlabs":
+        api_key = os.getenv("ELEVEN_LABS_API_KEY")
+        if not api_key:
+            print("⚠️ ELEVEN_LABS_API_KEY environment variable bulunamadı!")
+            print("   Ücretsiz 'edge' TTS kullanılacak.")
+            tts_provider = "edge"
+    elif tts_provider == "google":
+        api_key = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
+        if not api_key:
+            print("⚠️ GOOGLE_APPLICATION_CREDENTIALS bulunamadı!")
+            print("   Ücretsiz 'edge' TTS kullanılacak.")
+            tts_provider = "edge"
+    elif tts_provider == "edge":
+        print("✅ Ücretsiz Microsoft Edge TTS kullanılıyor (API key gerekmez)")
     else:
-        video_file = "test_videos/hospital-management.cy.js.mp4"
-    srt_file = "subtitles.srt"
-    temp_audio_dir = "temp_audio"
-    merged_audio = "merged_audio.mp3"
-    final_video = "hospital-management-with-audio.mp4"
+        print(f"⚠️ Bilinmeyen provider: {tts_provider}, 'edge' kullanılacak")
+        tts_provider = "edge"
     
-    # 1. FFmpeg kontrolü
-    print("\n1️⃣ FFmpeg kontrol ediliyor...")
-    if not check_ffmpeg():
-        print("❌ FFmpeg bulunamadı! Lütfen FFmpeg'i kurun.")
-        print("   Windows: https://ffmpeg.org/download.html")
-        print("   veya: choco install ffmpeg")
-        return
-    print("✅ FFmpeg bulundu")
+    return tts_provider, api_key
+
+def find_latest_video(spec_name: str, video_dir: str = "test_videos") -> str:
+    """Spec için kaydedilmiş en yeni video dosyasını döndürür (yoksa None)"""
+    video_files = sorted(Path(video_dir).glob(f"{spec_name}*.mp4"), key=lambda x: x.stat().st_mtime, reverse=True)
+    if video_files:
+        return str(video_files[0])
+    return None
+
+def render_settings() -> Dict:
+    """Final videoyu etkileyen render ayarları (manifest anahtarına girer)"""
+    return {
+        'render_mode': get_render_mode(),
+        'audio_layout': get_audio_layout(),
+        'audio_intermediate': get_audio_intermediate(),
+        'audio_assembler': get_audio_assembler(),
+        'audio_normalize': audio_normalize_enabled(),
+        'tts_stream': tts_stream_enabled(),
+        'subtitle_mode': get_subtitle_mode(),
+        'subtitle_style': SUBTITLE_FORCE_STYLE,
+        'video_encode': get_video_encode_mode(),
+        'video_settings': get_video_encode_settings(),
+    }
+
+def render_spec(cypress_file: str, video_file: str, final_video: str, srt_file: str,
+                temp_audio_dir: str, merged_audio: str, tts_provider: str = "edge",
+                api_key: str = None, tts_cache: TTSClipCache = None) -> Dict:
+    """Tek bir Cypress testi için parse -> SRT -> TTS -> render -> temizlik adımlarını çalıştırır
+    
+    Her aşamanın girdileri final videonun yanındaki manifest'e yazılır;
+    girdileri değişmeyen aşamalar atlanır, sadece değişen aşamanın ve onun
+    sonrasındaki aşamalar yeniden çalışır.
+    
+    Returns:
+        Özet istatistikler: spec, steps, tts_time, trimmed_seconds, encode_time, output,
+        output_size, success
+    """
+    stats = {
+        'spec': os.path.basename(cypress_file),
+        'steps': 0,
+        'tts_time': 0.0,
+        'trimmed_seconds': 0.0,
+        'encode_time': 0.0,
+        'output': final_video,
+        'output_size': 0,
+        'success': False,
+    }
+    manifest = StageManifest.for_output(final_video)
     
     # 2. Cypress test dosyasını parse et
     print("\n2️⃣ Cypress test dosyası parse ediliyor...")
     if not os.path.exists(cypress_file):
         print(f"❌ Cypress test dosyası bulunamadı: {cypress_file}")
-        return
+        return stats
     
-    steps = parse_cypress_test(cypress_file)
+    parse_key = stage_key(PARSER_VERSION, parser_settings(), file_sha256(cypress_file))
+    if manifest.is_fresh('parse_cypress_test', parse_key):
+        steps = manifest.data('parse_cypress_test')
+        print(f"⏭️ Test dosyası değişmedi, parse atlandı")
+    else:
+        steps = parse_cypress_test(cypress_file)
+        manifest.record('parse_cypress_test', parse_key, data=steps)
+    stats['steps'] = len(steps)
     print(f"✅ {len(steps)} adım bulundu")
     
+    # 2.1. Cypress komut logu varsa adımlar gerçek zamanlara yerleştirilir
+    command_log = load_command_log(video_file, os.path.basename(cypress_file))
+    if command_log:
+        steps, matched = align_steps_to_command_log(steps, command_log)
+        print(f"🕒 Komut logu bulundu: {matched}/{len(steps)} adım gerçek zamana hizalandı")
+    
     # 2.5. Video süresini öğren - ses video süresine göre ölçeklendirilecek
     print("\n2.5️⃣ Video süresi kontrol ediliyor...")
-    original_video_duration = get_video_duration(video_file)
+    video_key = stage_key(file_fingerprint(video_file))
+    if manifest.is_fresh('probe_media', video_key):
+        video_info = manifest.data('probe_media')
+    else:
+        video_info = probe_media(video_file)
+        if video_info:
+            video_info = {'duration': video_info['duration'], 'video': video_info['video']}
+            manifest.record('probe_media', video_key, data=video_info)
+    original_video_duration = video_info['duration'] if video_info else None
     if not original_video_duration:
         print("⚠️ Video süresi öğrenilemedi")
         original_video_duration = 0
     
     print(f"📹 Video süresi: {original_video_duration:.2f} saniye")
-    print(f"🎯 Ses video süresine göre ölçeklendirilecek (senkronizasyon için)")
+    if video_info and video_info['video']:
+        vinfo = video_info['video']
+        print(f"   {vinfo['codec']} {vinfo['width']}x{vinfo['height']} @ {vinfo['fps']:.2f} fps")
+    if not command_log:
+        print(f"🎯 Ses video süresine göre ölçeklendirilecek (senkronizasyon için)")
     
     # Subtitle zamanlamasını video süresine göre ölçeklendir
-    if steps:
+    # (komut logundan gelen zamanlar zaten video zamanıdır, ölçeklendirilmez)
+    if command_log:
+        subtitle_scale_factor = 1.0
+    elif steps:
         total_subtitle_duration = steps[-1]['time'] + steps[-1]['duration']
         if total_subtitle_duration > 0 and original_video_duration > 0:
             subtitle_scale_factor = original_video_duration / total_subtitle_duration
@@ -620,58 +3287,151 @@ def main():
     else:
         subtitle_scale_factor = 1.0
     
+    # 2.6. Komut logu yoksa adımlar videodaki UI geçişlerine (sayfa/modal değişimi) kaydırılır
+    if not command_log and scene_analysis_enabled() and steps and os.path.exists(video_file):
+        print("\n2.6️⃣ Sahne değişimleri analiz ediliyor...")
+        scene_key = stage_key(video_key, scene_analysis_params())
+        if manifest.is_fresh('scene_changes', scene_key):
+            scene_changes = manifest.data('scene_changes')
+        else:
+            scene_changes = load_scene_changes(video_file)
+            if scene_changes is not None:
+                manifest.record('scene_changes', scene_key, data=scene_changes)
+        if scene_changes:
+            steps, snapped = snap_steps_to_scene_changes(steps, scene_changes, subtitle_scale_factor)
+            print(f"✅ {len(scene_changes)} sahne değişimi bulundu, {snapped} adım kaydırıldı")
+    
     # 3. SRT subtitle oluştur (video zamanlamasına göre ölçeklendirilmiş)
     print("\n3️⃣ SRT subtitle dosyası oluşturuluyor...")
-    create_srt_subtitle(steps, srt_file, scale_factor=subtitle_scale_factor)
+    srt_key = stage_key(parse_key, steps, subtitle_scale_factor)
+    if manifest.is_fresh('create_srt_subtitle', srt_key, [srt_file]):
+        print(f"⏭️ Subtitle değişmedi, atlandı: {srt_file}")
+    else:
+        create_srt_subtitle(steps, srt_file, scale_factor=subtitle_scale_factor)
+        manifest.record('create_srt_subtitle', srt_key, [srt_file])
     
-    # 4. TTS Provider seçimi
-    print("\n4️⃣ TTS Provider kontrol ediliyor...")
-    tts_provider = os.getenv("TTS_PROVIDER", "edge").lower()  # Varsayılan: edge (ücretsiz)
+    # Final video: ses metinleri, subtitle, kaynak video ve render ayarları
+    # değişmediyse TTS ve render tamamen atlanır
+    tts_key = stage_key([step['text'] for step in steps], tts_provider, tts_voice_params(tts_provider),
+                        get_trim_params())
+    final_key = stage_key(tts_key, srt_key, video_key, original_video_duration, render_settings())
+    if manifest.is_fresh('merge_video_audio', final_key, [final_video]):
+        print(f"\n⏭️ Girdiler değişmedi, final video güncel: {final_video}")
+        stats['success'] = True
+        stats['output_size'] = os.path.getsize(final_video)
+        manifest.save()
+        return stats
     
     create_audio = True
-    api_key = None
+    # Çok adımlı yolun ara dosyaları (birleşik ve ölçeklenmiş ses) seçilen formatta tutulur
+    intermediate_ext = f".{get_audio_intermediate()}"
+    merged_audio = f"{os.path.splitext(merged_audio)[0]}{intermediate_ext}"
+    scaled_audio = f"{os.path.splitext(merged_audio)[0]}_scaled{intermediate_ext}"
+    encode_started = time.perf_counter()
     
-    if tts_provider == "elevenlabs":
-        api_key = os.getenv("ELEVEN_LABS_API_KEY")
-        if not api_key:
-            print("⚠️ ELEVEN_LABS_API_KEY environment variable bulunamadı!")
-            print("   Ücretsiz 'edge' TTS kullanılacak.")
-            tts_provider = "edge"
-    elif tts_provider == "google":
-        api_key = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
-        if not api_key:
-            print("⚠️ GOOGLE_APPLICATION_CREDENTIALS bulunamadı!")
-            print("   Ücretsiz 'edge' TTS kullanılacak.")
-            tts_provider = "edge"
-    elif tts_provider == "edge":
-        print("✅ Ücretsiz Microsoft Edge TTS kullanılıyor (API key gerekmez)")
-    else:
-        print(f"⚠️ Bilinmeyen provider: {tts_provider}, 'edge' kullanılacak")
-        tts_provider = "edge"
+    # 4.5. Encode edilmiş video cache'i (sadece anlatım değiştiğinde encode atlanır)
+    # MP4'e stream copy yapılamayan kaynaklar (ör. VP8/VP9) ve tekrar kareleri atılacak
+    # videolar (VIDEO_PROFILE=screen) copy modunda da bir kez encode edilir
+    copyable = not (video_info and video_info['video']) or video_info['video']['codec'] in MP4_COPYABLE_CODECS
+    decimate = bool(get_video_encode_settings().get('decimate'))
+    if ((get_video_encode_mode() == "encode" or not copyable or decimate) and get_subtitle_mode() == "soft"
+            and os.path.exists(video_file)):
+        print("\n4.5️⃣ Video stream hazırlanıyor...")
+        video_file = prepare_video_stream(video_file)
+    stats['encode_time'] += time.perf_counter() - encode_started
+    encode_started = time.perf_counter()
     
     # 5. Ses dosyalarını oluştur
     audio_files = []
+    render_mode = get_render_mode()
+    rendered = False
+    voiced_steps = 0
+    
+    # 5-6. Bellek modu: TTS çıktısı geçici dosya olmadan bellekten final ffmpeg'e yazılır
+    memory_render = create_audio and tts_stream_enabled()
+    if memory_render and (render_mode != "single" or get_audio_layout() != "place"
+                          or get_subtitle_mode() == "smart"):
+        print("⚠️ TTS_STREAM sadece RENDER_MODE=single, AUDIO_LAYOUT=place ve smart olmayan "
+              "subtitle moduyla çalışır, dosya tabanlı yol kullanılıyor")
+        memory_render = False
+    if memory_render:
+        print(f"\n5️⃣ Bellekte TTS + tek geçişli render ({tts_provider})...")
+        memory_started = time.perf_counter()
+        rendered, memory_report = render_from_memory(video_file, steps, final_video, srt_file,
+                                                     subtitle_scale_factor, original_video_duration,
+                                                     tts_provider, api_key, tts_cache)
+        elapsed = time.perf_counter() - memory_started
+        if rendered:
+            voiced_steps = memory_report['voiced']
+            stats['trimmed_seconds'] = memory_report['trimmed']
+            # TTS ve yerleşim TTS süresine, final ffmpeg encode süresine yazılır
+            stats['tts_time'] = memory_report['tts_time']
+            stats['encode_time'] += elapsed - memory_report['tts_time']
+            create_audio = False
+        else:
+            # Başarısız deneme dosya tabanlı yolun TTS süresine eklenir
+            stats['tts_time'] = elapsed
+            print("⚠️ Bellekten render başarısız, dosya tabanlı yola dönülüyor...")
+        encode_started = time.perf_counter()
+    
     if create_audio:
         print(f"\n5️⃣ Ses dosyaları oluşturuluyor ({tts_provider})...")
-        audio_files = create_audio_files(steps, temp_audio_dir, tts_provider, api_key)
+        tts_started = time.perf_counter()
+        step_files = create_step_audio(steps, temp_audio_dir, tts_provider, api_key, cache=tts_cache)
+        # Klip sessizlikleri yerleşim ve birleştirmeden önce kesilir
+        stats['trimmed_seconds'] = trim_step_audio(steps, step_files, tts_provider, tts_cache)
+        audio_files = [audio_file for audio_file in step_files if audio_file]
+        voiced_steps = len(audio_files)
+        stats['tts_time'] += time.perf_counter() - tts_started
+        encode_started = time.perf_counter()
+        
+        if audio_files and render_mode == "single":
+            # 6. Tek ffmpeg çağrısı: klip yerleşimi (veya concat + atempo) + subtitle + encode
+            placements = None
+            if get_audio_layout() == "place":
+                placements = plan_clip_layout(steps, step_files, subtitle_scale_factor)
+                if not layout_fits(placements, original_video_duration):
+                    print(f"\n⚠️ Klipler hızlandırılıp kaydırıldığında anlatım "
+                          f"{layout_end(placements):.2f}s sürüyor (video: {original_video_duration:.2f}s), "
+                          f"concat + ölçeklendirmeye dönülüyor")
+                    placements = None
+            if placements is not None:
+                print("\n6️⃣ Tek geçişli render (klip yerleşimi + subtitle + encode)...")
+            else:
+                print("\n6️⃣ Tek geçişli render (concat + ölçeklendirme + subtitle + encode)...")
+            rendered = render_single_pass(video_file, audio_files, final_video, srt_file,
+                                          original_video_duration, placements=placements)
+            if not rendered:
+                print("⚠️ Tek geçişli render başarısız, çok adımlı yola dönülüyor...")
         
-        if audio_files:
+        if audio_files and not rendered:
             # Ses dosyalarını birleştir
             print("\n6️⃣ Ses dosyaları birleştiriliyor...")
-            merge_audio_files(audio_files, merged_audio)
+            merge_key = stage_key(tts_key, len(audio_files))
+            if manifest.is_fresh('merge_audio_files', merge_key, [merged_audio]):
+                print(f"⏭️ Birleşik ses güncel: {merged_audio}")
+            elif merge_audio_files(audio_files, merged_audio):
+                manifest.record('merge_audio_files', merge_key, [merged_audio])
             
             # 6.5. Ses'i video süresine göre ölçeklendir (video zamanlamasına göre senkronize et)
             if os.path.exists(merged_audio):
                 audio_duration = get_video_duration(merged_audio)
                 
-                if audio_duration and original_video_duration > 0:
+                if command_log:
+                    # Adım zamanları zaten video zamanı; ses ölçeklendirilmez
+                    print("⏭️ Komut logu kullanıldı, ses ölçeklendirilmiyor")
+                elif audio_duration and original_video_duration > 0:
                     print(f"\n6.5️⃣ Ses süresi: {audio_duration:.2f} saniye")
                     print(f"   Video süresi: {original_video_duration:.2f} saniye")
                     print(f"   Ses video süresine göre ölçeklendiriliyor (senkronizasyon için)...")
                     
                     # Ses'i video süresine göre ölçeklendir (hızlandır)
-                    scaled_audio = "merged_audio_scaled.mp3"
-                    if scale_audio_to_duration(merged_audio, original_video_duration, scaled_audio):
+                    scale_key = stage_key(merge_key, original_video_duration)
+                    if manifest.is_fresh('scale_audio_to_duration', scale_key, [scaled_audio]):
+                        merged_audio = scaled_audio
+                        print(f"⏭️ Ölçeklendirilmiş ses güncel: {scaled_audio}")
+                    elif scale_audio_to_duration(merged_audio, original_video_duration, scaled_audio):
+                        manifest.record('scale_audio_to_duration', scale_key, [scaled_audio])
                         merged_audio = scaled_audio
                         print(f"✅ Ses {original_video_duration:.2f} saniyeye ölçeklendirildi (video ile senkronize)")
                     else:
@@ -679,32 +3439,44 @@ def main():
                     
                     # Video orijinal hızında kalacak (loop yok, yavaşlatma yok)
                     print(f"✅ Video orijinal hızında kalacak ({original_video_duration:.2f} saniye)")
-        else:
+        elif not audio_files:
             print("⚠️ Hiç ses dosyası oluşturulamadı!")
             create_audio = False
     
     # 7. Video ve sesi birleştir
     print("\n7️⃣ Video ve ses birleştiriliyor...")
-    if not os.path.exists(video_file):
+    if rendered:
+        print("✅ Video tek geçişte oluşturuldu, ayrı birleştirme gerekmiyor")
+        stats['success'] = True
+    elif not os.path.exists(video_file):
         print(f"⚠️ Video dosyası bulunamadı: {video_file}")
         print("   Mevcut video dosyaları:")
         video_dir = Path("test_videos")
         if video_dir.exists():
             for vf in video_dir.glob("*.mp4"):
                 print(f"     - {vf}")
-        return
-    
-    if create_audio and os.path.exists(merged_audio):
-        merge_video_audio(video_file, merged_audio, final_video, srt_file)
+        manifest.save()
+        return stats
+    elif create_audio and os.path.exists(merged_audio):
+        stats['success'] = merge_video_audio(video_file, merged_audio, final_video, srt_file)
     else:
         # Sadece subtitle ekle
         print("⚠️ Ses dosyası yok, sadece subtitle ekleniyor...")
-        merge_video_audio(video_file, video_file, final_video, srt_file)
+        stats['success'] = merge_video_audio(video_file, video_file, final_video, srt_file)
+    stats['encode_time'] += time.perf_counter() - encode_started
+    
+    if os.path.exists(final_video):
+        stats['output_size'] = os.path.getsize(final_video)
+    
+    # Sadece tüm adımların sesi varsa final video güncel sayılır
+    if stats['success'] and voiced_steps == len(steps):
+        manifest.record('merge_video_audio', final_key, [final_video])
+    manifest.save()
     
     # 8. Temizlik
     print("\n8️⃣ Geçici dosyalar temizleniyor...")
     if os.path.exists(temp_audio_dir):
-        for audio_file in audio_files:
+        for audio_file in set(audio_files):
             if os.path.exists(audio_file):
                 os.remove(audio_file)
         try:
@@ -713,7 +3485,7 @@ def main():
             pass
     
     # Ölçeklendirilmiş video ve ses dosyalarını sil
-    for temp_file in ["video_slowed.mp4", "video_scaled.mp4", "video_looped.mp4", "merged_audio_scaled.mp3"]:
+    for temp_file in ["video_slowed.mp4", "video_scaled.mp4", "video_looped.mp4", scaled_audio]:
         if os.path.exists(temp_file):
             try:
                 os.remove(temp_file)
@@ -721,16 +3493,51 @@ def main():
             except:
                 pass
     
-    if os.path.exists(merged_audio):
-        # Kullanıcı isterse saklayabilir
-        pass
+    return stats
+
+def main():
+    print("=" * 60)
+    print("🎬 Cypress Test Video'ya Ses Ekleme Script'i")
+    print("=" * 60)
+    
+    # Dosya yolları
+    cypress_file = "frontend/cypress/e2e/hospital-management.cy.js"
+    # En yeni video dosyasını bul
+    video_file = find_latest_video("hospital-management.cy.js")
+    if video_file:
+        print(f"📹 Kullanılan video: {video_file}")
+    else:
+        video_file = "test_videos/hospital-management.cy.js.mp4"
+    srt_file = "subtitles.srt"
+    temp_audio_dir = "temp_audio"
+    merged_audio = "merged_audio.mp3"
+    final_video = "hospital-management-with-audio.mp4"
+    
+    # 1. FFmpeg kontrolü
+    print("\n1️⃣ FFmpeg kontrol ediliyor...")
+    if not check_ffmpeg():
+        print("❌ FFmpeg bulunamadı! Lütfen FFmpeg'i kurun.")
+        print("   Windows: https://ffmpeg.org/download.html")
+        print("   veya: choco install ffmpeg")
+        return
+    print("✅ FFmpeg bulundu")
+    
+    # 1.5. TTS Provider seçimi
+    print("\n1.5️⃣ TTS Provider kontrol ediliyor...")
+    tts_provider, api_key = resolve_tts_provider()
+    tts_cache = TTSClipCache.from_env()
+    
+    stats = render_spec(cypress_file, video_file, final_video, srt_file, temp_audio_dir,
+                        merged_audio, tts_provider, api_key, tts_cache)
+    if not stats['success']:
+        return
     
     print("\n" + "=" * 60)
     print("✅ İşlem tamamlandı!")
     print(f"📹 Final video: {final_video}")
     print(f"📝 Subtitle: {srt_file}")
+    tts_cache.print_stats()
     print("=" * 60)
 
 if __name__ == "__main__":
     main()
-
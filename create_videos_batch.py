@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Toplu Cypress Test Video Seslendirme Script'i
+frontend/cypress/e2e altındaki tüm *.cy.js testlerini bulur, test_videos/
+klasöründe kaydı olanları process pool ile paralel olarak seslendirir ve
+sonunda test başına özet tablo yazdırır.
+"""
+
+import os
+import sys
+import time
+import argparse
+import contextlib
+import multiprocessing
+from pathlib import Path
+from typing import List, Dict, Tuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from create_video_with_audio import (
+    check_ffmpeg,
+    find_latest_video,
+    render_spec,
+    resolve_tts_provider,
+    set_ffmpeg_scheduler,
+    FFmpegScheduler,
+    TTSClipCache,
+)
+
+# ============================================================================
+# 1. TEST VE VİDEO EŞLEŞTİRME
+# ============================================================================
+
+def job_name(spec_file: str, spec_dir: str) -> str:
+    """Spec'in çıktı adı: spec klasörüne göre yolu, .cy.js olmadan (ör. admin/login)
+    
+    Farklı alt klasörlerdeki aynı isimli spec'lerin çıktıları çakışmaz.
+    """
+    return Path(spec_file).relative_to(spec_dir).as_posix().replace(".cy.js", "")
+
+def discover_specs(spec_dir: str, video_dir: str) -> List[Tuple[str, str]]:
+    """Kaydı bulunan tüm Cypress testlerini (spec, video) çiftleri olarak döndürür
+    
+    Alt klasörlerdeki spec'ler de bulunur; Cypress bunların videolarını
+    video klasöründe aynı alt klasör yapısıyla kaydeder. Video sadece bu
+    klasörde aranır: kök klasördeki aynı isimli bir video başka bir spec'e
+    ait olabilir.
+    """
+    jobs = []
+    for spec in sorted(Path(spec_dir).rglob("*.cy.js")):
+        spec_video_dir = Path(video_dir) / spec.relative_to(spec_dir).parent
+        video_file = find_latest_video(spec.name, str(spec_video_dir))
+        if video_file:
+            jobs.append((str(spec), video_file))
+        else:
+            print(f"⚠️ Video bulunamadı, atlanıyor: {spec.relative_to(spec_dir)}")
+    return jobs
+
+# ============================================================================
+# 2. PARALEL RENDER
+# ============================================================================
+
+def render_job(spec_file: str, video_file: str, output_dir: str, tts_provider: str, api_key: str,
+               name: str = None) -> Dict:
+    """Worker process içinde tek bir testi seslendirir
+    
+    Process'lerin çıktıları birbirine karışmasın diye her testin log'u
+    output_dir/<test>.log dosyasına yazılır; alt klasördeki spec'lerin
+    çıktıları output_dir altında aynı alt klasöre yazılır. TTS cache'i tüm
+    worker'lar arasında paylaşılır (aynı TTS_CACHE_DIR).
+    """
+    if name is None:
+        name = Path(spec_file).name.replace(".cy.js", "")
+    output_dir = os.path.join(output_dir, os.path.dirname(name))
+    os.makedirs(output_dir, exist_ok=True)
+    stem = os.path.basename(name)
+    log_file = os.path.join(output_dir, f"{stem}.log")
+    
+    with open(log_file, 'w', encoding='utf-8') as log, contextlib.redirect_stdout(log):
+        tts_cache = TTSClipCache.from_env()
+        try:
+            stats = render_spec(
+                spec_file,
+                video_file,
+                final_video=os.path.join(output_dir, f"{stem}-with-audio.mp4"),
+                srt_file=os.path.join(output_dir, f"{stem}.srt"),
+                temp_audio_dir=os.path.join(output_dir, f"temp_audio_{stem}"),
+                merged_audio=os.path.join(output_dir, f"{stem}_merged_audio.mp3"),
+                tts_provider=tts_provider,
+                api_key=api_key,
+                tts_cache=tts_cache,
+            )
+        except Exception as e:
+            print(f"❌ Render hatası: {str(e)}")
+            stats = {'spec': None, 'steps': 0, 'tts_time': 0.0, 'trimmed_seconds': 0.0,
+                     'encode_time': 0.0, 'output_size': 0, 'success': False}
+        tts_cache.print_stats()
+    
+    stats['spec'] = f"{name}.cy.js"
+    stats['log'] = log_file
+    return stats
+
+def print_summary_table(results: List[Dict], wall_time: float):
+    """Test başına özet tabloyu yazdırır"""
+    print("\n" + "=" * 90)
+    print(f"{'Test':<32} {'Adım':>6} {'TTS (s)':>9} {'Kırpma (s)':>11} {'Encode (s)':>11} "
+          f"{'Boyut (MB)':>11}  Durum")
+    print("-" * 90)
+    for stats in sorted(results, key=lambda r: r['spec']):
+        status = "✅" if stats['success'] else "❌"
+        print(f"{stats['spec'][:32]:<32} {stats['steps']:>6} {stats['tts_time']:>9.2f} "
+              f"{stats.get('trimmed_seconds', 0.0):>11.2f} {stats['encode_time']:>11.2f} "
+              f"{stats['output_size'] / (1024 * 1024):>11.2f}  {status}")
+    print("-" * 90)
+    print(f"Toplam: {len(results)} test, {sum(1 for r in results if r['success'])} başarılı, "
+          f"süre: {wall_time:.1f}s")
+    print("=" * 90)
+
+# ============================================================================
+# 3. ANA FONKSİYON
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Tüm Cypress test videolarını paralel olarak seslendirir")
+    parser.add_argument("--spec-dir", default="frontend/cypress/e2e", help="Cypress test klasörü")
+    parser.add_argument("--video-dir", default="test_videos", help="Cypress video klasörü")
+    parser.add_argument("--output-dir", default="narrated_videos", help="Çıktı klasörü")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("RENDER_WORKERS", os.cpu_count() or 1)),
+                        help="Paralel worker process sayısı (varsayılan: RENDER_WORKERS veya CPU sayısı)")
+    args = parser.parse_args()
+    
+    print("=" * 60)
+    print("🎬 Toplu Cypress Test Video Seslendirme")
+    print("=" * 60)
+    
+    if not check_ffmpeg():
+        print("❌ FFmpeg bulunamadı! Lütfen FFmpeg'i kurun.")
+        sys.exit(1)
+    
+    jobs = discover_specs(args.spec_dir, args.video_dir)
+    if not jobs:
+        print(f"❌ {args.video_dir} klasöründe kaydı olan test bulunamadı")
+        sys.exit(1)
+    
+    os.makedirs(args.output_dir, exist_ok=True)
+    tts_provider, api_key = resolve_tts_provider()
+    workers = max(1, min(args.workers, len(jobs)))
+    print(f"📋 {len(jobs)} test bulundu, {workers} worker ile işleniyor...")
+    
+    # Tüm worker'lar aynı çekirdek bütçesini paylaşır (FFMPEG_CORES)
+    manager = multiprocessing.Manager()
+    scheduler = FFmpegScheduler.from_env(manager.Condition(), manager.dict(used=0, heavy=0))
+    print(f"⚙️ ffmpeg çekirdek bütçesi: {scheduler.total_cores} "
+          f"(video encode: {scheduler.video_cores}, ses işleri: {scheduler.audio_reserve})")
+    
+    results = []
+    started = time.perf_counter()
+    with manager, ProcessPoolExecutor(max_workers=workers, initializer=set_ffmpeg_scheduler,
+                                      initargs=(scheduler,)) as executor:
+        futures = {
+            executor.submit(render_job, spec_file, video_file, args.output_dir, tts_provider, api_key,
+                            job_name(spec_file, args.spec_dir)): spec_file
+            for spec_file, video_file in jobs
+        }
+        for future in as_completed(futures):
+            stats = future.result()
+            status = "✅" if stats['success'] else "❌"
+            print(f"  {status} {stats['spec']} (log: {stats['log']})")
+            results.append(stats)
+    
+    print_summary_table(results, time.perf_counter() - started)
+
+if __name__ == "__main__":
+    main()
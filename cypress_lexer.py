@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cypress Test Dosyası Lexer'ı
+Cypress spec dosyalarını tek geçişte token'lara ayırır; string, template
+literal, regex literal ve yorumları tanır. Token'lardan describe/it/hook
+bloklarını ve `cy.*` komut zincirlerini kaynak konumlarıyla çıkarır.
+"""
+
+from pathlib import Path
+from typing import List, Dict, Iterator
+
+# ============================================================================
+# 1. TOKENIZER
+# ============================================================================
+
+# Bu token'lardan sonra gelen '/' bölme değil regex literal başlangıcıdır
+REGEX_PRECEDING_PUNCT = set("(,=:[!&|?{};+-*%<>~^") | {"=>"}
+REGEX_PRECEDING_KEYWORDS = {
+    "return", "typeof", "case", "do", "else", "in", "of", "new", "delete",
+    "void", "throw", "instanceof", "yield", "await",
+}
+
+def _is_ident_start(char: str) -> bool:
+    return char.isalpha() or char in "_$"
+
+def _is_ident_part(char: str) -> bool:
+    return char.isalnum() or char in "_$"
+
+def _scan_string(source: str, i: int) -> int:
+    """Tırnakla başlayan string'in bittiği indeksi (kapanış tırnağından sonrası) döndürür"""
+    quote = source[i]
+    i += 1
+    n = len(source)
+    while i < n:
+        char = source[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == quote or char == "\n":
+            return i + 1
+        i += 1
+    return n
+
+def _scan_regex(source: str, i: int) -> int:
+    """Regex literal'in (flag'ler dahil) bittiği indeksi döndürür"""
+    i += 1
+    n = len(source)
+    in_class = False
+    while i < n:
+        char = source[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == "\n":
+            return i
+        if char == "[":
+            in_class = True
+        elif char == "]":
+            in_class = False
+        elif char == "/" and not in_class:
+            i += 1
+            while i < n and _is_ident_part(source[i]):
+                i += 1
+            return i
+        i += 1
+    return n
+
+def _scan_template(source: str, i: int) -> int:
+    """Template literal'in bittiği indeksi döndürür (`${...}` içleri dahil)"""
+    i += 1
+    n = len(source)
+    while i < n:
+        char = source[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == "`":
+            return i + 1
+        if char == "$" and i + 1 < n and source[i + 1] == "{":
+            # İfade içindeki token'lar atılır, sadece kapanış '}' bulunur
+            i = _tokenize(source, i + 2, [], stop_at_brace=True)
+            continue
+        i += 1
+    return n
+
+def _tokenize(source: str, i: int, tokens: List[Dict], stop_at_brace: bool = False) -> int:
+    """source[i:] kısmını token'lara ayırıp tokens listesine ekler
+
+    stop_at_brace True ise eşi olmayan ilk '}' karakterinde durur ve onun
+    sonrasındaki indeksi döndürür (template literal ifadeleri için).
+    """
+    n = len(source)
+    depth = 0
+    prev = None  # Son anlamlı token (yorumlar hariç)
+
+    while i < n:
+        char = source[i]
+
+        if char.isspace():
+            i += 1
+            continue
+
+        start = i
+        nxt = source[i + 1] if i + 1 < n else ""
+
+        if char == "/" and nxt == "/":
+            end = source.find("\n", i)
+            end = n if end == -1 else end
+            tokens.append({'type': 'comment', 'value': source[i + 2:end].strip(), 'start': start, 'end': end})
+            i = end
+            continue
+
+        if char == "/" and nxt == "*":
+            end = source.find("*/", i + 2)
+            end = n if end == -1 else end + 2
+            tokens.append({'type': 'block_comment', 'value': source[i + 2:end - 2].strip(), 'start': start, 'end': end})
+            i = end
+            continue
+
+        if char in "'\"":
+            i = _scan_string(source, i)
+            token = {'type': 'string', 'value': source[start + 1:i - 1], 'start': start, 'end': i}
+        elif char == "`":
+            i = _scan_template(source, i)
+            token = {'type': 'template', 'value': source[start + 1:i - 1], 'start': start, 'end': i}
+        elif char == "/" and (prev is None
+                              or (prev['type'] == 'punct' and prev['value'] in REGEX_PRECEDING_PUNCT)
+                              or (prev['type'] == 'name' and prev['value'] in REGEX_PRECEDING_KEYWORDS)):
+            i = _scan_regex(source, i)
+            token = {'type': 'regex', 'value': source[start:i], 'start': start, 'end': i}
+        elif _is_ident_start(char):
+            while i < n and _is_ident_part(source[i]):
+                i += 1
+            token = {'type': 'name', 'value': source[start:i], 'start': start, 'end': i}
+        elif char.isdigit():
+            while i < n and (source[i].isalnum() or source[i] in "._"):
+                i += 1
+            token = {'type': 'number', 'value': source[start:i], 'start': start, 'end': i}
+        elif char == "=" and nxt == ">":
+            i += 2
+            token = {'type': 'punct', 'value': '=>', 'start': start, 'end': i}
+        else:
+            if stop_at_brace:
+                if char == "{":
+                    depth += 1
+                elif char == "}":
+                    if depth == 0:
+                        return i + 1
+                    depth -= 1
+            i += 1
+            token = {'type': 'punct', 'value': char, 'start': start, 'end': i}
+
+        tokens.append(token)
+        prev = token
+
+    return n
+
+def tokenize(source: str) -> List[Dict]:
+    """Kaynak kodu token listesine çevirir
+
+    Token tipleri: name, number, string, template, regex, punct, comment,
+    block_comment. Her token 'value', 'start' ve 'end' (kaynak offset'leri) içerir.
+    """
+    tokens = []
+    _tokenize(source, 0, tokens)
+    return tokens
+
+# ============================================================================
+# 2. BLOK VE KOMUT ZİNCİRİ ÇIKARMA
+# ============================================================================
+
+TEST_KEYWORDS = {"it", "specify"}
+SUITE_KEYWORDS = {"describe", "context"}
+HOOK_KEYWORDS = {"before", "beforeEach", "after", "afterEach"}
+BLOCK_MODIFIERS = {"only", "skip"}
+
+def _match_brackets(tokens: List[Dict]) -> Dict[int, int]:
+    """Açılış parantezi/süslü parantez/köşeli parantez token'larını kapanışlarıyla eşler"""
+    pairs = {"(": ")", "{": "}", "[": "]"}
+    match = {}
+    stack = []
+    for index, token in enumerate(tokens):
+        if token['type'] != 'punct':
+            continue
+        if token['value'] in pairs:
+            stack.append(index)
+        elif token['value'] in (")", "}", "]") and stack:
+            opener = stack.pop()
+            match[opener] = index
+            match[index] = opener
+    return match
+
+def _is_punct(tokens: List[Dict], index: int, value: str) -> bool:
+    return 0 <= index < len(tokens) and tokens[index]['type'] == 'punct' and tokens[index]['value'] == value
+
+def _is_name(tokens: List[Dict], index: int) -> bool:
+    return index < len(tokens) and tokens[index]['type'] == 'name'
+
+def _find_callback_body(tokens: List[Dict], open_paren: int, close_paren: int) -> int:
+    """Çağrı argümanlarındaki callback fonksiyonunun gövdesini açan '{' token'ını bulur"""
+    for index in range(open_paren + 1, close_paren):
+        token = tokens[index]
+        if token['type'] == 'punct' and token['value'] == '=>':
+            return index + 1 if _is_punct(tokens, index + 1, "{") else -1
+        if token['type'] == 'name' and token['value'] == 'function':
+            for body in range(index + 1, close_paren):
+                if _is_punct(tokens, body, "{"):
+                    return body
+            return -1
+    return -1
+
+def _new_block(block_type: str, keyword: str, name: str, start: int, end: int,
+               body_start: int, body_end: int) -> Dict:
+    return {
+        'type': block_type,
+        'keyword': keyword,
+        'name': name,
+        'start': start,
+        'end': end,
+        'body_start': body_start,
+        'body_end': body_end,
+        'children': [],
+        'events': [],  # Bloğun doğrudan içindeki yorumlar ve cy zincirleri (kaynak sırasıyla)
+    }
+
+def parse_spec(source: str) -> Dict:
+    """Spec kaynağından blok ağacını ve cy komut zincirlerini çıkarır
+
+    Returns:
+        {'blocks': en üst seviye bloklar, 'tests': tüm it blokları (kaynak sırasıyla),
+         'hooks': tüm hook blokları, 'tokens': token listesi}
+
+        Her blok: type (suite/test/hook), keyword, name, start/end ve
+        body_start/body_end offset'leri, children, events. Event'ler
+        {'kind': 'comment', 'text', 'block', 'start', 'end'} veya
+        {'kind': 'chain', 'commands': [{'name', 'args', 'start', 'end'}], 'start', 'end'} biçimindedir.
+    """
+    tokens = tokenize(source)
+    match = _match_brackets(tokens)
+
+    root = _new_block('root', None, None, 0, len(source), 0, len(source))
+    stack = [root]
+    tests = []
+    hooks = []
+
+    for index, token in enumerate(tokens):
+        # Bitmiş blokları yığından çıkar
+        while len(stack) > 1 and token['start'] >= stack[-1]['body_end']:
+            stack.pop()
+        current = stack[-1]
+
+        if token['type'] in ('comment', 'block_comment'):
+            current['events'].append({'kind': 'comment', 'text': token['value'],
+                                      'block': token['type'] == 'block_comment',
+                                      'start': token['start'], 'end': token['end']})
+            continue
+
+        if token['type'] != 'name' or _is_punct(tokens, index - 1, "."):
+            continue
+
+        keyword = token['value']
+
+        # describe / it / hook çağrıları (it.only, describe.skip dahil)
+        if keyword in TEST_KEYWORDS | SUITE_KEYWORDS | HOOK_KEYWORDS:
+            paren = index + 1
+            if (_is_punct(tokens, paren, ".") and _is_name(tokens, paren + 1)
+                    and tokens[paren + 1]['value'] in BLOCK_MODIFIERS):
+                paren += 2
+            if not _is_punct(tokens, paren, "(") or paren not in match:
+                continue
+
+            close = match[paren]
+            body = _find_callback_body(tokens, paren, close)
+            if body == -1 or body not in match:
+                continue
+
+            name = None
+            if tokens[paren + 1]['type'] in ('string', 'template'):
+                name = tokens[paren + 1]['value']
+
+            if keyword in TEST_KEYWORDS:
+                block_type = 'test'
+            elif keyword in SUITE_KEYWORDS:
+                block_type = 'suite'
+            else:
+                block_type = 'hook'
+
+            block = _new_block(block_type, keyword, name, token['start'], tokens[close]['end'],
+                               tokens[body]['end'], tokens[match[body]]['start'])
+            current['children'].append(block)
+            stack.append(block)
+            if block_type == 'test':
+                tests.append(block)
+            elif block_type == 'hook':
+                hooks.append(block)
+            continue
+
+        # cy.komut(...).komut(...) zincirleri
+        if keyword == "cy" and _is_punct(tokens, index + 1, "."):
+            commands = []
+            cursor = index + 1
+            while (_is_punct(tokens, cursor, ".") and _is_name(tokens, cursor + 1)
+                   and _is_punct(tokens, cursor + 2, "(") and cursor + 2 in match):
+                open_paren = cursor + 2
+                close_paren = match[open_paren]
+                commands.append({
+                    'name': tokens[cursor + 1]['value'],
+                    'args': source[tokens[open_paren]['end']:tokens[close_paren]['start']],
+                    'start': tokens[cursor + 1]['start'],
+                    'end': tokens[close_paren]['end'],
+                })
+                cursor = close_paren + 1
+            if commands:
+                current['events'].append({'kind': 'chain', 'commands': commands,
+                                          'start': token['start'], 'end': commands[-1]['end']})
+
+    return {'blocks': root['children'], 'tests': tests, 'hooks': hooks, 'tokens': tokens}
+
+def iter_block_events(block: Dict) -> Iterator[Dict]:
+    """Bloğun ve alt bloklarının tüm event'lerini kaynak sırasıyla döndürür"""
+    events = list(block['events'])
+    for child in block['children']:
+        events.extend(iter_block_events(child))
+    return iter(sorted(events, key=lambda event: event['start']))
+
+# ============================================================================
+# 3. DOSYA VE KLASÖR İŞLEMLERİ
+# ============================================================================
+
+def parse_spec_file(spec_file: str) -> Dict:
+    """Tek bir spec dosyasını okuyup parse eder"""
+    with open(spec_file, 'r', encoding='utf-8') as f:
+        return parse_spec(f.read())
+
+def parse_spec_directory(spec_dir: str, pattern: str = "*.cy.js") -> Dict[str, Dict]:
+    """Klasördeki tüm spec dosyalarını parse eder ({dosya yolu: parse sonucu})"""
+    return {str(path): parse_spec_file(str(path)) for path in sorted(Path(spec_dir).rglob(pattern))}
@@ -1,7 +1,7 @@
 import { defineConfig } from 'cypress'
 import { fileURLToPath } from 'url'
 import { dirname, resolve } from 'path'
-import { existsSync, mkdirSync } from 'fs'
+import { existsSync, mkdirSync, writeFileSync } from 'fs'
 
 const __filename = fileURLToPath(import.meta.url)
 const __dirname = dirname(__filename)
@@ -11,6 +11,10 @@ const __dirname = dirname(__filename)
 // Proje root = bir üst dizin = C:\hastaneyonetimi
 const projectRoot = resolve(__dirname, '..')
 
+// VIDEO_SOURCE=raw: Cypress kaydı sıkıştırmadan yazar, tek lossy encode'u
+// seslendirme scripti (create_video_with_audio.py) final videoda yapar
+const rawVideo = (process.env.VIDEO_SOURCE || '').toLowerCase() === 'raw'
+
 // Video klasörleri - mutlak path ile
 const videosFolder = resolve(projectRoot, 'test_videos')
 const screenshotsFolder = resolve(projectRoot, 'test_screenshots')
@@ -33,6 +37,7 @@ console.log('Project root:', projectRoot)
 console.log('Videos will be saved to:', videosFolder)
 console.log('Screenshots will be saved to:', screenshotsFolder)
 console.log('Videos folder exists:', existsSync(videosFolder))
+console.log('Video compression:', rawVideo ? 'off (pipeline encodes)' : 32)
 console.log('Screenshots folder exists:', existsSync(screenshotsFolder))
 console.log('============================\n')
 
@@ -42,7 +47,7 @@ export default defineConfig({
     viewportWidth: 1280,
     viewportHeight: 720,
     video: true,
-    videoCompression: 32,
+    videoCompression: rawVideo ? false : 32,
     screenshotOnRunFailure: true, // Başarısız testler için otomatik screenshot
     defaultCommandTimeout: 15000,
     requestTimeout: 15000,
@@ -53,6 +58,12 @@ export default defineConfig({
     videosFolder: videosFolder,
     screenshotsFolder: screenshotsFolder,
     setupNodeEvents(on, config) {
+      // Spec başladığında videonun kaydı da başlar; komut zamanları buna göre yazılır
+      let specStartedAt = Date.now()
+      // Cypress videoyu videosFolder altında spec'in ortak köke göre yoluyla kaydeder
+      // (ör. admin/login.cy.js.mp4); komut logu da aynı yola yazılır
+      let specVideoPath = null
+
       // Cypress başladığında
       on('before:run', (details) => {
         console.log('\n📹 Cypress is starting tests...')
@@ -62,9 +73,32 @@ export default defineConfig({
       
       // Her spec (test dosyası) başladığında
       on('before:spec', (spec, results) => {
+        specStartedAt = Date.now()
+        specVideoPath = spec.relativeToCommonRoot || spec.name
         console.log(`\n▶️ Running spec: ${spec.relative}`)
       })
       
+      // Komut zaman damgalarını videonun yanına yaz (support/commandLog.js)
+      on('task', {
+        'commandLog:write'({ spec, tests, commands }) {
+          const toSeconds = (ms) => (ms == null ? null : Math.max(0, ms - specStartedAt) / 1000)
+          const log = {
+            spec,
+            tests: tests.map((test) => ({ title: test.title, start: toSeconds(test.start) })),
+            commands: commands.map((command) => ({
+              ...command,
+              start: toSeconds(command.start),
+              end: toSeconds(command.end),
+            })),
+          }
+          const logFile = resolve(config.videosFolder || videosFolder, `${specVideoPath || spec}.commands.json`)
+          mkdirSync(dirname(logFile), { recursive: true })
+          writeFileSync(logFile, JSON.stringify(log, null, 2))
+          console.log('🕒 Command log saved:', logFile)
+          return null
+        },
+      })
+      
       // Her spec (test dosyası) bittiğinde
       on('after:spec', (spec, results) => {
         console.log(`✅ Spec completed: ${spec.relative}`)
@@ -0,0 +1,62 @@
+// ***********************************************************
+// Komut zaman damgası kaydedici
+//
+// Her cy komutunun başlangıç/bitiş zamanını (epoch ms) toplar ve spec
+// bittiğinde `commandLog:write` task'ı ile videonun yanına
+// `<spec>.commands.json` olarak yazdırır. Python seslendirme scripti bu
+// dosya varsa adım zamanlarını tahmin etmek yerine buradan alır.
+// ***********************************************************
+
+const commands = []
+const tests = []
+const pending = new Map()
+let flushing = false
+
+// Komut bir hook (before/beforeEach/afterEach/after) içinde mi çalışıyor?
+// Cypress.currentTest hook'larda da testin kendisini gösterir, bu yüzden
+// çalışan runnable'ın tipine bakılır.
+const inHook = () => {
+  const runnable = cy.state('runnable')
+  return Boolean(runnable && runnable.type === 'hook')
+}
+
+// Cypress'in komut argümanlarından JSON'a yazılabilir kısa bir özet çıkarır
+const summarizeArg = (arg) => {
+  if (arg === null || ['string', 'number', 'boolean'].includes(typeof arg)) {
+    return arg
+  }
+  return typeof arg
+}
+
+Cypress.on('test:before:run', (test) => {
+  tests.push({ title: test.title, start: Date.now() })
+})
+
+Cypress.on('command:start', (command) => {
+  if (flushing) {
+    return
+  }
+  const entry = {
+    name: command.get('name'),
+    args: (command.get('args') || []).map(summarizeArg),
+    test: Cypress.currentTest ? Cypress.currentTest.title : null,
+    hook: inHook(),
+    start: Date.now(),
+    end: null,
+  }
+  pending.set(command.get('id'), entry)
+  commands.push(entry)
+})
+
+Cypress.on('command:end', (command) => {
+  const entry = pending.get(command.get('id'))
+  if (entry) {
+    entry.end = Date.now()
+    pending.delete(command.get('id'))
+  }
+})
+
+after(() => {
+  flushing = true
+  cy.task('commandLog:write', { spec: Cypress.spec.name, tests, commands }, { log: false })
+})
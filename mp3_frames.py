@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MP3 Frame Okuyucu
+MP3 dosyalarının frame başlıklarını process başlatmadan okur; ID3v2/ID3v1
+etiketlerini ve Xing/Info/VBRI başlıklarını tanır. Süreyi frame sayısından
+hesaplar ve aynı formattaki klipleri frame byte'larını kopyalayarak birleştirir.
+"""
+
+import os
+from typing import List, Dict
+
+# ============================================================================
+# 1. FRAME BAŞLIĞI
+# ============================================================================
+
+# Versiyon bitleri: 0 = MPEG 2.5, 2 = MPEG 2, 3 = MPEG 1 (1 geçersiz)
+MPEG_VERSIONS = {0: 2.5, 2: 2, 3: 1}
+# Layer bitleri: 1 = Layer III, 2 = Layer II, 3 = Layer I
+MPEG_LAYERS = {1: 3, 2: 2, 3: 1}
+
+SAMPLE_RATES = {
+    1: (44100, 48000, 32000),
+    2: (22050, 24000, 16000),
+    2.5: (11025, 12000, 8000),
+}
+
+# kbps; (versiyon grubu, layer) -> bitrate index tablosu
+BITRATES = {
+    (1, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (1, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (1, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (2, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (2, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (2, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+
+def parse_frame_header(data: bytes, offset: int) -> Dict:
+    """offset'teki 4 byte'lık frame başlığını çözer (geçerli değilse None)"""
+    if offset + 4 > len(data) or data[offset] != 0xFF or (data[offset + 1] & 0xE0) != 0xE0:
+        return None
+
+    b1, b2, b3 = data[offset + 1], data[offset + 2], data[offset + 3]
+    version = MPEG_VERSIONS.get((b1 >> 3) & 0x03)
+    layer = MPEG_LAYERS.get((b1 >> 1) & 0x03)
+    bitrate_index = b2 >> 4
+    sample_rate_index = (b2 >> 2) & 0x03
+    if version is None or layer is None or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    bitrate = BITRATES[(1 if version == 1 else 2, layer)][bitrate_index] * 1000
+    sample_rate = SAMPLE_RATES[version][sample_rate_index]
+    padding = (b2 >> 1) & 0x01
+
+    if layer == 1:
+        samples = 384
+        length = (12 * bitrate // sample_rate + padding) * 4
+    else:
+        samples = 1152 if layer == 2 or version == 1 else 576
+        length = samples // 8 * bitrate // sample_rate + padding
+
+    return {
+        'version': version,
+        'layer': layer,
+        'bitrate': bitrate,
+        'sample_rate': sample_rate,
+        'channels': 1 if (b3 >> 6) == 3 else 2,
+        'samples': samples,
+        'length': length,
+        'crc': not (b1 & 0x01),
+    }
+
+def _side_info_size(header: Dict) -> int:
+    """Layer III side info boyutu (byte)"""
+    if header['version'] == 1:
+        return 17 if header['channels'] == 1 else 32
+    return 9 if header['channels'] == 1 else 17
+
+def _main_data_begin(data: bytes, offset: int, header: Dict) -> int:
+    """Layer III frame'inin bit reservoir geri referansı (byte)
+
+    Frame'in ana verisi, önceki frame'lerin ana veri alanlarında bu kadar
+    byte geriden başlar. Layer I/II'de reservoir yoktur, 0 döner.
+    """
+    if header['layer'] != 3:
+        return 0
+    side_info = offset + 4 + (2 if header['crc'] else 0)
+    if header['version'] == 1:
+        return (data[side_info] << 1) | (data[side_info + 1] >> 7)  # 9 bit
+    return data[side_info]  # 8 bit
+
+def _id3v2_size(data: bytes) -> int:
+    """Dosya başındaki ID3v2 etiketinin (footer dahil) byte boyutu"""
+    if len(data) < 10 or data[:3] != b"ID3":
+        return 0
+    size = 0
+    for byte in data[6:10]:
+        size = (size << 7) | (byte & 0x7F)  # syncsafe integer
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+def _vbr_frame_count(data: bytes, offset: int, header: Dict) -> int:
+    """İlk frame bir Xing/Info veya VBRI başlığıysa toplam frame sayısını döndürür
+
+    Returns:
+        Frame sayısı; başlık yoksa None, başlık var ama sayı yoksa 0
+    """
+    xing = offset + 4 + (2 if header['crc'] else 0) + _side_info_size(header)
+    if data[xing:xing + 4] in (b"Xing", b"Info"):
+        flags = int.from_bytes(data[xing + 4:xing + 8], 'big')
+        if flags & 0x01:
+            return int.from_bytes(data[xing + 8:xing + 12], 'big')
+        return 0
+
+    vbri = offset + 4 + 32
+    if data[vbri:vbri + 4] == b"VBRI":
+        return int.from_bytes(data[vbri + 14:vbri + 18], 'big')
+    return None
+
+# ============================================================================
+# 2. DOSYA BİLGİSİ
+# ============================================================================
+
+def read_mp3_info(path: str) -> Dict:
+    """MP3 dosyasının süresini ve ses verisinin byte aralığını okur
+
+    Xing/Info veya VBRI başlığında frame sayısı varsa süre oradan, yoksa tüm
+    frame başlıkları yürünerek hesaplanır. 'data_start'/'data_end' ses
+    frame'lerinin (ID3 etiketleri ve Xing frame'i hariç) aralığıdır.
+
+    Returns:
+        {'duration', 'sample_rate', 'channels', 'version', 'layer', 'frames',
+         'bitrate', 'data_start', 'data_end'} veya geçerli MP3 değilse None
+    """
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    return _scan_frames(data)
+
+def _scan_frames(data: bytes, offsets: List[int] = None) -> Dict:
+    """read_mp3_info'nun bellekteki veri üzerinde çalışan kısmı
+
+    offsets listesi verilirse her ses frame'inin başlangıç konumu eklenir.
+    """
+    end = len(data)
+    if end >= 128 and data[end - 128:end - 125] == b"TAG":
+        end -= 128  # ID3v1
+
+    offset = _id3v2_size(data)
+    # İlk geçerli frame'i bul: başlık ve ardından gelen frame tutarlı olmalı
+    first = None
+    while offset < end - 4:
+        header = parse_frame_header(data, offset)
+        if header:
+            following = parse_frame_header(data, offset + header['length'])
+            if offset + header['length'] >= end or (
+                    following and following['sample_rate'] == header['sample_rate']):
+                first = header
+                break
+        offset += 1
+    if first is None:
+        return None
+
+    data_start = offset
+    vbr_frames = _vbr_frame_count(data, offset, first)
+    if vbr_frames is not None:
+        data_start = offset + first['length']  # Xing frame'i ses içermez
+
+    frames = 0
+    position = data_start
+    while position < end:
+        header = parse_frame_header(data, position)
+        if (not header or header['sample_rate'] != first['sample_rate']
+                or position + header['length'] > end):
+            break
+        if offsets is not None:
+            offsets.append(position)
+        frames += 1
+        position += header['length']
+    data_end = position
+
+    if vbr_frames:
+        frames = vbr_frames
+    duration = frames * first['samples'] / first['sample_rate']
+    return {
+        'duration': duration,
+        'sample_rate': first['sample_rate'],
+        'channels': first['channels'],
+        'version': first['version'],
+        'layer': first['layer'],
+        'frames': frames,
+        'bitrate': int((data_end - data_start) * 8 / duration) if duration else 0,
+        'data_start': data_start,
+        'data_end': data_end,
+    }
+
+# ============================================================================
+# 3. BİRLEŞTİRME
+# ============================================================================
+
+def _copy_range(src, dst, start: int, length: int, chunk_size: int = 1024 * 1024):
+    """src dosyasının [start, start+length) aralığını dst'nin sonuna kopyalar"""
+    if hasattr(os, 'sendfile'):
+        try:
+            dst.flush()
+            while length > 0:
+                sent = os.sendfile(dst.fileno(), src.fileno(), start, length)
+                if sent == 0:
+                    break
+                start += sent
+                length -= sent
+            dst.seek(0, os.SEEK_END)
+            if length == 0:
+                return
+        except OSError:
+            pass  # Desteklemeyen dosya sistemi: buffer kopyasına dön
+
+    src.seek(start)
+    while length > 0:
+        chunk = src.read(min(chunk_size, length))
+        if not chunk:
+            break
+        dst.write(chunk)
+        length -= len(chunk)
+
+def concat_mp3_files(audio_files: List[str], output_file: str) -> bool:
+    """Aynı formattaki MP3 kliplerini frame byte'larını kopyalayarak birleştirir
+
+    ID3 etiketleri ve Xing/Info frame'leri atlanır; aynı klip listede birden
+    fazla kez geçebilir. Klipler farklı örnekleme hızı, kanal sayısı veya
+    MPEG versiyonu/layer'ındaysa hiçbir şey yazılmaz.
+
+    Returns:
+        Birleştirildiyse True; False dönerse çağıran ffmpeg ile birleştirmelidir
+    """
+    if not audio_files:
+        return False
+
+    infos = {path: read_mp3_info(path) for path in set(audio_files)}
+    if not all(infos.values()):
+        return False
+    formats = {(info['version'], info['layer'], info['sample_rate'], info['channels'])
+               for info in infos.values()}
+    if len(formats) != 1:
+        return False
+
+    tmp_file = f"{output_file}.{os.getpid()}.tmp"
+    with open(tmp_file, 'wb') as dst:
+        for path in audio_files:
+            info = infos[path]
+            with open(path, 'rb') as src:
+                _copy_range(src, dst, info['data_start'], info['data_end'] - info['data_start'])
+    os.replace(tmp_file, output_file)
+    return True
+
+def _reservoir_safe_start(data: bytes, offsets: List[int], first: int, last: int) -> int:
+    """first'ten geriye doğru, bit reservoir'ı tutulan aralıkta kalan ilk frame'i bulur
+
+    Kesim, ana verisi önceki frame'lerden başlayan bir frame'den yapılırsa
+    eksik byte'lar frame frame birleştirmede önceki klibin son byte'larıyla
+    dolar ve gürültü olarak duyulur. Seçilen frame'in ve ardından gelen
+    frame'lerin referansları [seçilen frame, last) aralığının içinde kalmalıdır.
+    """
+    # Ana veri alanları art arda eklenmiş akışta her frame'in alanının başlangıcı
+    regions = []
+    references = []
+    position = 0
+    for offset in offsets[:last]:
+        header = parse_frame_header(data, offset)
+        overhead = 4 + (2 if header['crc'] else 0) + (_side_info_size(header) if header['layer'] == 3 else 0)
+        regions.append(position)
+        references.append(_main_data_begin(data, offset, header))
+        position += header['length'] - overhead
+
+    max_reference = 511  # 9 bitlik main_data_begin
+    for start in range(first, -1, -1):
+        safe = True
+        for index in range(start, last):
+            if regions[index] - max_reference >= regions[start]:
+                break  # Sonraki frame'ler start'tan önceye uzanamaz
+            if regions[index] - references[index] < regions[start]:
+                safe = False
+                break
+        if safe:
+            return start
+    return 0
+
+def trim_mp3_file(path: str, output_file: str, start: float, end: float) -> float:
+    """[start, end) aralığını kapsayan frame'leri yeniden encode etmeden yeni dosyaya yazar
+
+    Kesim frame sınırlarında yapılır (MPEG 2 Layer III için 24 ms); ID3 ve
+    Xing/Info frame'leri yazılmaz. Başlangıç, bit reservoir'ı kesilen byte'lara
+    uzanmayan bir frame'e kadar geri çekilir; böylece kesilmiş klipler frame
+    frame birleştirildiğinde de doğru decode edilir.
+
+    Returns:
+        Yeni dosyanın süresi (saniye), dosya MP3 değilse None
+    """
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    offsets = []
+    info = _scan_frames(data, offsets)
+    if not info or not offsets:
+        return None
+
+    frame_duration = info['duration'] / info['frames']
+    first = min(max(0, int(start / frame_duration)), len(offsets) - 1)
+    last = min(len(offsets), max(first + 1, -int(-end // frame_duration)))
+    first = _reservoir_safe_start(data, offsets, first, last)
+    byte_end = offsets[last] if last < len(offsets) else info['data_end']
+
+    tmp_file = f"{output_file}.{os.getpid()}.tmp"
+    with open(tmp_file, 'wb') as f:
+        f.write(data[offsets[first]:byte_end])
+    os.replace(tmp_file, output_file)
+    return (last - first) * frame_duration
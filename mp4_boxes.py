@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MP4 Box Okuyucu
+MP4/ISO-BMFF dosyalarının box yapısını mmap ile okur. `moov/mvhd`, `tkhd`,
+`mdhd`, `stts`, `ctts`, `stss` ve `elst` box'larından süre, çözünürlük, kare
+sayısı, kare hızı ve keyframe zamanlarını decode yapmadan ve process
+başlatmadan çıkarır.
+"""
+
+import mmap
+import struct
+from typing import List, Dict, Iterator, Tuple
+
+# stsd sample entry türü -> ffprobe codec adı
+CODEC_NAMES = {
+    b"avc1": "h264", b"avc3": "h264",
+    b"hvc1": "hevc", b"hev1": "hevc",
+    b"av01": "av1",
+    b"vp09": "vp9", b"vp08": "vp8",
+    b"mp4v": "mpeg4",
+    b"mp4a": "aac", b"Opus": "opus", b".mp3": "mp3",
+}
+
+# ============================================================================
+# 1. BOX YAPISI
+# ============================================================================
+
+def iter_boxes(data, start: int, end: int) -> Iterator[Tuple[bytes, int, int]]:
+    """[start, end) aralığındaki box'ları (tür, içerik başlangıcı, box sonu) olarak döndürür"""
+    offset = start
+    while offset + 8 <= end:
+        size, box_type = struct.unpack_from(">I4s", data, offset)
+        header = 8
+        if size == 1:
+            size = struct.unpack_from(">Q", data, offset + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - offset  # Dosya sonuna kadar
+        if size < header or offset + size > end:
+            return
+        yield box_type, offset + header, offset + size
+        offset += size
+
+def find_box(data, start: int, end: int, path: List[bytes]) -> Tuple[int, int]:
+    """Verilen yoldaki (ör. [b"mdia", b"mdhd"]) ilk box'un içerik aralığını döndürür (yoksa None)"""
+    for box_type, body, box_end in iter_boxes(data, start, end):
+        if box_type == path[0]:
+            if len(path) == 1:
+                return body, box_end
+            return find_box(data, body, box_end, path[1:])
+    return None
+
+def _full_box(data, body: int) -> Tuple[int, int]:
+    """FullBox'ın (version, version/flags sonrası içerik başlangıcı) değerleri"""
+    return data[body], body + 4
+
+# ============================================================================
+# 2. TABLOLAR
+# ============================================================================
+
+def _read_mvhd(data, body: int) -> Tuple[int, int]:
+    """(timescale, duration)"""
+    version, offset = _full_box(data, body)
+    if version == 1:
+        return struct.unpack_from(">IQ", data, offset + 16)
+    return struct.unpack_from(">II", data, offset + 8)
+
+def _read_tkhd_size(data, body: int) -> Tuple[int, int]:
+    """Track genişlik/yüksekliği (16.16 fixed-point değerlerin tam kısmı)"""
+    version, offset = _full_box(data, body)
+    offset += 32 if version == 1 else 20  # zamanlar, track id, süre
+    offset += 8 + 8 + 36  # reserved, layer/alternate group/volume, matrix
+    width, height = struct.unpack_from(">II", data, offset)
+    return width >> 16, height >> 16
+
+def _read_hdlr(data, body: int) -> bytes:
+    return bytes(data[body + 8:body + 12])
+
+def _read_stsd_codec(data, body: int) -> bytes:
+    return bytes(data[body + 12:body + 16])
+
+def _read_entries(data, body: int, fmt: str) -> List[Tuple]:
+    """Entry sayısıyla başlayan tabloları (stts, ctts, stss) okur"""
+    _, offset = _full_box(data, body)
+    count = struct.unpack_from(">I", data, offset)[0]
+    entry_size = struct.calcsize(fmt)
+    return [struct.unpack_from(fmt, data, offset + 4 + i * entry_size) for i in range(count)]
+
+def _read_edit_offset(data, start: int, end: int) -> int:
+    """Edit list'teki ilk medya zamanını (ör. B-frame gecikmesi) döndürür; yoksa 0"""
+    found = find_box(data, start, end, [b"edts", b"elst"])
+    if not found:
+        return 0
+    version, offset = _full_box(data, found[0])
+    count = struct.unpack_from(">I", data, offset)[0]
+    offset += 4
+    for _ in range(count):
+        if version == 1:
+            _, media_time = struct.unpack_from(">Qq", data, offset)
+            offset += 20
+        else:
+            _, media_time = struct.unpack_from(">Ii", data, offset)
+            offset += 12
+        if media_time >= 0:  # -1: boş edit
+            return media_time
+    return 0
+
+def _decode_times(stts: List[Tuple[int, int]]) -> List[int]:
+    """Her örneğin decode zamanı (timescale biriminde)"""
+    times = []
+    clock = 0
+    for count, delta in stts:
+        for _ in range(count):
+            times.append(clock)
+            clock += delta
+    return times
+
+def _read_track(data, start: int, end: int) -> Dict:
+    """Bir trak box'ından track bilgisini çıkarır"""
+    mdia = find_box(data, start, end, [b"mdia"])
+    if not mdia:
+        return None
+    hdlr = find_box(data, mdia[0], mdia[1], [b"hdlr"])
+    mdhd = find_box(data, mdia[0], mdia[1], [b"mdhd"])
+    stbl = find_box(data, mdia[0], mdia[1], [b"minf", b"stbl"])
+    if not (hdlr and mdhd and stbl):
+        return None
+
+    timescale, duration = _read_mvhd(data, mdhd[0])  # mdhd ile aynı düzen
+    track = {
+        'handler': _read_hdlr(data, hdlr[0]),
+        'timescale': timescale,
+        'duration': duration / timescale if timescale else 0.0,
+        'codec': None,
+        'frames': 0,
+        'keyframes': None,
+    }
+    stsd = find_box(data, stbl[0], stbl[1], [b"stsd"])
+    if stsd:
+        fourcc = _read_stsd_codec(data, stsd[0])
+        track['codec'] = CODEC_NAMES.get(fourcc, fourcc.decode('latin-1').strip())
+
+    tkhd = find_box(data, start, end, [b"tkhd"])
+    if tkhd:
+        track['width'], track['height'] = _read_tkhd_size(data, tkhd[0])
+
+    stts = find_box(data, stbl[0], stbl[1], [b"stts"])
+    if not stts or not timescale:
+        return track
+    stts_entries = _read_entries(data, stts[0], ">II")
+    track['frames'] = sum(count for count, _ in stts_entries)
+
+    stss = find_box(data, stbl[0], stbl[1], [b"stss"])
+    if stss:
+        # Sunum zamanı = decode zamanı + ctts farkı - edit list gecikmesi
+        decode_times = _decode_times(stts_entries)
+        offsets = None
+        ctts = find_box(data, stbl[0], stbl[1], [b"ctts"])
+        if ctts:
+            version = data[ctts[0]]
+            offsets = []
+            for count, offset in _read_entries(data, ctts[0], ">Ii" if version == 1 else ">II"):
+                offsets.extend([offset] * count)
+        edit_offset = _read_edit_offset(data, start, end)
+        keyframes = []
+        for (sample,) in _read_entries(data, stss[0], ">I"):
+            index = sample - 1  # stss örnek numaraları 1'den başlar
+            if index >= len(decode_times):
+                continue
+            pts = decode_times[index] + (offsets[index] if offsets and index < len(offsets) else 0)
+            keyframes.append(round((pts - edit_offset) / timescale, 6))
+        track['keyframes'] = sorted(keyframes)
+    return track
+
+# ============================================================================
+# 3. DOSYA BİLGİSİ
+# ============================================================================
+
+def read_mp4_info(path: str) -> Dict:
+    """MP4 dosyasının metadata'sını mmap ile okur
+
+    stss box'ı olmayan video track'lerinde tüm kareler keyframe'dir;
+    'keyframes' bu durumda None olur.
+
+    Returns:
+        {'duration', 'video': {'codec', 'width', 'height', 'fps', 'frames',
+         'keyframes'} veya None, 'audio': {'codec', 'sample_rate'} veya None}
+        ya da dosya okunamazsa/moov yoksa None
+    """
+    try:
+        with open(path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return _read_movie(data)
+    except (OSError, ValueError, struct.error):
+        return None
+
+def _read_movie(data) -> Dict:
+    moov = find_box(data, 0, len(data), [b"moov"])
+    if not moov:
+        return None
+    mvhd = find_box(data, moov[0], moov[1], [b"mvhd"])
+    if not mvhd:
+        return None
+    timescale, duration = _read_mvhd(data, mvhd[0])
+
+    info = {
+        'duration': duration / timescale if timescale else 0.0,
+        'video': None,
+        'audio': None,
+    }
+    for box_type, body, box_end in iter_boxes(data, moov[0], moov[1]):
+        if box_type != b"trak":
+            continue
+        track = _read_track(data, body, box_end)
+        if not track:
+            continue
+        if track['handler'] == b"vide" and info['video'] is None:
+            info['video'] = {
+                'codec': track['codec'],
+                'width': track.get('width'),
+                'height': track.get('height'),
+                'fps': track['frames'] / track['duration'] if track['duration'] else 0.0,
+                'frames': track['frames'],
+                'keyframes': track['keyframes'],
+            }
+        elif track['handler'] == b"soun" and info['audio'] is None:
+            info['audio'] = {
+                'codec': track['codec'],
+                'sample_rate': track['timescale'],
+            }
+    return info
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""Klip yerleşimi testleri (place_clip, plan_clip_layout, layout_fits)"""
+
+import pytest
+
+import create_video_with_audio as cvwa
+from create_video_with_audio import place_clip, plan_clip_layout, layout_end, layout_fits, MAX_CLIP_TEMPO
+
+
+def test_clip_starts_at_its_step_when_it_fits():
+    assert place_clip(2.0, 5.0, 1.5, cursor=0.0) == (2.0, 1.0)
+
+
+def test_clip_waits_for_the_previous_clip():
+    start, tempo = place_clip(2.0, 6.0, 1.0, cursor=3.5)
+
+    assert (start, tempo) == (3.5, 1.0)
+
+
+def test_clip_is_sped_up_to_fit_its_slot():
+    start, tempo = place_clip(0.0, 2.0, 3.0, cursor=0.0)
+
+    assert start == 0.0
+    assert tempo == pytest.approx(1.5)
+
+
+def test_tempo_is_capped_and_slot_can_be_empty():
+    assert place_clip(0.0, 1.0, 5.0, cursor=0.0)[1] == MAX_CLIP_TEMPO
+    # Önceki klip adımın bitişini geçmişse aralık kalmaz
+    assert place_clip(0.0, 1.0, 2.0, cursor=1.5) == (1.5, MAX_CLIP_TEMPO)
+
+
+@pytest.fixture
+def clip_durations(monkeypatch):
+    durations = {}
+    monkeypatch.setattr(cvwa, 'get_video_duration', lambda path: durations.get(path))
+    return durations
+
+
+def test_plan_shifts_overflowing_clips_instead_of_overlapping(clip_durations):
+    clip_durations.update({'a.mp3': 3.0, 'b.mp3': 1.0, 'c.mp3': 1.0})
+    steps = [{'time': 0.0, 'duration': 1.0}, {'time': 1.0, 'duration': 1.0}, {'time': 2.0, 'duration': 4.0}]
+
+    placements = plan_clip_layout(steps, ['a.mp3', 'b.mp3', 'c.mp3'])
+
+    # a: 2x hızla 1.5 s'de biter; b onu bekler ve kalan 0.5 s'ye 2x sığar; c adım zamanında başlar
+    assert [(p['start'], p['tempo']) for p in placements] == [(0.0, 2.0), (1.5, 2.0), (2.0, 1.0)]
+    assert placements[1]['delay'] == pytest.approx(0.5)
+    for previous, following in zip(placements, placements[1:]):
+        assert following['start'] >= previous['start'] + previous['clip_duration'] / previous['tempo'] - 1e-9
+    assert layout_end(placements) == pytest.approx(3.0)
+
+
+def test_plan_skips_missing_clips_and_applies_scale(clip_durations):
+    clip_durations.update({'b.mp3': 1.0})
+    steps = [{'time': 0.0, 'duration': 1.0}, {'time': 1.0, 'duration': 2.0}]
+
+    placements = plan_clip_layout(steps, [None, 'b.mp3'], scale_factor=2.0)
+
+    assert len(placements) == 1
+    assert (placements[0]['start'], placements[0]['slot']) == (2.0, 4.0)
+
+
+def test_layout_fits_video_duration():
+    placements = [{'start': 8.0, 'clip_duration': 4.0, 'tempo': 2.0}]
+
+    assert layout_fits(placements, 10.0)
+    assert layout_fits(placements, 10.0 - cvwa.LAYOUT_OVERRUN_TOLERANCE)
+    assert not layout_fits(placements, 9.5)
+    assert layout_fits(placements, 0)  # Video süresi bilinmiyorsa kontrol yapılmaz
+    assert layout_end([]) == 0.0
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""Komut loguna hizalama testleri (align_steps_to_command_log, load_command_log)"""
+
+import json
+
+import pytest
+
+from create_video_with_audio import align_steps_to_command_log, load_command_log, MIN_STEP_GAP
+
+
+def step(step_type, test="login", command=None, text="metin"):
+    return {'type': step_type, 'test': test, 'command': command, 'text': text, 'time': 0.0, 'duration': 2}
+
+
+def test_steps_take_times_of_matching_commands():
+    log = {'tests': [{'title': 'login', 'start': 1.0}],
+           'commands': [{'name': 'visit', 'test': 'login', 'start': 1.5, 'end': 3.0},
+                        {'name': 'get', 'test': 'login', 'start': 3.0, 'end': 3.2},
+                        {'name': 'click', 'test': 'login', 'start': 6.0, 'end': 6.5}]}
+    steps = [step('test_title'), step('action', command='visit'), step('action', command='click')]
+
+    aligned, matched = align_steps_to_command_log(steps, log)
+
+    assert matched == 3
+    # visit 1.5'te başlar, ama başlıktan en az MIN_STEP_GAP sonra konur
+    assert [s['time'] for s in aligned] == [1.0, 1.0 + MIN_STEP_GAP, 6.0]
+    # Son adım son komutun bitişine, en az MIN_STEP_GAP kadar sürer
+    assert [s['duration'] for s in aligned] == [MIN_STEP_GAP, 6.0 - 1.0 - MIN_STEP_GAP, max(0.5, MIN_STEP_GAP)]
+
+
+def test_hook_commands_are_ignored():
+    log = {'tests': [{'title': 'login', 'start': 0.0}],
+           'commands': [{'name': 'visit', 'test': 'login', 'start': 0.5, 'end': 2.0, 'hook': True},
+                        {'name': 'visit', 'test': 'login', 'start': 4.0, 'end': 5.0, 'hook': False}]}
+    # Yorum kendisinden sonra çalışan ilk komutun (hook değil) zamanını alır
+    steps = [step('action'), step('action', command='visit')]
+
+    aligned, _ = align_steps_to_command_log(steps, log)
+
+    assert aligned[0]['time'] == 4.0
+    assert aligned[1]['time'] == 4.0 + MIN_STEP_GAP
+
+
+def test_commands_are_matched_per_test():
+    log = {'tests': [],
+           'commands': [{'name': 'get', 'test': 'a', 'start': 1.0, 'end': 1.1},
+                        {'name': 'get', 'test': 'b', 'start': 9.0, 'end': 9.1}]}
+    steps = [step('action', test='b', command='get')]
+
+    aligned, matched = align_steps_to_command_log(steps, log)
+
+    assert (aligned[0]['time'], matched) == (9.0, 1)
+
+
+def test_missing_end_and_unmatched_steps():
+    log = {'tests': [],
+           'commands': [{'name': 'visit', 'test': 'login', 'start': 2.0},
+                        {'name': 'get', 'test': 'login', 'start': 5.0, 'end': None}]}
+    steps = [step('action', command='visit'), step('action', command='type')]
+
+    aligned, matched = align_steps_to_command_log(steps, log)
+
+    assert matched == 1
+    # Eşleşmeyen adım bir öncekinden MIN_STEP_GAP sonra konur; son adım son komutun zamanına kadar sürer
+    assert [s['time'] for s in aligned] == [2.0, 2.0 + MIN_STEP_GAP]
+    assert aligned[-1]['duration'] == pytest.approx(5.0 - 2.0 - MIN_STEP_GAP)
+
+
+def test_load_command_log_by_spec_name(tmp_path):
+    (tmp_path / "admin").mkdir()
+    video = tmp_path / "admin" / "login.cy.js-2026-10-18.mp4"
+    log = {'spec': 'login.cy.js', 'tests': [], 'commands': [{'name': 'visit', 'test': 't', 'start': 0.0}]}
+    (tmp_path / "admin" / "login.cy.js.commands.json").write_text(json.dumps(log), encoding='utf-8')
+
+    assert load_command_log(str(video), "login.cy.js") == log
+    assert load_command_log(str(video), "other.cy.js") is None
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""cypress_lexer testleri (kaynaklar inline yazılır)"""
+
+from cypress_lexer import tokenize, parse_spec, parse_spec_directory, iter_block_events
+
+
+def chain_names(event):
+    return [command['name'] for command in event['commands']]
+
+
+def test_double_quoted_test_titles():
+    spec = parse_spec('describe("Login", () => {\n  it("logs in", () => {\n    cy.visit("/login")\n  })\n})\n')
+
+    assert [block['name'] for block in spec['blocks']] == ["Login"]
+    assert [test['name'] for test in spec['tests']] == ["logs in"]
+
+
+def test_parentheses_inside_string_arguments():
+    source = "it('clicks', () => {\n  cy.get('a(b)').click()\n  cy.contains(\"x)\").should('be.visible')\n})\n"
+    spec = parse_spec(source)
+
+    chains = [event for event in spec['tests'][0]['events'] if event['kind'] == 'chain']
+    assert [chain_names(chain) for chain in chains] == [['get', 'click'], ['contains', 'should']]
+    assert chains[0]['commands'][0]['args'] == "'a(b)'"
+
+
+def test_template_literal_hides_braces_and_comments():
+    source = ("it('types', () => {\n"
+              "  cy.get(`#row-${ids.map(id => { return id }).join('}')}`).type('// not a comment')\n"
+              "  // Submit the form\n"
+              "  cy.get('form').submit()\n"
+              "})\n")
+    spec = parse_spec(source)
+    events = list(iter_block_events(spec['tests'][0]))
+
+    assert [event['kind'] for event in events] == ['chain', 'comment', 'chain']
+    assert events[1]['text'] == "Submit the form"
+    assert chain_names(events[0]) == ['get', 'type']
+
+
+def test_regex_literal_versus_division():
+    tokens = tokenize("cy.url().should('match', /\\/dashboard(\\?.*)?$/); const half = width / 2 / 1")
+
+    regexes = [token['value'] for token in tokens if token['type'] == 'regex']
+    assert regexes == ["/\\/dashboard(\\?.*)?$/"]
+    assert [token['value'] for token in tokens if token['value'] == '/'] == ['/', '/']
+
+
+def test_regex_with_slash_in_class_and_flags():
+    spec = parse_spec("it('t', () => {\n  cy.contains(/[/)]+x/gi).click()\n})\n")
+
+    chain = spec['tests'][0]['events'][0]
+    assert chain_names(chain) == ['contains', 'click']
+    assert chain['commands'][0]['args'] == "/[/)]+x/gi"
+
+
+def test_hooks_and_modifiers():
+    source = ("describe.only('Suite', function () {\n"
+              "  beforeEach(() => {\n    cy.visit('/')\n  })\n"
+              "  it.skip('skipped', () => {})\n"
+              "  context('Nested', () => {\n    specify('inner', () => {})\n  })\n"
+              "})\n")
+    spec = parse_spec(source)
+
+    assert [hook['keyword'] for hook in spec['hooks']] == ['beforeEach']
+    assert chain_names(spec['hooks'][0]['events'][0]) == ['visit']
+    assert [test['name'] for test in spec['tests']] == ['skipped', 'inner']
+    assert spec['blocks'][0]['children'][-1]['name'] == 'Nested'
+
+
+def test_parse_spec_directory_is_recursive(tmp_path):
+    (tmp_path / "admin").mkdir()
+    (tmp_path / "login.cy.js").write_text("it('a', () => {})\n", encoding='utf-8')
+    (tmp_path / "admin" / "users.cy.js").write_text("it('b', () => {})\n", encoding='utf-8')
+
+    parsed = parse_spec_directory(str(tmp_path))
+
+    assert sorted(spec['tests'][0]['name'] for spec in parsed.values()) == ['a', 'b']
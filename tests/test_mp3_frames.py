@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""mp3_frames testleri (MP3 byte'ları test içinde üretilir)"""
+
+import pytest
+
+from mp3_frames import parse_frame_header, read_mp3_info, trim_mp3_file, concat_mp3_files
+
+# MPEG 1 Layer III, 128 kbps, 44100 Hz, joint stereo: 417 byte, 1152 örnek
+MPEG1_HEADER = bytes([0xFF, 0xFB, 0x90, 0x44])
+MPEG1_LENGTH = 417
+# MPEG 2 Layer III, 48 kbps, 24000 Hz, mono (Edge TTS çıktısı): 144 byte, 576 örnek
+MPEG2_HEADER = bytes([0xFF, 0xF3, 0x64, 0xC4])
+MPEG2_LENGTH = 144
+MPEG2_FRAME_DURATION = 576 / 24000
+
+
+def frames(header: bytes, length: int, count: int, references: dict = None) -> bytes:
+    """Her frame'in gövdesi frame numarasıyla doldurulur (0xFF içermez)
+
+    Side info'nun ilk byte'ı main_data_begin'dir (MPEG 2); references ile
+    frame numarası -> geri referans verilebilir, varsayılan 0.
+    """
+    references = references or {}
+    return b"".join(header + bytes([references.get(index, 0)]) + bytes([index % 200]) * (length - 5)
+                    for index in range(count))
+
+
+def xing_frame(frame_count: int) -> bytes:
+    """MPEG 2 mono Xing frame'i (side info 9 byte)"""
+    body = bytes(9) + b"Xing" + (1).to_bytes(4, 'big') + frame_count.to_bytes(4, 'big')
+    return MPEG2_HEADER + body + bytes(MPEG2_LENGTH - 4 - len(body))
+
+
+def id3v2_tag(size: int) -> bytes:
+    syncsafe = bytes([(size >> 21) & 0x7F, (size >> 14) & 0x7F, (size >> 7) & 0x7F, size & 0x7F])
+    return b"ID3" + bytes([3, 0, 0]) + syncsafe + bytes(size)
+
+
+def write(tmp_path, name: str, data: bytes) -> str:
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_parse_frame_header():
+    header = parse_frame_header(MPEG1_HEADER, 0)
+    assert (header['version'], header['layer'], header['sample_rate']) == (1, 3, 44100)
+    assert (header['bitrate'], header['channels'], header['length']) == (128000, 2, MPEG1_LENGTH)
+
+    header = parse_frame_header(MPEG2_HEADER, 0)
+    assert (header['version'], header['samples'], header['channels'], header['length']) == (2, 576, 1, MPEG2_LENGTH)
+
+    assert parse_frame_header(b"ID3\x03", 0) is None
+
+
+def test_cbr_duration_from_frame_walk(tmp_path):
+    info = read_mp3_info(write(tmp_path, "cbr.mp3", frames(MPEG1_HEADER, MPEG1_LENGTH, 38)))
+
+    assert info['frames'] == 38
+    assert info['duration'] == pytest.approx(38 * 1152 / 44100)
+    assert (info['data_start'], info['data_end']) == (0, 38 * MPEG1_LENGTH)
+
+
+def test_id3v2_and_xing_duration(tmp_path):
+    tag = id3v2_tag(300)
+    audio = frames(MPEG2_HEADER, MPEG2_LENGTH, 50)
+    info = read_mp3_info(write(tmp_path, "vbr.mp3", tag + xing_frame(50) + audio + b"TAG" + bytes(125)))
+
+    assert info['frames'] == 50
+    assert info['duration'] == pytest.approx(50 * MPEG2_FRAME_DURATION)
+    # Ses aralığı ID3v2 etiketini, Xing frame'ini ve ID3v1 etiketini içermez
+    assert info['data_start'] == len(tag) + MPEG2_LENGTH
+    assert info['data_end'] == info['data_start'] + len(audio)
+
+
+def test_xing_frame_count_wins_over_frame_walk(tmp_path):
+    info = read_mp3_info(write(tmp_path, "vbr.mp3", xing_frame(80) + frames(MPEG2_HEADER, MPEG2_LENGTH, 20)))
+
+    assert info['frames'] == 80
+    assert info['duration'] == pytest.approx(80 * MPEG2_FRAME_DURATION)
+
+
+def test_trim_cuts_on_frame_bounds(tmp_path):
+    source = write(tmp_path, "clip.mp3", id3v2_tag(64) + xing_frame(50) + frames(MPEG2_HEADER, MPEG2_LENGTH, 50))
+    output = str(tmp_path / "trimmed.mp3")
+
+    duration = trim_mp3_file(source, output, 0.1, 0.5)
+
+    # 0.1 s 4. frame'in içinde, 0.5 s 21. frame'in içinde: 4..20 arası frame'ler yazılır
+    assert duration == pytest.approx(17 * MPEG2_FRAME_DURATION)
+    data = open(output, 'rb').read()
+    assert data == frames(MPEG2_HEADER, MPEG2_LENGTH, 21)[4 * MPEG2_LENGTH:]
+    assert read_mp3_info(output)['frames'] == 17
+
+
+def test_trim_keeps_at_least_one_frame(tmp_path):
+    source = write(tmp_path, "clip.mp3", frames(MPEG2_HEADER, MPEG2_LENGTH, 10))
+    output = str(tmp_path / "trimmed.mp3")
+
+    assert trim_mp3_file(source, output, 5.0, 6.0) == pytest.approx(MPEG2_FRAME_DURATION)
+    assert open(output, 'rb').read()[5] == 9
+
+
+def test_trim_moves_start_back_to_a_reservoir_safe_frame(tmp_path):
+    # Frame 4 ana verisini önceki frame'den alır; frame 3 ise 0 byte geri referanslıdır
+    source = write(tmp_path, "clip.mp3", frames(MPEG2_HEADER, MPEG2_LENGTH, 30, {4: 40, 5: 60}))
+    output = str(tmp_path / "trimmed.mp3")
+
+    duration = trim_mp3_file(source, output, 0.1, 0.5)
+
+    assert duration == pytest.approx(18 * MPEG2_FRAME_DURATION)
+    assert open(output, 'rb').read()[5] == 3
+
+
+def test_trim_checks_references_of_following_frames(tmp_path):
+    # Frame 4 güvenli görünür ama frame 5, frame 4'ün ana veri alanından (131 byte) daha geriye uzanır
+    source = write(tmp_path, "clip.mp3", frames(MPEG2_HEADER, MPEG2_LENGTH, 30, {5: 200, 3: 10}))
+    output = str(tmp_path / "trimmed.mp3")
+
+    trim_mp3_file(source, output, 0.1, 0.5)
+
+    assert open(output, 'rb').read()[5] == 2
+
+
+def test_concat_skips_tags_and_rejects_mixed_formats(tmp_path):
+    first = write(tmp_path, "a.mp3", id3v2_tag(32) + xing_frame(3) + frames(MPEG2_HEADER, MPEG2_LENGTH, 3))
+    second = write(tmp_path, "b.mp3", frames(MPEG2_HEADER, MPEG2_LENGTH, 2))
+    output = str(tmp_path / "out.mp3")
+
+    assert concat_mp3_files([first, second, first], output)
+    info = read_mp3_info(output)
+    assert info['frames'] == 8 and info['data_start'] == 0
+
+    other = write(tmp_path, "c.mp3", frames(MPEG1_HEADER, MPEG1_LENGTH, 2))
+    assert not concat_mp3_files([first, other], str(tmp_path / "mixed.mp3"))
+    assert not (tmp_path / "mixed.mp3").exists()
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""mp4_boxes testleri (MP4 box'ları test içinde üretilir)"""
+
+import struct
+
+import pytest
+
+from mp4_boxes import iter_boxes, read_mp4_info
+
+IDENTITY_MATRIX = struct.pack(">9I", 0x10000, 0, 0, 0, 0x10000, 0, 0, 0, 0x40000000)
+
+
+def box(box_type: bytes, *children: bytes) -> bytes:
+    payload = b"".join(children)
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+
+def full_box(box_type: bytes, version: int, payload: bytes) -> bytes:
+    return box(box_type, bytes([version, 0, 0, 0]), payload)
+
+
+def mvhd(timescale: int, duration: int, version: int = 0, box_type: bytes = b"mvhd") -> bytes:
+    if version == 1:
+        return full_box(box_type, 1, struct.pack(">QQIQ", 0, 0, timescale, duration) + bytes(20))
+    return full_box(box_type, 0, struct.pack(">IIII", 0, 0, timescale, duration) + bytes(20))
+
+
+def tkhd(width: int, height: int) -> bytes:
+    return full_box(b"tkhd", 0, bytes(20) + bytes(16) + IDENTITY_MATRIX + struct.pack(">II", width << 16, height << 16))
+
+
+def table(box_type: bytes, fmt: str, entries, version: int = 0) -> bytes:
+    return full_box(box_type, version, struct.pack(">I", len(entries))
+                    + b"".join(struct.pack(fmt, *entry) for entry in entries))
+
+
+def track(handler: bytes, fourcc: bytes, timescale: int, duration: int, *stbl_boxes: bytes,
+          edts: bytes = b"", size=None) -> bytes:
+    stsd = full_box(b"stsd", 0, struct.pack(">I", 1) + box(fourcc, bytes(8)))
+    mdia = box(b"mdia",
+               mvhd(timescale, duration, box_type=b"mdhd"),
+               full_box(b"hdlr", 0, bytes(4) + handler + bytes(12)),
+               box(b"minf", box(b"stbl", stsd, *stbl_boxes)))
+    return box(b"trak", tkhd(*size) if size else b"", edts, mdia)
+
+
+def movie(*tracks: bytes, header: bytes = None) -> bytes:
+    return (box(b"ftyp", b"isom", bytes(4)) + box(b"moov", header or mvhd(1000, 400), *tracks)
+            + box(b"mdat", bytes(16)))
+
+
+def write(tmp_path, data: bytes) -> str:
+    path = tmp_path / "video.mp4"
+    path.write_bytes(data)
+    return str(path)
+
+
+# 25 fps, timescale 12800: her kare 512 birim
+VIDEO_STTS = table(b"stts", ">II", [(10, 512)])
+
+
+def test_mvhd_version_0_and_1(tmp_path):
+    assert read_mp4_info(write(tmp_path, movie(header=mvhd(600, 1500))))['duration'] == pytest.approx(2.5)
+
+    info = read_mp4_info(write(tmp_path, movie(header=mvhd(1000, 2 ** 33, version=1))))
+    assert info['duration'] == pytest.approx(2 ** 33 / 1000)
+
+
+def test_video_and_audio_tracks(tmp_path):
+    video = track(b"vide", b"avc1", 12800, 5120, VIDEO_STTS, size=(1280, 720))
+    audio = track(b"soun", b"mp4a", 44100, 17640)
+    info = read_mp4_info(write(tmp_path, movie(video, audio)))
+
+    assert info['duration'] == pytest.approx(0.4)
+    assert info['video'] == {'codec': 'h264', 'width': 1280, 'height': 720, 'fps': pytest.approx(25.0),
+                             'frames': 10, 'keyframes': None}
+    assert info['audio'] == {'codec': 'aac', 'sample_rate': 44100}
+
+
+def test_keyframes_from_stss(tmp_path):
+    video = track(b"vide", b"avc1", 12800, 5120, VIDEO_STTS, table(b"stss", ">I", [(1,), (6,), (40,)]))
+
+    # 40. örnek tabloda yok, atlanır
+    assert read_mp4_info(write(tmp_path, movie(video)))['video']['keyframes'] == [0.0, 0.2]
+
+
+def test_keyframes_with_ctts_and_edit_list(tmp_path):
+    ctts = table(b"ctts", ">II", [(5, 1024), (5, 1536)])
+    elst = full_box(b"elst", 0, struct.pack(">I", 2) + struct.pack(">Iih", 100, -1, 1) + bytes(2)
+                    + struct.pack(">Iih", 5120, 1024, 1) + bytes(2))
+    video = track(b"vide", b"avc1", 12800, 5120, VIDEO_STTS, table(b"stss", ">I", [(1,), (6,)]), ctts,
+                  edts=box(b"edts", elst))
+
+    # Sunum zamanı = decode zamanı + ctts - edit list gecikmesi (boş edit atlanır)
+    keyframes = read_mp4_info(write(tmp_path, movie(video)))['video']['keyframes']
+    assert keyframes == [0.0, (5 * 512 + 1536 - 1024) / 12800]
+
+
+def test_signed_ctts_version_1(tmp_path):
+    ctts = table(b"ctts", ">Ii", [(1, 0), (9, -512)], version=1)
+    video = track(b"vide", b"hvc1", 12800, 5120, VIDEO_STTS, table(b"stss", ">I", [(1,), (3,)]), ctts)
+
+    info = read_mp4_info(write(tmp_path, movie(video)))
+    assert info['video']['codec'] == 'hevc'
+    assert info['video']['keyframes'] == [0.0, 0.04]
+
+
+def test_largesize_box_and_invalid_files(tmp_path):
+    payload = bytes(8)
+    large = struct.pack(">I4sQ", 1, b"free", 16 + len(payload)) + payload
+    data = large + box(b"moov")
+    assert [(box_type, body, end) for box_type, body, end in iter_boxes(data, 0, len(data))] == [
+        (b"free", 16, 24), (b"moov", 32, 32)]
+
+    assert read_mp4_info(write(tmp_path, box(b"ftyp", b"isom"))) is None
+    assert read_mp4_info(str(tmp_path / "missing.mp4")) is None
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""Adımların sahne değişimlerine kaydırılması testleri (snap_steps_to_scene_changes)"""
+
+from create_video_with_audio import snap_steps_to_scene_changes, estimate_speech_duration, SCENE_SNAP_WINDOW
+
+
+def timeline(*times, end=None):
+    steps = [{'time': time_at, 'text': "Adım"} for time_at in times]
+    end = end if end is not None else times[-1] + 2.0
+    for current, following in zip(steps, steps[1:] + [None]):
+        current['duration'] = (following['time'] if following else end) - current['time']
+    return steps
+
+
+def test_steps_snap_to_nearest_change_in_window():
+    snapped, count = snap_steps_to_scene_changes(timeline(1.0, 4.0, 8.0), [1.4, 3.2, 3.8, 20.0])
+
+    assert count == 2
+    assert [step['time'] for step in snapped] == [1.4, 3.8, 8.0]
+
+
+def test_changes_outside_window_or_neighbours_are_ignored():
+    far = 5.0 + SCENE_SNAP_WINDOW + 0.1
+    # 2.1 bir sonraki adımın (2.0) arkasında kaldığı için ilk adıma atanamaz
+    snapped, count = snap_steps_to_scene_changes(timeline(1.0, 2.0, 5.0), [far, 2.1])
+
+    assert [step['time'] for step in snapped] == [1.0, 2.1, 5.0]
+    assert count == 1
+
+
+def test_each_change_is_used_once():
+    snapped, count = snap_steps_to_scene_changes(timeline(1.0, 1.2, 6.0), [1.1])
+
+    assert count == 1
+    assert [step['time'] for step in snapped] == [1.1, 1.2, 6.0]
+
+
+def test_comparison_uses_scaled_video_time():
+    # Video zamanında adımlar 2.0 ve 8.0'da; değişim 2.6'da -> ölçeklenmemiş 1.3
+    snapped, count = snap_steps_to_scene_changes(timeline(1.0, 4.0), [2.6], scale_factor=2.0)
+
+    assert count == 1
+    assert snapped[0]['time'] == 1.3
+
+
+def test_durations_follow_new_starts_and_keep_the_end():
+    steps = timeline(1.0, 4.0, end=9.0)
+    snapped, _ = snap_steps_to_scene_changes(steps, [3.5])
+
+    assert snapped[0]['duration'] == 2.5
+    assert snapped[-1]['time'] + snapped[-1]['duration'] == 9.0
+    assert all(step['duration'] >= estimate_speech_duration(step['text']) for step in snapped)
+    # Girdi listesi değiştirilmez
+    assert steps[1]['time'] == 4.0
+
+
+def test_no_changes_returns_steps_unchanged():
+    steps = timeline(1.0, 2.0)
+
+    assert snap_steps_to_scene_changes(steps, []) == (steps, 0)
+    assert snap_steps_to_scene_changes([], [1.0]) == ([], 0)
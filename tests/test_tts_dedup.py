@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""Aynı metinli adımların tek klipte toplanması testleri (deduplicate_steps)"""
+
+import os
+
+from create_video_with_audio import deduplicate_steps, tts_cache_key
+
+
+def steps_with(*texts):
+    return [{'text': text} for text in texts]
+
+
+def test_identical_texts_share_one_job():
+    jobs = deduplicate_steps(steps_with("Element seçiyoruz", "Tıklıyoruz", "Element seçiyoruz"), "out", "edge")
+
+    assert [job['text'] for job in jobs] == ["Element seçiyoruz", "Tıklıyoruz"]
+    assert [job['step_indices'] for job in jobs] == [[0, 2], [1]]
+
+
+def test_job_is_named_after_first_step():
+    jobs = deduplicate_steps(steps_with("a", "b", "b", "a"), "out", "edge")
+
+    assert [job['index'] for job in jobs] == [0, 1]
+    assert [job['file'] for job in jobs] == [os.path.join("out", "audio_000.mp3"), os.path.join("out", "audio_001.mp3")]
+    assert jobs[1]['key'] == tts_cache_key("edge", "b")
+
+
+def test_every_step_belongs_to_exactly_one_job():
+    steps = steps_with("x", "y", "x", "z", "y", "x")
+    jobs = deduplicate_steps(steps, "out", "edge")
+
+    assert sorted(index for job in jobs for index in job['step_indices']) == list(range(len(steps)))
+
+
+def test_provider_is_part_of_the_key():
+    edge = deduplicate_steps(steps_with("merhaba"), "out", "edge")[0]['key']
+    google = deduplicate_steps(steps_with("merhaba"), "out", "google")[0]['key']
+
+    assert edge != google
+
+
+def test_empty_steps():
+    assert deduplicate_steps([], "out", "edge") == []